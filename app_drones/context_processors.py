@@ -1,25 +1,23 @@
+from app_drones import user_cache
+
+
 def user_groups(request):
     """Expose a set of group names and display name for the current user."""
-    if hasattr(request, "user") and request.user.is_authenticated:
-        profile = getattr(request.user, "profile", None)
-        display_name = profile.display_name if profile else request.user.username
+    info = user_cache.for_request(request)
+    if info is not None:
         return {
-            "user_groups": set(request.user.groups.values_list("name", flat=True)),
-            "display_name": display_name,
+            "user_groups": set(info["groups"]),
+            "display_name": info["display_name"],
         }
     return {"user_groups": set(), "display_name": ""}
 
 
 def pending_orders_count(request):
     """Count of active drone orders — shown in navbar badge for masters."""
+    # for_request() primes the permission cache, so has_perm() stays in memory
     if (
-        hasattr(request, "user")
-        and request.user.is_authenticated
+        user_cache.for_request(request) is not None
         and request.user.has_perm("pilots.change_droneorder")
     ):
-        from pilots.models import DroneOrder
-        count = DroneOrder.objects.filter(
-            status__in=["pending", "in_progress", "ready"]
-        ).count()
-        return {"active_orders_count": count}
+        return {"active_orders_count": user_cache.active_orders_count()}
     return {"active_orders_count": 0}
@@ -0,0 +1,43 @@
+"""
+Refresh the SQLite reporting replica (REPORTING_REPLICA=sqlite).
+
+Copies db.sqlite3 with SQLite's online backup API into REPLICA_DB_PATH;
+writers are not blocked while the copy is taken.  Run it from cron more
+often than REPLICA_MAX_AGE, or keep it running with --loop — reports fall
+back to the main database once the copy is older than that.
+
+Usage:
+  python manage.py refresh_replica               # one copy, e.g. from cron
+  python manage.py refresh_replica --loop 300    # copy every 5 minutes
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app_drones import replica
+
+
+class Command(BaseCommand):
+    help = "Copy the main database into the SQLite reporting replica"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            type=float,
+            metavar="SECONDS",
+            help="Keep refreshing every SECONDS instead of copying once",
+        )
+
+    def handle(self, *args, **options):
+        if not replica.configured():
+            raise CommandError("Репліку не налаштовано (REPORTING_REPLICA).")
+        if not replica._is_sqlite_copy():
+            raise CommandError("Репліка не є копією SQLite — її оновлює сама СУБД.")
+
+        while True:
+            took = replica.refresh()
+            self.stdout.write(self.style.SUCCESS(f"Репліку оновлено за {took:.1f} с."))
+            if not options["loop"]:
+                break
+            time.sleep(max(options["loop"] - took, 0))
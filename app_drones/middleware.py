@@ -1,5 +1,20 @@
+import contextvars
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.http import Http404
+from django.template.base import Template
+
+from app_drones import user_cache
+from app_drones.sqlite.base import lock_stats
+
+perf_logger = logging.getLogger('perf')
 
 
 def superuser_required_for_admin(get_response):
@@ -12,6 +27,14 @@ def superuser_required_for_admin(get_response):
     return middleware
 
 
+def cached_user_info(get_response):
+    """Load the user's cached groups and permissions before the view runs."""
+    def middleware(request):
+        user_cache.for_request(request)
+        return get_response(request)
+    return middleware
+
+
 class ImpersonateMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -31,3 +54,103 @@ class ImpersonateMiddleware:
             request.is_impersonating = False
             request.real_user = request.user
         return self.get_response(request)
+
+
+# ── Request profiling ────────────────────────────────────────────────
+
+_current_profile = contextvars.ContextVar('perf_profile', default=None)
+_original_template_render = Template.render
+
+
+class _RequestProfile:
+    """Queries and template time collected for one request."""
+
+    def __init__(self):
+        self.queries = []       # (milliseconds, sql)
+        self.template_ms = 0.0
+        self.in_template = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(((time.perf_counter() - start) * 1000, sql))
+
+    @property
+    def sql_ms(self):
+        return sum(ms for ms, _ in self.queries)
+
+    def slowest(self, n):
+        return sorted(self.queries, key=lambda q: q[0], reverse=True)[:n]
+
+
+def _profiled_template_render(self, context):
+    profile = _current_profile.get()
+    if profile is None or profile.in_template:
+        # Not profiling, or an {% include %} inside a timed render
+        return _original_template_render(self, context)
+    profile.in_template = True
+    start = time.perf_counter()
+    try:
+        return _original_template_render(self, context)
+    finally:
+        profile.template_ms += (time.perf_counter() - start) * 1000
+        profile.in_template = False
+
+
+class PerfProfilerMiddleware:
+    """Opt-in (``PERF_PROFILING``) per-request query/latency profiler.
+
+    Logs one JSON line per request to the ``perf`` logger (logs/perf.log):
+    total time, query count, SQL time, template render time, the slowest
+    statements and the SQLite lock waits of this process while it ran.
+    Superusers also get a summary in ``X-Perf-Profile``.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERF_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        Template.render = _profiled_template_render
+
+    def __call__(self, request):
+        profile = _RequestProfile()
+        token = _current_profile.set(profile)
+        locks_before = lock_stats()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+        locks = lock_stats()
+
+        perf_logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': getattr(request.resolver_match, 'view_name', None),
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'queries': len(profile.queries),
+            'sql_ms': round(profile.sql_ms, 1),
+            'template_ms': round(profile.template_ms, 1),
+            'lock_waits': locks['waits'] - locks_before['waits'],
+            'lock_wait_ms': round(locks['wait_ms'] - locks_before['wait_ms'], 1),
+            'slowest': [
+                {'ms': round(ms, 2), 'sql': sql[:500]}
+                for ms, sql in profile.slowest(settings.PERF_SLOWEST_QUERIES)
+            ],
+        }, ensure_ascii=False))
+
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and user.is_superuser:
+            response['X-Perf-Profile'] = (
+                f"total={total_ms:.1f}ms; queries={len(profile.queries)}; "
+                f"sql={profile.sql_ms:.1f}ms; templates={profile.template_ms:.1f}ms"
+            )
+        return response
@@ -0,0 +1,154 @@
+"""Read-only replica for heavy reports.
+
+Statistics pages, the status log, the movement history and exports read a
+lot of rows; served from the main database they compete with interactive
+writes and keep the WAL from being checkpointed.  When a ``replica``
+database is configured (``REPORTING_REPLICA`` setting) views wrapped in
+``reporting`` — and export builds — read from it instead:
+
+* ``sqlite`` — a copy of ``db.sqlite3`` taken with SQLite's online backup
+  API by ``python manage.py refresh_replica`` (cron or ``--loop``);
+* ``postgres`` — a second, externally replicated Postgres connection.
+
+``ReplicaRouter`` sends reads made inside ``reading()`` to the replica and
+everything else, including every write, to ``default``.  A replica that is
+missing or older than ``REPLICA_MAX_AGE`` seconds is ignored, so reports
+fall back to the main database rather than show very old data.  Pages read
+from the replica get ``request.replica_snapshot`` (when the data was taken)
+for the staleness note in ``base.html``.
+"""
+
+import contextvars
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+ALIAS = 'replica'
+
+_reading = contextvars.ContextVar('replica_reading', default=False)
+
+
+def configured():
+    return ALIAS in settings.DATABASES
+
+
+def _is_sqlite_copy():
+    return 'sqlite' in settings.DATABASES[ALIAS]['ENGINE']
+
+
+def taken_at():
+    """When the replica's data was current (aware datetime), or None if unknown."""
+    if not configured():
+        return None
+    if _is_sqlite_copy():
+        path = Path(settings.DATABASES[ALIAS]['NAME'])
+        if not path.exists():
+            return None
+        return datetime.fromtimestamp(path.stat().st_mtime, tz=dt_timezone.utc)
+    try:
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute("SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())")
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        return None
+    # Not a standby (or nothing replayed yet): treat as current
+    return timezone.now() - timedelta(seconds=float(lag or 0))
+
+
+def _usable_taken_at():
+    moment = taken_at()
+    if moment is None or (timezone.now() - moment).total_seconds() > settings.REPLICA_MAX_AGE:
+        return None
+    return moment
+
+
+@contextmanager
+def reading():
+    """Route reads inside the block to the replica when it is usable.
+
+    Yields the replica's ``taken_at`` moment, or None when reads stay on the
+    main database.
+    """
+    moment = _usable_taken_at()
+    token = _reading.set(moment is not None)
+    try:
+        yield moment
+    finally:
+        _reading.reset(token)
+
+
+@contextmanager
+def primary():
+    """Read from the main database inside the block, even in a reporting view."""
+    token = _reading.set(False)
+    try:
+        yield
+    finally:
+        _reading.reset(token)
+
+
+def reporting(view_func):
+    """View decorator: read from the replica and note its age on the request."""
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        with reading() as moment:
+            if moment is not None:
+                request.replica_snapshot = {
+                    'taken_at': moment,
+                    'minutes': int((timezone.now() - moment).total_seconds() // 60),
+                }
+            return view_func(request, *args, **kwargs)
+    return _wrapped
+
+
+class ReplicaRouter:
+    # Explicit 'default' rather than None: objects loaded from the replica
+    # (possibly kept in a process cache) must not pull later queries there
+    def db_for_read(self, model, **hints):
+        return ALIAS if _reading.get() else 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both databases hold the same rows
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return False if db == ALIAS else None
+
+
+def refresh():
+    """Copy ``default`` into the SQLite replica file; return the seconds taken.
+
+    The backup runs in one step, i.e. inside a single read transaction: under
+    WAL writers carry on meanwhile and the copy is a consistent snapshot.  It
+    is written next to the replica and swapped in atomically, with its mtime
+    set to the moment the snapshot was taken.
+    """
+    target = Path(settings.DATABASES[ALIAS]['NAME'])
+    part = target.with_name(target.name + '.part')
+    started = time.time()
+    source = connections['default']
+    if source.in_atomic_block:
+        # The backup waits for the source's own write transaction to end
+        raise RuntimeError('replica.refresh() cannot run inside a transaction')
+    source.ensure_connection()
+    copy = sqlite3.connect(part)
+    try:
+        source.connection.backup(copy)
+        # Readers only query the copy; a rollback journal needs no -shm/-wal files
+        copy.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        copy.close()
+    os.utime(part, (started, started))
+    os.replace(part, target)
+    return time.time() - started
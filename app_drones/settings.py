@@ -84,6 +84,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app_drones.middleware.PerfProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -91,6 +92,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'app_drones.middleware.ImpersonateMiddleware',
+    'app_drones.middleware.cached_user_info',
     'app_drones.middleware.superuser_required_for_admin',
     'allauth.account.middleware.AccountMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -125,11 +127,60 @@ WSGI_APPLICATION = 'app_drones.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'app_drones.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
 
+# SQLite tuning (app_drones.sqlite) — the file is shared by the web workers,
+# the WhatsApp sender, the Telegram bot and background threads. Pragmas run on
+# every new connection; cache_size < 0 is in KiB.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-65536')),
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+# Atomic blocks take the write lock at BEGIN instead of on their first write
+SQLITE_TRANSACTION_MODE = os.getenv('SQLITE_TRANSACTION_MODE', 'IMMEDIATE')
+# Retries of a statement still locked after busy_timeout (backoff from the delay)
+SQLITE_LOCK_RETRIES = int(os.getenv('SQLITE_LOCK_RETRIES', '3'))
+SQLITE_LOCK_RETRY_DELAY = float(os.getenv('SQLITE_LOCK_RETRY_DELAY', '0.1'))
+# Lock waits at least this long are logged to logs/perf.log
+SQLITE_LOCK_LOG_MS = int(os.getenv('SQLITE_LOCK_LOG_MS', '100'))
+
+# Read-only replica for heavy reports (app_drones.replica). "sqlite" keeps a
+# copy refreshed by `manage.py refresh_replica`; "postgres" reads a second,
+# externally replicated database. Unset: reports read the main database.
+REPORTING_REPLICA = os.getenv('REPORTING_REPLICA', '')
+if REPORTING_REPLICA == 'sqlite':
+    DATABASES['replica'] = {
+        'ENGINE': 'app_drones.sqlite',
+        'NAME': Path(os.getenv('REPLICA_DB_PATH', BASE_DIR / 'db-replica.sqlite3')),
+        'PRAGMAS': {
+            'query_only': 1,
+            'mmap_size': SQLITE_PRAGMAS['mmap_size'],
+            'cache_size': SQLITE_PRAGMAS['cache_size'],
+            'temp_store': SQLITE_PRAGMAS['temp_store'],
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+elif REPORTING_REPLICA == 'postgres':
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('REPLICA_DB_NAME', ''),
+        'USER': os.getenv('REPLICA_DB_USER', ''),
+        'PASSWORD': os.getenv('REPLICA_DB_PASSWORD', ''),
+        'HOST': os.getenv('REPLICA_DB_HOST', ''),
+        'PORT': os.getenv('REPLICA_DB_PORT', '5432'),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['app_drones.replica.ReplicaRouter']
+# A replica older than this (seconds) is ignored and reports read the main database
+REPLICA_MAX_AGE = int(os.getenv('REPLICA_MAX_AGE', '900'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -449,6 +500,26 @@ WHATSAPP_STRIKE_GROUP = os.environ.get("WHATSAPP_STRIKE_GROUP", "")
 # Seconds to wait after enqueuing a video before enqueuing the text message
 WHATSAPP_VIDEO_UPLOAD_DELAY = int(os.environ.get("WHATSAPP_VIDEO_UPLOAD_DELAY", "30"))
 
+# Equipment exports — finished files are cached on local disk and evicted
+# least-recently-used beyond these limits.  By default the file is built
+# inside the request; set EXPORT_JOBS_ASYNC=True only where a
+# `manage.py run_export_jobs` worker is running, or jobs wait forever.
+EXPORT_JOBS_ASYNC = str_to_bool(os.getenv('EXPORT_JOBS_ASYNC', 'False'))
+EXPORT_CACHE_DIR = Path(os.getenv('EXPORT_CACHE_DIR', MEDIA_ROOT / 'exports'))
+EXPORT_CACHE_MAX_FILES = int(os.getenv('EXPORT_CACHE_MAX_FILES', '50'))
+EXPORT_CACHE_MAX_BYTES = int(os.getenv('EXPORT_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+
+# Movement and status history older than HISTORY_ARCHIVE_DAYS is moved by
+# `manage.py archive_history` into compressed monthly files in this directory
+# (kept out of MEDIA_ROOT, it is not public) plus per-day totals in the DB.
+HISTORY_ARCHIVE_DIR = Path(os.getenv('HISTORY_ARCHIVE_DIR', BASE_DIR / 'archive'))
+HISTORY_ARCHIVE_DAYS = int(os.getenv('HISTORY_ARCHIVE_DAYS', '365'))
+
+# Per-request profiling (query count, SQL and template time) → logs/perf.log;
+# superusers also get an X-Perf-Profile response header. Off unless enabled.
+PERF_PROFILING = str_to_bool(os.getenv('PERF_PROFILING', 'False'))
+PERF_SLOWEST_QUERIES = int(os.getenv('PERF_SLOWEST_QUERIES', '5'))
+
 # Logging
 _LOG_DIR = BASE_DIR / 'logs'
 _LOG_DIR.mkdir(exist_ok=True)
@@ -485,6 +556,14 @@ LOGGING = {
             'formatter': 'verbose',
             'encoding': 'utf-8',
         },
+        'file_perf': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': _LOG_DIR / 'perf.log',
+            'maxBytes': 10 * 1024 * 1024,  # 10 MB
+            'backupCount': 3,
+            'formatter': 'verbose',
+            'encoding': 'utf-8',
+        },
     },
     'root': {
         'handlers': ['console', 'file_all', 'file_errors'],
@@ -501,6 +580,11 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': False,
         },
+        'perf': {
+            'handlers': ['file_perf'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -0,0 +1,5 @@
+"""SQLite database backend tuned for several processes sharing one file.
+
+Set ``DATABASES['default']['ENGINE'] = 'app_drones.sqlite'``.  Behaviour is
+configured by the ``SQLITE_*`` settings; see ``base.DatabaseWrapper``.
+"""
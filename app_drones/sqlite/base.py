@@ -0,0 +1,127 @@
+"""Django's SQLite backend with connection tuning and lock handling.
+
+The database file is shared by the gunicorn workers, the WhatsApp sender
+(Django command and Node daemon), the Telegram bot and background threads.
+On top of the stock backend every new connection:
+
+* runs the ``SQLITE_PRAGMAS`` setting — WAL journal so readers never block
+  the writer, a busy timeout, ``synchronous=NORMAL`` and cache sizes — or
+  the database's own ``PRAGMAS`` entry in ``DATABASES``;
+* starts transactions with ``BEGIN <SQLITE_TRANSACTION_MODE>`` (IMMEDIATE by
+  default), so an atomic block takes the write lock up front instead of
+  failing with "database is locked" when it upgrades from read to write
+  half-way through;
+* retries a statement that still fails with "database is locked" after the
+  busy timeout, ``SQLITE_LOCK_RETRIES`` times with exponential backoff.  Only
+  statements that cannot have done any work are retried: the ``BEGIN`` of an
+  atomic block and statements run in autocommit mode.
+
+Lock waits are counted in ``lock_stats()``; every wait longer than
+``SQLITE_LOCK_LOG_MS`` and every retry is logged to the ``perf.sqlite``
+logger.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+logger = logging.getLogger('perf.sqlite')
+
+_stats_lock = threading.Lock()
+_stats = {'waits': 0, 'wait_ms': 0.0, 'retries': 0, 'failures': 0}
+
+
+def lock_stats():
+    """Process-wide lock counters: waits, wait_ms, retries, failures."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _record(**deltas):
+    with _stats_lock:
+        for key, value in deltas.items():
+            _stats[key] += value
+
+
+def _is_locked(exc):
+    return 'database is locked' in str(exc)
+
+
+def _retrying(run, sql, retriable, timed=False):
+    """Return ``run()``, retrying "database is locked" failures if ``retriable``.
+
+    ``timed`` statements always count their duration as a lock wait.
+    """
+    delay = settings.SQLITE_LOCK_RETRY_DELAY
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        try:
+            result = run()
+            break
+        except OperationalError as exc:
+            if not (retriable and _is_locked(exc)) or attempt >= settings.SQLITE_LOCK_RETRIES:
+                if _is_locked(exc):
+                    _record(failures=1)
+                    _log(sql, attempt, start, ok=False)
+                raise
+        attempt += 1
+        _record(retries=1)
+        time.sleep(delay * (2 ** (attempt - 1)) * (0.5 + random.random()))
+    if timed or attempt:
+        waited_ms = (time.perf_counter() - start) * 1000
+        if waited_ms >= settings.SQLITE_LOCK_LOG_MS or attempt:
+            _record(waits=1, wait_ms=waited_ms)
+            _log(sql, attempt, start, ok=True)
+    return result
+
+
+def _retry_when_locked(connection):
+    """execute_wrapper that retries lock failures of statements run in autocommit mode."""
+    def wrapper(execute, sql, params, many, context):
+        return _retrying(
+            lambda: execute(sql, params, many, context), sql, retriable=not connection.in_atomic_block,
+        )
+    return wrapper
+
+
+def _log(sql, retries, start, ok):
+    logger.warning(json.dumps({
+        'event': 'sqlite_lock',
+        'ok': ok,
+        'retries': retries,
+        'wait_ms': round((time.perf_counter() - start) * 1000, 1),
+        'sql': sql[:200],
+    }, ensure_ascii=False))
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.execute_wrappers.append(_retry_when_locked(self))
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragmas = self.settings_dict.get('PRAGMAS', settings.SQLITE_PRAGMAS)
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        # Straight on the sqlite3 connection, like the stock backend: no
+        # wrapped cursor to leak and no entry in the query log
+        sql = f'BEGIN {settings.SQLITE_TRANSACTION_MODE}'
+
+        def begin():
+            with self.wrap_database_errors:
+                self.connection.execute(sql)
+
+        # BEGIN IMMEDIATE returns as soon as the write lock is free, so its
+        # duration is the time spent waiting for other writers
+        _retrying(begin, sql, retriable=True, timed=True)
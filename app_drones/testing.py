@@ -0,0 +1,35 @@
+"""Test helpers shared by the project's apps."""
+
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """Assert a ceiling (not an exact number) on the queries a block runs.
+
+    Use on TestCase subclasses to keep hot views from regressing into N+1
+    query patterns::
+
+        with self.assertMaxQueries(12):
+            self.client.get(url)
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using='default'):
+        with CaptureQueriesContext(connections[using]) as ctx:
+            yield ctx
+        if len(ctx) > budget:
+            statements = '\n'.join(
+                f'{i}. {query["sql"]}' for i, query in enumerate(ctx.captured_queries, 1)
+            )
+            self.fail(f'{len(ctx)} queries executed, budget is {budget}:\n{statements}')
+
+    def assertViewQueryBudget(self, url, budget, data=None, status_code=200):
+        """GET ``url`` within ``budget`` queries; returns the response."""
+        with self.assertMaxQueries(budget) as ctx:
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, status_code)
+        response.query_count = len(ctx)
+        return response
@@ -0,0 +1,112 @@
+"""Per-user data every page needs, cached between requests.
+
+Group names, display name and the permission set of a user are read on
+every rendered page (navigation, context processors, permission checks).
+``for_request`` loads them once per TTL from the Django cache, memoizes them
+on the request and primes the user's ``_perm_cache``, so ``has_perm`` and
+``{{ perms }}`` resolve from memory for the rest of the request.
+
+The Django cache is per process unless CACHES names a shared backend, so
+entries are keyed by a CacheVersion stamp rather than deleted: receivers in
+``user_management.signals`` bump the ``user_cache`` version when groups,
+permissions, profiles or accounts change, and ``pilots.signals`` bumps
+``active_orders`` when an order is saved or deleted.  Each process compares
+its stamps with the stored ones at most every ``CHECK_INTERVAL`` seconds,
+like the label registry; the process that made the change sees it at once.
+"""
+
+import time
+
+from django.core.cache import cache
+
+from app_drones import replica
+
+USER_TTL = 300         # seconds
+ORDERS_TTL = 60        # seconds
+CHECK_INTERVAL = 5     # seconds
+ACTIVE_ORDER_STATUSES = ["pending", "in_progress", "ready"]
+
+USERS_VERSION_KEY = "user_cache"
+ORDERS_VERSION_KEY = "active_orders"
+
+_versions = {}  # CacheVersion key -> (checked_at, token)
+
+
+def _version(key):
+    """Cache-key token for the current stamp of ``key``, re-read every CHECK_INTERVAL."""
+    now = time.monotonic()
+    checked_at, token = _versions.get(key, (None, None))
+    if checked_at is None or now - checked_at >= CHECK_INTERVAL:
+        from equipment_accounting.models import CacheVersion
+        # A reporting view may read from the replica; versions must be current
+        with replica.primary():
+            stamp = CacheVersion.stamp(key)
+        token = f"{stamp[0]}.{stamp[1].timestamp():.6f}" if stamp else "0"
+        _versions[key] = (now, token)
+    return token
+
+
+def _bump(key):
+    from equipment_accounting.models import CacheVersion
+    CacheVersion.bump(key)
+    _versions.pop(key, None)
+
+
+def _user_key(user_id):
+    return f"user_info:{_version(USERS_VERSION_KEY)}:{user_id}"
+
+
+def _orders_key():
+    return f"active_orders_count:{_version(ORDERS_VERSION_KEY)}"
+
+
+def _load(user):
+    profile = getattr(user, "profile", None)
+    return {
+        "groups": frozenset(user.groups.values_list("name", flat=True)),
+        "display_name": profile.display_name if profile else user.username,
+        "perms": frozenset(user.get_all_permissions()),
+    }
+
+
+def for_request(request):
+    """Return {'groups', 'display_name', 'perms'} for ``request.user``, or None if anonymous."""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+    info = getattr(request, "_user_info", None)
+    if info is None or info[0] != user.pk:
+        key = _user_key(user.pk)
+        data = cache.get(key)
+        if data is None:
+            data = _load(user)
+            cache.set(key, data, USER_TTL)
+        # ModelBackend.get_all_permissions() returns this when present
+        user._perm_cache = set(data["perms"])
+        info = request._user_info = (user.pk, data)
+    return info[1]
+
+
+def invalidate_users(user_ids):
+    """Drop the cached entries of ``user_ids`` in every process.
+
+    The version is shared, so this drops every user's entry; the changes
+    that call it (memberships, permissions, profiles) are rare.
+    """
+    if list(user_ids):
+        _bump(USERS_VERSION_KEY)
+
+
+def active_orders_count():
+    """Number of drone orders still in progress (shared by all users)."""
+    key = _orders_key()
+    count = cache.get(key)
+    if count is None:
+        from pilots.models import DroneOrder
+        count = DroneOrder.objects.filter(status__in=ACTIVE_ORDER_STATUSES).count()
+        cache.set(key, count, ORDERS_TTL)
+    return count
+
+
+def invalidate_orders():
+    _bump(ORDERS_VERSION_KEY)
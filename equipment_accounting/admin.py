@@ -1,6 +1,7 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin
 
+from .inventory import tracked
 from .models import (
     Component,
     DroneModel,
@@ -93,6 +94,22 @@ class ComponentAdmin(ModelAdmin):
     list_display = ("__str__", "kind", "status", "assigned_to_uav", "created_at")
     list_filter = ("kind", "status")
 
+    # Keep the denormalized UAVInstance.kit_status in step with admin edits
+    def save_model(self, request, obj, form, change):
+        old_uav_id = Component.objects.filter(pk=obj.pk).values_list('assigned_to_uav_id', flat=True).first() if change else None
+        super().save_model(request, obj, form, change)
+        UAVInstance.refresh_kit_status([old_uav_id, obj.assigned_to_uav_id])
+
+    def delete_model(self, request, obj):
+        uav_id = obj.assigned_to_uav_id
+        super().delete_model(request, obj)
+        UAVInstance.refresh_kit_status([uav_id])
+
+    def delete_queryset(self, request, queryset):
+        uav_ids = list(queryset.values_list('assigned_to_uav_id', flat=True))
+        super().delete_queryset(request, queryset)
+        UAVInstance.refresh_kit_status(uav_ids)
+
 
 # ============== ІНВЕНТАРНІ ЕКЗЕМПЛЯРИ ==============
 
@@ -101,3 +118,22 @@ class UAVInstanceAdmin(ModelAdmin):
     list_display = ("__str__", "status", "created_by", "created_at")
     list_filter = ("status",)
     raw_id_fields = ("created_by",)
+
+    def get_queryset(self, request):
+        # Soft-deleted drones stay reachable here (status filter "Видалено")
+        return UAVInstance.objects.all_with_deleted()
+
+    # Admin edits bypass the views, so keep the inventory counters in step here
+    def save_model(self, request, obj, form, change):
+        with tracked([obj.pk] if obj.pk else []) as pks:
+            super().save_model(request, obj, form, change)
+            pks.add(obj.pk)
+            UAVInstance.refresh_kit_status([obj.pk])
+
+    def delete_model(self, request, obj):
+        with tracked([obj.pk]):
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with tracked(queryset.values_list('pk', flat=True)):
+            super().delete_queryset(request, queryset)
@@ -5,3 +5,6 @@ class EquipmentAccountingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'equipment_accounting'
     verbose_name = 'Облік техніки'
+
+    def ready(self):
+        import equipment_accounting.signals  # noqa
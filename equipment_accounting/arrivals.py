@@ -0,0 +1,90 @@
+"""Arrival confirmation for drones in transit.
+
+A drone sent somewhere gets an unconfirmed UAVMovement and status
+``transit``; confirming the movement puts it at the destination and
+restores the status it travelled with (``pre_transit_status``).
+
+``confirm_movements`` confirms any number of movements with a fixed number
+of queries: one SELECT for the movements, one UPDATE for them, one UPDATE
+of the drones per restored status and one bulk INSERT of status logs, all
+inside ``inventory.tracked``.  ``pending_movements`` finds the latest
+unconfirmed movement of each in-transit drone in one query.
+"""
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from . import inventory, labels
+from .models import UAVInstance, UAVMovement, UAVStatusLog
+
+DEFAULT_ARRIVAL_STATUS = 'inspection'
+
+
+def pending_movements(uav_ids):
+    """Return the latest unconfirmed movement PK of each in-transit drone."""
+    latest = (
+        UAVMovement.objects
+        .filter(uav=OuterRef('pk'), confirmed_at__isnull=True)
+        .order_by('-created_at', '-pk')
+        .values('pk')[:1]
+    )
+    return list(
+        UAVInstance.objects
+        .filter(pk__in=list(uav_ids), status='transit')
+        .annotate(movement_id=Subquery(latest))
+        .filter(movement_id__isnull=False)
+        .values_list('movement_id', flat=True)
+    )
+
+
+def confirm_movements(movement_ids, user):
+    """Confirm the given (still unconfirmed) movements; return how many."""
+    with transaction.atomic():
+        rows = list(
+            UAVMovement.objects
+            .select_for_update()
+            .filter(pk__in=list(movement_ids), confirmed_at__isnull=True)
+            .values_list(
+                'pk', 'uav_id', 'pre_transit_status',
+                'uav__status', 'uav__content_type_id', 'uav__object_id',
+            )
+        )
+        if not rows:
+            return 0
+        confirmed_ids = [row[0] for row in rows]
+        by_status = {}
+        for _, uav_id, pre_status, *_ in rows:
+            by_status.setdefault(pre_status or DEFAULT_ARRIVAL_STATUS, []).append(uav_id)
+
+        with inventory.tracked(row[1] for row in rows):
+            now = timezone.now()
+            UAVMovement.objects.filter(pk__in=confirmed_ids).update(confirmed_at=now, confirmed_by=user)
+            destination = (
+                UAVMovement.objects
+                .filter(pk__in=confirmed_ids, uav=OuterRef('pk'))
+                .values('to_location_id')[:1]
+            )
+            for status, uav_ids in by_status.items():
+                UAVInstance.objects.filter(pk__in=uav_ids).update(
+                    current_location_id=Subquery(destination),
+                    pending_to_location=None,
+                    status=status,
+                    updated_at=now,
+                )
+            UAVStatusLog.objects.bulk_create([
+                UAVStatusLog(
+                    uav_id=uav_id, changed_by=user,
+                    from_status=old_status, to_status=pre_status or DEFAULT_ARRIVAL_STATUS,
+                    drone_type_label=labels.full_label(ct_id, obj_id),
+                    drone_type_key=UAVStatusLog.type_key(ct_id, obj_id),
+                )
+                for _, uav_id, pre_status, old_status, ct_id, obj_id in rows
+                if old_status != (pre_status or DEFAULT_ARRIVAL_STATUS)
+            ])
+    return len(rows)
+
+
+def confirm_arrivals(uav_ids, user):
+    """Confirm the pending arrival of every in-transit drone in ``uav_ids``."""
+    return confirm_movements(pending_movements(uav_ids), user)
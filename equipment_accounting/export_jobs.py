@@ -0,0 +1,225 @@
+"""Background export jobs with a shared, LRU-evicted artifact cache.
+
+A view calls ``enqueue(kind, fmt, params)`` instead of building the file
+itself.  The job key covers the export kind, the format, the normalized
+request params and the current inventory and drone-type label versions, so
+a finished artifact is reused by every later request until the inventory
+changes.  ``run_export_jobs`` picks pending jobs up, builds them through
+``exports.write_export`` into ``settings.EXPORT_CACHE_DIR`` and evicts the
+least recently downloaded files beyond ``EXPORT_CACHE_MAX_FILES`` /
+``EXPORT_CACHE_MAX_BYTES``.
+
+A claimed job records its worker (host and PID) and a heartbeat the
+worker refreshes every ``HEARTBEAT_INTERVAL`` seconds while it builds the
+file; ``requeue_stale`` only returns a running job to the queue once its
+heartbeat is older than ``STALE_AFTER``, so a live worker's job is never
+built twice.
+
+Builders are registered in ``views.EXPORT_BUILDERS``: ``builder(params)``
+returns ``(filename, title, columns, rows, styles)`` for a QueryDict.  They
+read from the reporting replica (``app_drones.replica``) when it already
+holds the data versions the artifact will be cached under.
+"""
+
+import hashlib
+import logging
+import os
+import socket
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.http import QueryDict
+from django.utils import timezone
+
+from app_drones import replica
+
+from . import exports, inventory, labels
+from .models import CacheVersion, ExportJob
+
+logger = logging.getLogger(__name__)
+
+# Request params that select the format/route rather than the content
+IGNORED_PARAMS = ('export', 'format')
+
+HEARTBEAT_INTERVAL = 30  # seconds
+STALE_AFTER = 120        # seconds without a heartbeat before a running job is requeued
+
+
+def normalize_params(params):
+    """Canonical query string for ``params`` (order-insensitive)."""
+    qd = QueryDict(mutable=True)
+    for name in sorted(params):
+        if name in IGNORED_PARAMS:
+            continue
+        qd.setlist(name, sorted(params.getlist(name)))
+    return qd.urlencode()
+
+
+def data_stamp():
+    """Versions of everything an export is computed from."""
+    return f'{CacheVersion.stamp(inventory.VERSION_KEY)}|{CacheVersion.stamp(labels.VERSION_KEY)}'
+
+
+def job_key(kind, fmt, params):
+    raw = '|'.join([kind, fmt, params, data_stamp()])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def cache_dir():
+    path = Path(settings.EXPORT_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def artifact_path(job):
+    return cache_dir() / job.file_name
+
+
+def enqueue(kind, fmt, params, user=None):
+    """Return the job serving this export, creating a pending one if needed."""
+    params = normalize_params(params)
+    key = job_key(kind, fmt, params)
+    active = (ExportJob.STATUS_PENDING, ExportJob.STATUS_RUNNING, ExportJob.STATUS_DONE)
+    job = ExportJob.objects.filter(key=key, status__in=active).order_by('-created_at').first()
+    if job and job.status == ExportJob.STATUS_DONE and not artifact_path(job).exists():
+        # Artifact removed behind our back — forget the job and rebuild
+        discard(job)
+        job = None
+    if job is None:
+        job = ExportJob.objects.create(
+            kind=kind, fmt=fmt, params=params, key=key,
+            requested_by=user if user is not None and user.is_authenticated else None,
+        )
+    return job
+
+
+def touch(job):
+    """Mark a finished artifact as just used (for LRU eviction)."""
+    ExportJob.objects.filter(pk=job.pk).update(last_accessed_at=timezone.now())
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(job):
+    """Atomically move a pending job to running; False if someone else did."""
+    return bool(
+        ExportJob.objects
+        .filter(pk=job.pk, status=ExportJob.STATUS_PENDING)
+        .update(status=ExportJob.STATUS_RUNNING, worker=worker_id(), heartbeat_at=timezone.now())
+    )
+
+
+@contextmanager
+def _heartbeat(job):
+    """Refresh the job's heartbeat from a side thread while the block runs."""
+    stop = threading.Event()
+    owner = worker_id()
+
+    def beat():
+        try:
+            while not stop.wait(HEARTBEAT_INTERVAL):
+                ExportJob.objects.filter(
+                    pk=job.pk, status=ExportJob.STATUS_RUNNING, worker=owner,
+                ).update(heartbeat_at=timezone.now())
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, name=f'export-job-{job.pk}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _read_source():
+    """Replica reads if the replica is as current as the main database's data stamp."""
+    stamp = data_stamp()
+    with replica.reading() as taken_at:
+        current = taken_at is not None and data_stamp() == stamp
+    return replica.reading() if current else nullcontext()
+
+
+def run_job(job):
+    """Build a claimed job's artifact; returns the refreshed job."""
+    from .views import EXPORT_BUILDERS
+
+    path = cache_dir() / f'{job.key}.{job.fmt}'
+    part = path.with_name(path.name + '.part')
+    try:
+        with _heartbeat(job), _read_source():
+            filename, title, columns, rows, styles = EXPORT_BUILDERS[job.kind](QueryDict(job.params))
+            with open(part, 'wb') as fh:
+                exports.write_export(fh, job.fmt, title, columns, rows, styles)
+        os.replace(part, path)
+    except Exception as exc:
+        logger.exception("Export job %s failed", job.pk)
+        if part.exists():
+            part.unlink()
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJob.STATUS_FAILED, error=str(exc)[:1000], finished_at=timezone.now(),
+        )
+    else:
+        now = timezone.now()
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJob.STATUS_DONE, file_name=path.name,
+            download_name=f'{filename}.{job.fmt}', size=path.stat().st_size,
+            finished_at=now, last_accessed_at=now,
+        )
+        evict(keep=job.pk)
+    job.refresh_from_db()
+    return job
+
+
+def next_pending():
+    return ExportJob.objects.filter(status=ExportJob.STATUS_PENDING).order_by('created_at').first()
+
+
+def requeue_stale():
+    """Return running jobs whose worker stopped sending heartbeats to the queue."""
+    stale = Q(heartbeat_at__isnull=True) | Q(heartbeat_at__lt=timezone.now() - timedelta(seconds=STALE_AFTER))
+    return (
+        ExportJob.objects
+        .filter(stale, status=ExportJob.STATUS_RUNNING)
+        .update(status=ExportJob.STATUS_PENDING, worker='', heartbeat_at=None)
+    )
+
+
+def discard(job):
+    """Delete a job and its artifact."""
+    if job.file_name:
+        try:
+            artifact_path(job).unlink()
+        except FileNotFoundError:
+            pass
+    job.delete()
+
+
+def evict(keep=None):
+    """Drop the least recently used artifacts beyond the configured limits.
+
+    ``keep`` is the PK of a job that must survive (the one just built).
+    """
+    max_files = settings.EXPORT_CACHE_MAX_FILES
+    max_bytes = settings.EXPORT_CACHE_MAX_BYTES
+    total = 0
+    evicted = 0
+    done = ExportJob.objects.filter(status=ExportJob.STATUS_DONE).order_by('-last_accessed_at', '-pk')
+    for index, job in enumerate(done.only('pk', 'file_name', 'size')):
+        total += job.size
+        if (index >= max_files or total > max_bytes) and job.pk != keep:
+            discard(job)
+            evicted += 1
+    # Failed jobs only matter while someone is looking at the error
+    ExportJob.objects.filter(
+        status=ExportJob.STATUS_FAILED, finished_at__lt=timezone.now() - timedelta(days=1),
+    ).delete()
+    return evicted
@@ -0,0 +1,155 @@
+"""Streaming spreadsheet exports (XLSX and CSV).
+
+Views describe an export as a list of ``Column`` and an iterable of rows;
+``export_response`` writes them to an anonymous temp file — XLSX through
+openpyxl's write-only mode, CSV through the ``csv`` module — and returns a
+``FileResponse`` that streams the file in blocks.  Rows are consumed one at a
+time, so memory stays flat however many rows the export has.
+
+A row is a list of cell values (one per column) or ``None`` for a blank
+line.  A value may be wrapped in ``Cell`` to apply one of the export's named
+styles, or be a ``Formula`` whose ``{row}`` placeholder is replaced with the
+sheet row number; CSV gets the formula's precomputed ``value`` instead.
+"""
+
+import csv
+import io
+import tempfile
+from typing import Any, NamedTuple, Optional
+
+from django.http import FileResponse
+
+XLSX = 'xlsx'
+CSV = 'csv'
+FORMATS = (XLSX, CSV)
+
+CONTENT_TYPES = {
+    XLSX: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    CSV: 'text/csv; charset=utf-8',
+}
+
+HEADER_STYLE = {'bold': True, 'fill': 'D6DCE4', 'wrap': True}
+
+
+class Column(NamedTuple):
+    label: str
+    width: int = 15
+
+
+class Cell(NamedTuple):
+    value: Any
+    style: Optional[str] = None
+
+
+class Formula(NamedTuple):
+    expression: str
+    value: Any
+
+
+def get_format(request, param='format', default=XLSX):
+    """Return the requested export format, falling back to ``default``."""
+    fmt = request.GET.get(param, default)
+    return fmt if fmt in FORMATS else default
+
+
+# ── XLSX ─────────────────────────────────────────────────────────────
+
+def _openpyxl_style(spec):
+    """Turn a plain style dict into openpyxl keyword arguments.
+
+    Keys: ``bold``, ``color`` (font), ``fill`` (background), ``align``
+    (horizontal alignment) and ``wrap``.
+    """
+    from openpyxl.styles import Alignment, Font, PatternFill
+
+    style = {'font': Font(size=10, name='Calibri', bold=spec.get('bold', False), color=spec.get('color'))}
+    if spec.get('fill'):
+        style['fill'] = PatternFill(fill_type='solid', fgColor=spec['fill'])
+    if spec.get('align') or spec.get('wrap'):
+        style['alignment'] = Alignment(
+            horizontal=spec.get('align'), vertical='center', wrap_text=spec.get('wrap', False),
+        )
+    return style
+
+
+def write_xlsx(fileobj, title, columns, rows, styles=None):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    for idx, col in enumerate(columns, 1):
+        ws.column_dimensions[get_column_letter(idx)].width = col.width
+
+    resolved = {name: _openpyxl_style(spec) for name, spec in (styles or {}).items()}
+    resolved[None] = _openpyxl_style({})
+
+    def cell(value, style):
+        c = WriteOnlyCell(ws, value=value)
+        for attr, obj in style.items():
+            setattr(c, attr, obj)
+        return c
+
+    header = _openpyxl_style(HEADER_STYLE)
+    ws.append([cell(col.label, header) for col in columns])
+
+    for row_num, row in enumerate(rows, 2):
+        if row is None:
+            ws.append([])
+            continue
+        out = []
+        for value in row:
+            style = None
+            if isinstance(value, Cell):
+                value, style = value.value, value.style
+            if isinstance(value, Formula):
+                value = value.expression.format(row=row_num)
+            out.append(cell(value, resolved[style]))
+        ws.append(out)
+
+    wb.save(fileobj)
+
+
+# ── CSV ──────────────────────────────────────────────────────────────
+
+def _plain(value):
+    if isinstance(value, Cell):
+        value = value.value
+    if isinstance(value, Formula):
+        value = value.value
+    return '' if value is None else value
+
+
+def write_csv(fileobj, columns, rows):
+    # utf-8-sig so Excel opens Cyrillic text correctly
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    writer = csv.writer(text)
+    writer.writerow([col.label for col in columns])
+    for row in rows:
+        writer.writerow([] if row is None else [_plain(v) for v in row])
+    text.flush()
+    text.detach()
+
+
+# ── Response ─────────────────────────────────────────────────────────
+
+def write_export(fileobj, fmt, title, columns, rows, styles=None):
+    """Write an export in ``fmt`` to a binary file object."""
+    if fmt == CSV:
+        write_csv(fileobj, columns, rows)
+    else:
+        write_xlsx(fileobj, title, columns, rows, styles)
+
+
+def export_response(fmt, filename, title, columns, rows, styles=None):
+    """Build the export in a temp file and stream it as an attachment.
+
+    ``filename`` is given without extension.
+    """
+    tmp = tempfile.TemporaryFile()
+    write_export(tmp, fmt, title, columns, rows, styles)
+    tmp.seek(0)
+    return FileResponse(
+        tmp, as_attachment=True, filename=f'{filename}.{fmt}', content_type=CONTENT_TYPES[fmt],
+    )
@@ -1,8 +1,8 @@
 from django import forms
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q
 from django.db.models.expressions import RawSQL
 
+from . import reference
 from .models import (
     UAVInstance, Component, PowerTemplate, VideoTemplate,
     FPVDroneType, OpticalDroneType,
@@ -34,26 +34,16 @@ def _get_available_uavs_for_kind(kind, exclude_component_pk=None,
         base_qs = base_qs.exclude(pk__in=occ_qs.values_list('assigned_to_uav_id', flat=True))
 
     if kind == 'battery' and power_template_id:
-        fpv_ct = ContentType.objects.get_for_model(FPVDroneType)
-        opt_ct = ContentType.objects.get_for_model(OpticalDroneType)
-        fpv_pks = FPVDroneType.objects.filter(
-            power_template_id=power_template_id).values_list('pk', flat=True)
-        opt_pks = OpticalDroneType.objects.filter(
-            power_template_id=power_template_id).values_list('pk', flat=True)
-        base_qs = base_qs.filter(
-            Q(content_type=fpv_ct, object_id__in=fpv_pks) |
-            Q(content_type=opt_ct, object_id__in=opt_pks)
-        )
+        base_qs = base_qs.filter(type_power_template_id=power_template_id)
 
     if kind == 'spool' and video_template_id:
         try:
             vt = VideoTemplate.objects.get(pk=video_template_id)
-            opt_ct = ContentType.objects.get_for_model(OpticalDroneType)
-            opt_pks = OpticalDroneType.objects.filter(
-                video_template__drone_model_id=vt.drone_model_id,
-                video_template__is_analog=vt.is_analog,
-            ).values_list('pk', flat=True)
-            base_qs = base_qs.filter(content_type=opt_ct, object_id__in=opt_pks)
+            base_qs = base_qs.filter(
+                type_category='optical',
+                type_video_model_id=vt.drone_model_id,
+                type_is_analog=vt.is_analog,
+            )
         except VideoTemplate.DoesNotExist:
             pass
 
@@ -73,10 +63,10 @@ def _build_drone_type_choices():
     """Build choices combining FPV and Optical drone types as `content_type_id-object_id`."""
     choices = [("", "---------")]
     fpv_ct = ContentType.objects.get_for_model(FPVDroneType)
-    for dt in FPVDroneType.objects.select_related("model", "model__manufacturer"):
+    for dt in reference.objects(FPVDroneType):
         choices.append((f"{fpv_ct.pk}-{dt.pk}", f"[Радіо] {dt}"))
     opt_ct = ContentType.objects.get_for_model(OpticalDroneType)
-    for dt in OpticalDroneType.objects.select_related("model", "model__manufacturer"):
+    for dt in reference.objects(OpticalDroneType):
         choices.append((f"{opt_ct.pk}-{dt.pk}", f"[Оптика] {dt}"))
     return choices
 
@@ -0,0 +1,217 @@
+"""Archive of cold UAVMovement and UAVStatusLog history.
+
+Both tables only grow.  ``archive`` moves the rows of days before a horizon
+out of them, in batches, each in one transaction:
+
+* the rows are appended to gzip-compressed JSON-lines files, one per kind
+  and calendar month — ``<HISTORY_ARCHIVE_DIR>/movements/2025-03.jsonl.gz``;
+* they are summed into per-day totals, ArchivedMovementDay and
+  ArchivedStatusDay, grouped the way the history pages group them;
+* they are deleted from the live table.
+
+Archived days are whole days (in the current time zone), so a history page
+lists the live days first and then the archived ones: ``archived_until``
+tells where the archive ends, ``Chain`` pages through both, and ``rows``
+reads the archived rows of a few days back from the files.  Movements of
+drones still in transit are never archived — the arrival confirmation needs
+them — so an archived day may still have live rows; ``merge_days`` adds
+them to the archived day totals.
+
+Files are appended to before the batch commits; if a run dies in between,
+the next run appends the same rows again and ``rows`` keeps one copy per id.
+"""
+
+import gzip
+import json
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import NamedTuple, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedMovementDay, ArchivedStatusDay, UAVMovement, UAVStatusLog
+
+
+class _Kind(NamedTuple):
+    directory: str
+    day_model: type
+    group_fields: Tuple[str, ...]   # per-day total key besides the day
+    last_field: str                 # latest created_at within the group
+
+
+KINDS = {
+    UAVMovement: _Kind(
+        'movements', ArchivedMovementDay,
+        ('reason', 'from_location_id', 'to_location_id', 'moved_by_id'), 'last',
+    ),
+    UAVStatusLog: _Kind(
+        'status_log', ArchivedStatusDay,
+        ('drone_type_label', 'drone_type_key', 'from_status', 'to_status', 'changed_by_id'), 'latest',
+    ),
+}
+
+
+def _day_start(day):
+    moment = datetime.combine(day, time.min)
+    return timezone.make_aware(moment) if settings.USE_TZ else moment
+
+
+def _local_day(moment):
+    return timezone.localdate(moment) if settings.USE_TZ else moment.date()
+
+
+def horizon(days=None):
+    """First day kept live: rows of earlier days are archived."""
+    if days is None:
+        days = settings.HISTORY_ARCHIVE_DAYS
+    return timezone.localdate() - timedelta(days=days)
+
+
+def archivable(model, before):
+    """Live rows of ``model`` from days before ``before``."""
+    qs = model.objects.filter(created_at__lt=_day_start(before))
+    if model is UAVMovement:
+        qs = qs.exclude(confirmed_at__isnull=True, uav__status='transit')
+    return qs
+
+
+def archived_until(model):
+    """Last archived day of ``model``'s history, or None if nothing is archived."""
+    return KINDS[model].day_model.objects.aggregate(day=Max('day'))['day']
+
+
+def live_since(model):
+    """Start of the live history when part of it is archived, else None."""
+    last = archived_until(model)
+    return _day_start(last + timedelta(days=1)) if last else None
+
+
+def _path(kind, year, month):
+    return Path(settings.HISTORY_ARCHIVE_DIR) / kind.directory / f'{year:04d}-{month:02d}.jsonl.gz'
+
+
+def _encode(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _append(kind, rows):
+    by_month = {}
+    for row in rows:
+        day = _local_day(row['created_at'])
+        by_month.setdefault((day.year, day.month), []).append(row)
+    for (year, month), month_rows in by_month.items():
+        path = _path(kind, year, month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Appending adds a gzip member; readers see one continuous stream
+        with gzip.open(path, 'at', encoding='utf-8') as fh:
+            for row in month_rows:
+                fh.write(json.dumps(row, default=_encode, ensure_ascii=False) + '\n')
+
+
+def _add_totals(kind, rows):
+    totals = {}
+    for row in rows:
+        key = (_local_day(row['created_at']), *(row[f] for f in kind.group_fields))
+        count, last = totals.get(key, (0, row['created_at']))
+        totals[key] = (count + 1, max(last, row['created_at']))
+
+    existing = {
+        (obj.day, *(getattr(obj, f) for f in kind.group_fields)): obj
+        for obj in kind.day_model.objects.filter(day__in={key[0] for key in totals})
+    }
+    new, changed = [], []
+    for key, (count, last) in totals.items():
+        obj = existing.get(key)
+        if obj is None:
+            new.append(kind.day_model(
+                day=key[0], count=count, **dict(zip(kind.group_fields, key[1:])),
+                **{kind.last_field: last},
+            ))
+        else:
+            obj.count += count
+            setattr(obj, kind.last_field, max(getattr(obj, kind.last_field), last))
+            changed.append(obj)
+    kind.day_model.objects.bulk_create(new)
+    kind.day_model.objects.bulk_update(changed, ['count', kind.last_field])
+
+
+def archive(model, before, batch_size=5000):
+    """Move ``model``'s rows from days before ``before`` to the archive; return how many."""
+    kind = KINDS[model]
+    fields = [f.attname for f in model._meta.concrete_fields]
+    total = 0
+    while True:
+        with transaction.atomic():
+            rows = list(archivable(model, before).order_by('created_at', 'pk').values(*fields)[:batch_size])
+            if not rows:
+                return total
+            _append(kind, rows)
+            _add_totals(kind, rows)
+            model.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        total += len(rows)
+
+
+def rows(model, days):
+    """Archived rows of ``model`` on ``days``, newest first, as dicts of field attnames."""
+    kind = KINDS[model]
+    wanted = set(days)
+    found = {}
+    for year, month in sorted({(day.year, day.month) for day in wanted}):
+        path = _path(kind, year, month)
+        if not path.exists():
+            continue
+        with gzip.open(path, 'rt', encoding='utf-8') as fh:
+            for line in fh:
+                row = json.loads(line)
+                row['created_at'] = parse_datetime(row['created_at'])
+                if _local_day(row['created_at']) in wanted:
+                    found[row['id']] = row
+    return sorted(found.values(), key=lambda row: (row['created_at'], row['id']), reverse=True)
+
+
+def merge_days(*parts):
+    """Sum the ``{'day', 'count'}`` rows of ``parts`` per day, newest day first."""
+    totals = {}
+    for part in parts:
+        for row in part:
+            totals[row['day']] = totals.get(row['day'], 0) + row['count']
+    return [{'day': day, 'count': count} for day, count in sorted(totals.items(), reverse=True)]
+
+
+class Chain:
+    """Querysets (or lists) one after another, sliceable and countable for Paginator."""
+
+    def __init__(self, *parts):
+        self.parts = parts
+        self._sizes = None
+
+    def sizes(self):
+        if self._sizes is None:
+            self._sizes = [len(part) if isinstance(part, list) else part.count() for part in self.parts]
+        return self._sizes
+
+    def count(self):
+        return sum(self.sizes())
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if stop is None:
+            stop = self.count()
+        result = []
+        for part, size in zip(self.parts, self.sizes()):
+            if start < size and stop > 0:
+                result.extend(part[start:min(stop, size)])
+            start, stop = max(start - size, 0), stop - size
+        return result
+
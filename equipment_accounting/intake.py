@@ -0,0 +1,65 @@
+"""Batch intake of new drones.
+
+``receive_uavs`` creates any number of drones of one type together with
+their kit components (battery, and spool for optical types) and the
+``created`` movement into the receiving location.  Every table gets one
+bulk INSERT, the kit status is computed by a single UPDATE and it all runs
+inside ``inventory.tracked``, so a delivery of 500 drones costs the same
+handful of queries as a delivery of one.
+"""
+
+from . import inventory
+from .models import Component, OpticalDroneType, UAVInstance, UAVMovement
+
+
+def receive_uavs(drone_type, quantity, *, location=None, from_location=None, user=None,
+                 status='inspection', role=None, notes='', with_battery=True, with_spool=True):
+    """Create ``quantity`` drones of ``drone_type``; return their PKs in creation order.
+
+    A movement ``from_location`` → ``location`` is recorded for each drone
+    when ``location`` is given.
+    """
+    if quantity <= 0:
+        return []
+    is_opt = isinstance(drone_type, OpticalDroneType)
+    with inventory.tracked() as tracked_pks:
+        uavs = UAVInstance.objects.bulk_create([
+            UAVInstance(
+                uav_type=drone_type,
+                status=status,
+                current_location=location,
+                role=role,
+                created_by=user,
+                notes=notes,
+                **UAVInstance.type_attributes(drone_type),
+            )
+            for _ in range(quantity)
+        ])
+        pks = [uav.pk for uav in uavs]
+        tracked_pks.update(pks)
+
+        components = []
+        for pk in pks:
+            if with_battery:
+                components.append(Component(
+                    kind='battery', power_template=drone_type.power_template,
+                    status='in_use', assigned_to_uav_id=pk,
+                ))
+            if with_spool and is_opt:
+                components.append(Component(
+                    kind='spool', video_template=drone_type.video_template,
+                    status='in_use', assigned_to_uav_id=pk,
+                ))
+        if components:
+            Component.objects.bulk_create(components)
+            UAVInstance.refresh_kit_status(pks)
+
+        if location is not None:
+            UAVMovement.objects.bulk_create([
+                UAVMovement(
+                    uav_id=pk, from_location=from_location, to_location=location,
+                    moved_by=user, reason='created',
+                )
+                for pk in pks
+            ])
+    return pks
@@ -0,0 +1,144 @@
+"""Incrementally maintained UAV inventory counters.
+
+InventoryCounter holds one row per (type, location, position, destination,
+role, status) combination with the number of non-deleted drones in it, so the
+summary cards, stats pages and exports read O(types × locations) rows instead
+of scanning UAVInstance.
+
+Write paths wrap their changes in ``tracked()``: the affected drones are
+aggregated before and after the block and only the difference is applied, all
+inside the same transaction as the write itself.  ``uavs_changed`` is sent
+with the tracked PKs at the end of every block so other derived data (the
+search index) can follow the same write paths.
+
+Every change to the counters bumps the ``inventory`` CacheVersion, which
+cached artifacts built from the counters (exports) use as their stamp.
+"""
+
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count
+from django.dispatch import Signal
+
+from .models import CacheVersion, InventoryCounter, UAVInstance
+
+VERSION_KEY = 'inventory'
+
+COUNTER_KEY_FIELDS = (
+    'content_type_id', 'object_id', 'current_location_id', 'position_id',
+    'pending_to_location_id', 'role_id', 'status',
+)
+
+# Sent with ``pks`` (a set of UAV PKs) after every ``tracked()`` block
+uavs_changed = Signal()
+
+
+def _key_counts(pks):
+    """Return {counter key: number of drones} for the given UAV PKs."""
+    if not pks:
+        return {}
+    rows = (
+        UAVInstance.objects
+        .filter(pk__in=list(pks))
+        .values(*COUNTER_KEY_FIELDS)
+        .annotate(n=Count('pk'))
+    )
+    return {tuple(row[f] for f in COUNTER_KEY_FIELDS): row['n'] for row in rows}
+
+
+def apply_deltas(deltas):
+    """Add {counter key: delta} to the counter table, dropping emptied rows.
+
+    Runs a fixed number of queries however many keys change: the candidate
+    rows are read (and locked) in one SELECT, then written back with one
+    bulk UPDATE and one bulk INSERT.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    status_idx = COUNTER_KEY_FIELDS.index('status')
+    object_idx = COUNTER_KEY_FIELDS.index('object_id')
+    candidates = (
+        InventoryCounter.objects
+        .select_for_update()
+        .filter(
+            object_id__in={key[object_idx] for key in deltas},
+            status__in={key[status_idx] for key in deltas},
+        )
+    )
+    existing = {}
+    for counter in candidates:
+        key = tuple(getattr(counter, f) for f in COUNTER_KEY_FIELDS)
+        if key in deltas:
+            existing[key] = counter
+
+    changed, created = [], []
+    for key, delta in deltas.items():
+        counter = existing.get(key)
+        if counter is None:
+            created.append(InventoryCounter(count=delta, **dict(zip(COUNTER_KEY_FIELDS, key))))
+        else:
+            counter.count += delta
+            changed.append(counter)
+    if changed:
+        InventoryCounter.objects.bulk_update(changed, ['count'])
+    if created:
+        InventoryCounter.objects.bulk_create(created)
+    if any(delta < 0 for delta in deltas.values()):
+        InventoryCounter.objects.filter(count__lte=0).delete()
+    CacheVersion.bump(VERSION_KEY)
+
+
+@contextmanager
+def tracked(pks=()):
+    """Keep inventory counters in step with UAV writes made inside the block.
+
+    Yields the set of tracked PKs; callers that create drones add the new PKs
+    to it before the block ends.  Everything runs in one transaction, so the
+    counters never disagree with the committed UAV rows.
+    """
+    pks = set(pks)
+    with transaction.atomic():
+        before = _key_counts(pks)
+        yield pks
+        after = _key_counts(pks)
+        deltas = {key: after.get(key, 0) - before.get(key, 0) for key in before.keys() | after.keys()}
+        apply_deltas(deltas)
+        if pks:
+            uavs_changed.send(sender=UAVInstance, pks=pks)
+
+
+def rebuild_counters():
+    """Recompute the whole counter table from UAVInstance; return the row count."""
+    with transaction.atomic():
+        InventoryCounter.objects.all().delete()
+        rows = (
+            UAVInstance.objects
+            .values(*COUNTER_KEY_FIELDS)
+            .annotate(n=Count('pk'))
+        )
+        counters = InventoryCounter.objects.bulk_create([
+            InventoryCounter(count=row['n'], **{f: row[f] for f in COUNTER_KEY_FIELDS})
+            for row in rows
+        ])
+        CacheVersion.bump(VERSION_KEY)
+    return len(counters)
+
+
+def find_drift():
+    """Return {counter key: (stored, actual)} for every key that disagrees."""
+    stored = {}
+    for row in InventoryCounter.objects.values(*COUNTER_KEY_FIELDS, 'count'):
+        key = tuple(row[f] for f in COUNTER_KEY_FIELDS)
+        stored[key] = stored.get(key, 0) + row['count']
+    actual = {
+        tuple(row[f] for f in COUNTER_KEY_FIELDS): row['n']
+        for row in UAVInstance.objects
+        .values(*COUNTER_KEY_FIELDS).annotate(n=Count('pk'))
+    }
+    return {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in stored.keys() | actual.keys()
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
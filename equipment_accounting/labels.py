@@ -0,0 +1,203 @@
+"""Drone-type label registry.
+
+List and export labels for every FPV/optical type are stored in
+DroneTypeLabel and served from an in-process dict, so views and the
+status-log writer resolve labels without touching the type tables.
+
+Every rebuild bumps the ``drone_type_labels`` CacheVersion; each process
+compares its loaded stamp with the stored one at most every
+``CHECK_INTERVAL`` seconds and reloads the whole (small) table on mismatch.
+The process that made the change reloads on its next lookup.
+"""
+
+import time
+from typing import NamedTuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from app_drones import replica
+
+from .models import CacheVersion, DroneTypeLabel, FPVDroneType, OpticalDroneType
+
+VERSION_KEY = 'drone_type_labels'
+CHECK_INTERVAL = 5  # seconds
+
+
+# ── Formatting ───────────────────────────────────────────────────────
+
+def fmt_freq(f):
+    """Format a Frequency object as e.g. '900MHz' or '5.8GHz'."""
+    v = f.value
+    val_str = str(int(v)) if v == int(v) else str(v)
+    return f"{val_str}{f.get_unit_display()}"
+
+
+def _freqs_str(dt):
+    ctrl_parts = [fmt_freq(f) for f in sorted(dt.control_frequencies.all(), key=lambda f: f.value * 1000 if f.unit == 'ghz' else f.value)]
+    video_part = fmt_freq(dt.video_frequency) if getattr(dt, 'video_frequency_id', None) else ''
+    freqs_str = '-'.join(ctrl_parts)
+    if video_part:
+        freqs_str += (', ' if freqs_str else '') + video_part
+    return freqs_str
+
+
+def fmt_drone_type_name(dt, category):
+    """Format drone type label.
+
+    FPV  → 'ModelName (prop\') (freq1 freq2) (#purpose)'
+    Optic → 'ModelName (prop\') distancekm [ніч]'
+    """
+    prop_str = f" ({dt.prop_size}')" if dt.prop_size else ''
+    if category == 'Оптика':
+        name = dt.model.name + prop_str
+        if getattr(dt, 'video_template_id', None):
+            name += f" {dt.video_template.max_distance}км"
+        if dt.has_thermal:
+            name += " ніч"
+        return name
+
+    # FPV / radio drone
+    name = dt.model.name + prop_str
+    freqs_str = _freqs_str(dt)
+    if freqs_str:
+        name += f"({freqs_str})"
+    if dt.purpose_id:
+        name += f" (#{dt.purpose.name})"
+    return name
+
+
+def make_list_type_label(dt, is_opt):
+    """Compact label for the equipment list table / badge grid.
+
+    FPV   → 'ModelName (10") (900gh 5.8gh)'
+    Optic → 'ModelName (10") 5км'
+    """
+    if not dt:
+        return '—'
+    name = dt.model.name
+    if dt.prop_size:
+        name += f' ({dt.prop_size}")'
+    if is_opt:
+        if getattr(dt, 'video_template_id', None):
+            name += f' {dt.video_template.max_distance}км'
+    else:
+        freqs_str = _freqs_str(dt)
+        if freqs_str:
+            name += f'({freqs_str})'
+    return name
+
+
+# ── Registry ─────────────────────────────────────────────────────────
+
+class TypeLabel(NamedTuple):
+    list_label: str
+    export_label: str
+    is_optical: bool
+    has_thermal: bool
+
+    @property
+    def category(self):
+        return 'Оптика' if self.is_optical else 'Радіо'
+
+    @property
+    def full_label(self):
+        """List label with category prefix, as stored in UAVStatusLog."""
+        return f'[{self.category}] {self.list_label}'
+
+
+_cache = {'stamp': None, 'checked_at': 0.0, 'labels': {}}
+
+
+def _load():
+    opt_ct_id = ContentType.objects.get_for_model(OpticalDroneType).pk
+    return {
+        (row.content_type_id, row.object_id): TypeLabel(
+            row.list_label, row.export_label, row.content_type_id == opt_ct_id, row.has_thermal,
+        )
+        for row in DroneTypeLabel.objects.all()
+    }
+
+
+def all_labels():
+    """Return {(content_type_id, object_id): TypeLabel} for every drone type."""
+    now = time.monotonic()
+    if now - _cache['checked_at'] >= CHECK_INTERVAL:
+        # The registry outlives the request: never fill it from the replica
+        with replica.primary():
+            stamp = CacheVersion.stamp(VERSION_KEY)
+            if stamp is None:
+                # Registry never built on this database — build it once
+                rebuild_labels()
+                stamp = CacheVersion.stamp(VERSION_KEY)
+            if stamp != _cache['stamp']:
+                _cache['labels'] = _load()
+                _cache['stamp'] = stamp
+        _cache['checked_at'] = now
+    return _cache['labels']
+
+
+def get_label(ct_id, obj_id):
+    return all_labels().get((ct_id, obj_id))
+
+
+def list_label(ct_id, obj_id, default='—'):
+    lbl = get_label(ct_id, obj_id)
+    return lbl.list_label if lbl else default
+
+
+def full_label(ct_id, obj_id):
+    lbl = get_label(ct_id, obj_id)
+    return lbl.full_label if lbl else ''
+
+
+def _expire_local():
+    _cache['checked_at'] = 0.0
+
+
+def _label_rows(fpv_qs, opt_qs):
+    fpv_ct = ContentType.objects.get_for_model(FPVDroneType)
+    opt_ct = ContentType.objects.get_for_model(OpticalDroneType)
+    for dt in fpv_qs.select_related('model', 'purpose', 'video_frequency').prefetch_related('control_frequencies'):
+        yield DroneTypeLabel(
+            content_type=fpv_ct, object_id=dt.pk,
+            list_label=make_list_type_label(dt, False),
+            export_label=fmt_drone_type_name(dt, 'Радіо'),
+            has_thermal=dt.has_thermal,
+        )
+    for dt in opt_qs.select_related('model', 'video_template'):
+        yield DroneTypeLabel(
+            content_type=opt_ct, object_id=dt.pk,
+            list_label=make_list_type_label(dt, True),
+            export_label=fmt_drone_type_name(dt, 'Оптика'),
+            has_thermal=dt.has_thermal,
+        )
+
+
+def rebuild_labels(fpv_qs=None, opt_qs=None):
+    """Recompute labels for the given type querysets (all types when omitted)."""
+    full = fpv_qs is None and opt_qs is None
+    if full:
+        fpv_qs, opt_qs = FPVDroneType.objects.all(), OpticalDroneType.objects.all()
+    else:
+        fpv_qs = FPVDroneType.objects.none() if fpv_qs is None else fpv_qs
+        opt_qs = OpticalDroneType.objects.none() if opt_qs is None else opt_qs
+    with replica.primary(), transaction.atomic():
+        rows = list(_label_rows(fpv_qs, opt_qs))
+        if full:
+            DroneTypeLabel.objects.all().delete()
+        else:
+            for row in rows:
+                DroneTypeLabel.objects.filter(content_type=row.content_type, object_id=row.object_id).delete()
+        DroneTypeLabel.objects.bulk_create(rows)
+        CacheVersion.bump(VERSION_KEY)
+        _expire_local()
+    return len(rows)
+
+
+def drop_label(model, pk):
+    """Remove the label of a deleted drone type."""
+    with transaction.atomic():
+        DroneTypeLabel.objects.filter(content_type=ContentType.objects.get_for_model(model), object_id=pk).delete()
+        CacheVersion.bump(VERSION_KEY)
+        _expire_local()
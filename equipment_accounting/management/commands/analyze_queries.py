@@ -0,0 +1,79 @@
+"""
+Show how SQLite executes the project's hot queries and flag the slow plans.
+
+Every query in equipment_accounting.query_plans.CATALOGUE is planned with
+EXPLAIN QUERY PLAN (nothing is executed).  Steps that scan a whole table or
+sort/group through a temporary B-tree are reported unless the catalogue
+accepts them for that query, together with the index meant to serve the
+query when it is missing from the database — usually a sign that migrations
+have not been applied.  New indexes are declared in the model's
+Meta.indexes and created with makemigrations, like any other schema change.
+
+Run ANALYZE first (--analyze) on a database with real data so the planner
+sees the actual table sizes.
+
+Usage:
+  python manage.py analyze_queries                      # flagged queries only
+  python manage.py analyze_queries --all                # every plan
+  python manage.py analyze_queries --only status_log    # subset by name
+  python manage.py analyze_queries --analyze --strict   # for CI: fail on issues
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from equipment_accounting import query_plans
+
+PROBLEM_LABELS = {
+    'scan': 'повне сканування таблиці',
+    'temp_btree': 'тимчасове B-дерево',
+}
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN QUERY PLAN for hot queries; flag full scans and temp B-trees"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", action="append", default=[], help="Check queries whose name contains this")
+        parser.add_argument("--all", action="store_true", help="Print the plan of every query, not just flagged ones")
+        parser.add_argument("--analyze", action="store_true", help="Run ANALYZE first to refresh planner statistics")
+        parser.add_argument("--strict", action="store_true", help="Exit with an error if any query is flagged")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"Підтримується лише SQLite (поточна БД: {connection.vendor}).")
+        if options["analyze"]:
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        results = query_plans.check(options["only"])
+        if not results:
+            raise CommandError("Жоден запит не відповідає --only.")
+
+        flagged = [r for r in results if r["problems"]]
+        for result in results:
+            if result["problems"] or options["all"]:
+                self._print_result(result)
+
+        self.stdout.write(f"Перевірено запитів: {len(results)}, з проблемами: {len(flagged)}.")
+        missing = sorted({r["index"] for r in results if r["index"] and not r["index_exists"]})
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                "Відсутні індекси: " + ", ".join(missing) + " — застосуйте міграції (python manage.py migrate)."
+            ))
+        if flagged and options["strict"]:
+            raise CommandError("Є запити з повним скануванням або тимчасовим B-деревом.")
+
+    def _print_result(self, result):
+        style = self.style.WARNING if result["problems"] else self.style.SUCCESS
+        self.stdout.write(style(f"{result['name']}  ({result['source']})"))
+        for line in result["plan"]:
+            self.stdout.write(f"    {line}")
+        for kind, detail in result["problems"]:
+            self.stdout.write(self.style.WARNING(f"  ! {PROBLEM_LABELS[kind]}: {detail}"))
+        for kind, detail in result["accepted"]:
+            self.stdout.write(f"  · {PROBLEM_LABELS[kind]} (прийнято): {detail}")
+        if result["index"]:
+            state = "є" if result["index_exists"] else "відсутній"
+            self.stdout.write(f"  індекс {result['index']}: {state}")
+        self.stdout.write("")
@@ -0,0 +1,53 @@
+"""
+Move cold UAV movement and status history out of the live tables.
+
+Rows from days before the horizon (HISTORY_ARCHIVE_DAYS ago, 365 by
+default) are appended to gzip-compressed monthly files in
+HISTORY_ARCHIVE_DIR, summed into per-day totals (ArchivedMovementDay,
+ArchivedStatusDay) and deleted from UAVMovement / UAVStatusLog.  The
+movements and status log pages keep showing archived days from the totals
+and the files.  Movements of drones still in transit stay live.
+
+Inventory snapshots cannot be backfilled past the archive, so run
+`snapshot_inventory --backfill` before the first archiving.  SQLite reuses
+the freed pages; the database file itself does not shrink without VACUUM.
+
+Usage:
+  python manage.py archive_history                  # archive past the horizon
+  python manage.py archive_history --days 180       # keep only 180 days live
+  python manage.py archive_history --dry-run        # only count the rows
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from equipment_accounting import history_archive
+from equipment_accounting.models import UAVMovement, UAVStatusLog
+
+KIND_LABELS = {
+    UAVMovement: "Переміщення",
+    UAVStatusLog: "Зміни статусів",
+}
+
+
+class Command(BaseCommand):
+    help = "Archive UAV movements and status changes older than the horizon"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Days of history to keep live (default: HISTORY_ARCHIVE_DAYS)")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows moved per transaction (default: 5000)")
+        parser.add_argument("--dry-run", action="store_true", help="Count the rows to archive without moving them")
+
+    def handle(self, *args, **options):
+        if options["days"] is not None and options["days"] < 1:
+            raise CommandError("--days має бути не менше 1.")
+        before = history_archive.horizon(options["days"])
+
+        for model, label in KIND_LABELS.items():
+            if options["dry_run"]:
+                count = history_archive.archivable(model, before).count()
+                self.stdout.write(f"{label}: до архіву піде {count} записів (до {before:%d.%m.%Y}).")
+            else:
+                count = history_archive.archive(model, before, options["batch_size"])
+                self.stdout.write(self.style.SUCCESS(
+                    f"{label}: заархівовано {count} записів (до {before:%d.%m.%Y})."
+                ))
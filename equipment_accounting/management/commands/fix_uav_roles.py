@@ -10,6 +10,7 @@ Usage:
 from django.contrib.contenttypes.models import ContentType
 from django.core.management.base import BaseCommand
 
+from equipment_accounting.inventory import tracked
 from equipment_accounting.models import (
     FPVDroneType, OpticalDroneType, UAVInstance,
 )
@@ -40,25 +41,26 @@ class Command(BaseCommand):
             if dt.purpose_id:
                 type_purpose[(ct_opt.pk, dt.pk)] = dt.purpose
 
-        qs = UAVInstance.objects.filter(role__isnull=True).exclude(status="deleted")
+        qs = UAVInstance.objects.filter(role__isnull=True)
         total = updated = skipped = 0
 
-        for uav in qs:
-            total += 1
-            purpose = type_purpose.get((uav.content_type_id, uav.object_id))
+        with tracked(qs.values_list("pk", flat=True) if commit else ()):
+            for uav in qs:
+                total += 1
+                purpose = type_purpose.get((uav.content_type_id, uav.object_id))
 
-            if purpose is None:
-                self.stdout.write(f"  — пропущено  UAV#{uav.pk}  (призначення не знайдено)")
-                skipped += 1
-                continue
+                if purpose is None:
+                    self.stdout.write(f"  — пропущено  UAV#{uav.pk}  (призначення не знайдено)")
+                    skipped += 1
+                    continue
 
-            if commit:
-                uav.role = purpose
-                uav.save(update_fields=["role"])
-                self.stdout.write(self.style.SUCCESS(f"  ✓ UAV#{uav.pk}  → {purpose.name}"))
-            else:
-                self.stdout.write(f"  + UAV#{uav.pk}  → {purpose.name}")
-            updated += 1
+                if commit:
+                    uav.role = purpose
+                    uav.save(update_fields=["role"])
+                    self.stdout.write(self.style.SUCCESS(f"  ✓ UAV#{uav.pk}  → {purpose.name}"))
+                else:
+                    self.stdout.write(f"  + UAV#{uav.pk}  → {purpose.name}")
+                updated += 1
 
         action = "Оновлено" if commit else "Буде оновлено"
         self.stdout.write(
@@ -23,9 +23,10 @@ from django.core.management.base import BaseCommand, CommandError
 
 from django.contrib.auth.models import User
 
+from equipment_accounting import intake
 from equipment_accounting.models import (
     Manufacturer, DroneModel, DronePurpose, Frequency, VideoTemplate, PowerTemplate,
-    FPVDroneType, OpticalDroneType, UAVInstance, Component, Location,
+    FPVDroneType, OpticalDroneType, UAVInstance, Location,
 )
 
 DEFAULT_FILE = "temp/drone_types_verify.txt"
@@ -533,7 +534,7 @@ class Command(BaseCommand):
             ct = ct_fpv if r["kind"] == "fpv" else ct_opt
             existing = UAVInstance.objects.filter(
                 content_type=ct, object_id=drone_type.pk
-            ).exclude(status="deleted").count()
+            ).count()
 
             target = r["qty"]
             to_create = target - existing
@@ -544,35 +545,15 @@ class Command(BaseCommand):
                 continue
 
             if commit:
-                uav_status = "deferred" if r["deferred"] else "inspection"
-                new_uavs = UAVInstance.objects.bulk_create([
-                    UAVInstance(
-                        content_type=ct,
-                        object_id=drone_type.pk,
-                        status=uav_status,
-                        current_location=workshop,
-                        role=r["purpose"],
-                        created_by=superadmin,
-                        notes=r["notes"] or "",
-                    )
-                    for _ in range(to_create)
-                ])
-                components = []
-                for uav in new_uavs:
-                    components.append(Component(
-                        kind="battery",
-                        power_template=drone_type.power_template,
-                        assigned_to_uav=uav,
-                        status="in_use",
-                    ))
-                    if r["kind"] == "optical":
-                        components.append(Component(
-                            kind="spool",
-                            video_template=drone_type.video_template,
-                            assigned_to_uav=uav,
-                            status="in_use",
-                        ))
-                Component.objects.bulk_create(components)
+                # every imported drone gets its full kit
+                intake.receive_uavs(
+                    drone_type, to_create,
+                    location=workshop,
+                    user=superadmin,
+                    status="deferred" if r["deferred"] else "inspection",
+                    role=r["purpose"],
+                    notes=r["notes"] or "",
+                )
                 kit_label = "батарея + котушка" if r["kind"] == "optical" else "батарея"
                 role_label = r["purpose"].name if r["purpose"] else "—"
                 self.stdout.write(
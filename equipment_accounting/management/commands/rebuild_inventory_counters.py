@@ -0,0 +1,36 @@
+"""
+Rebuild the denormalized InventoryCounter table from UAVInstance.
+
+Usage:
+  python manage.py rebuild_inventory_counters            # rebuild
+  python manage.py rebuild_inventory_counters --check    # report drift only
+"""
+
+from django.core.management.base import BaseCommand
+
+from equipment_accounting.inventory import find_drift, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized UAV inventory counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report keys whose counters disagree with UAVInstance",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            drift = find_drift()
+            for key, (stored, actual) in sorted(drift.items(), key=str):
+                self.stdout.write(f"  ≠ {key}: збережено {stored}, фактично {actual}")
+            if drift:
+                self.stdout.write(self.style.WARNING(f"\nРозбіжностей: {len(drift)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS("Лічильники узгоджені."))
+            return
+
+        rows = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"Лічильники перебудовано: {rows} рядків."))
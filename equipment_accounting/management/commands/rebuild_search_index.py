@@ -0,0 +1,37 @@
+"""
+Rebuild the FTS5 search index used by the equipment list.
+
+Until the index has been built once, search falls back to plain
+``icontains`` filtering; requests never build it themselves.
+
+Usage:
+  python manage.py rebuild_search_index                # rebuild from scratch
+  python manage.py rebuild_search_index --if-missing   # build only if never built (deploy)
+"""
+
+from django.core.management.base import BaseCommand
+
+from equipment_accounting import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text UAV search index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-missing",
+            action="store_true",
+            help="Only build the index if it has never been built on this database",
+        )
+
+    def handle(self, *args, **options):
+        if not search.fts_available():
+            self.stdout.write(self.style.WARNING(
+                "Таблиця пошуку відсутня (немає FTS5 або не застосовано міграції) — використовується звичайний пошук."
+            ))
+            return
+        if options["if_missing"] and search.built():
+            self.stdout.write("Пошуковий індекс уже побудовано.")
+            return
+        rows = search.reindex_all()
+        self.stdout.write(self.style.SUCCESS(f"Пошуковий індекс перебудовано: {rows} БПЛА."))
@@ -0,0 +1,253 @@
+"""
+Time the hot equipment views, exports and bulk actions and write a JSON report.
+
+Meant to run against a database filled by seed_benchmark_data.  Views are
+requested through the Django test client as a "benchmark" superuser;
+exports are built cold (bypassing the job cache); bulk actions run inside a
+transaction that is rolled back, so every repeat sees the same data.
+Reports from two commits can be compared with --compare.
+
+Usage:
+  python manage.py run_benchmarks                                  # print report
+  python manage.py run_benchmarks --output bench.json --repeat 10  # save report
+  python manage.py run_benchmarks --compare bench.json             # diff vs baseline
+  python manage.py run_benchmarks --only export --only bulk        # subset by name
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.http import QueryDict
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from equipment_accounting import exports, labels
+from equipment_accounting.models import (
+    Component, Location, UAVInstance, UAVMovement, UAVStatusLog,
+)
+from equipment_accounting.views import EXPORT_BUILDERS
+
+BENCH_USER = 'benchmark'
+
+# (name, url name, GET params)
+VIEW_SCENARIOS = [
+    ('list.drones', 'equipment_list', {'tab': 'drones'}),
+    ('list.drones.ready', 'equipment_list', {'tab': 'drones', 'status': 'ready'}),
+    ('list.drones.night', 'equipment_list', {'tab': 'drones', 'mode': 'night'}),
+    ('list.drones.search', 'equipment_list', {'tab': 'drones', 'q': 'запасний'}),
+    ('list.locations', 'equipment_list', {'tab': 'locations'}),
+    ('list.components', 'equipment_list', {'tab': 'components'}),
+    ('list.types', 'equipment_list', {'tab': 'types'}),
+    ('list.templates', 'equipment_list', {'tab': 'templates'}),
+    ('stats.drone_stats', 'drone_stats', {}),
+    ('stats.movements', 'uav_movements', {}),
+    ('stats.status_log', 'uav_status_log', {}),
+]
+
+# (name, builder kind, format, params)
+EXPORT_SCENARIOS = [
+    ('export.uav.xlsx', 'uav', exports.XLSX, ''),
+    ('export.uav.csv', 'uav', exports.CSV, ''),
+    ('export.drone_stats.xlsx', 'drone_stats', exports.XLSX, ''),
+    ('export.drone_stats.csv', 'drone_stats', exports.CSV, ''),
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark equipment views, exports and bulk actions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per scenario (default: 5)")
+        parser.add_argument("--warmup", type=int, default=1, help="Untimed runs first (default: 1)")
+        parser.add_argument("--bulk-size", type=int, default=200, help="Drones per bulk action (default: 200)")
+        parser.add_argument("--only", action="append", default=[], help="Run scenarios whose name contains this")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument("--compare", help="Baseline JSON report to compare medians against")
+        parser.add_argument("--host", default="localhost", help="HTTP Host header for requests (default: localhost)")
+        parser.add_argument("--force", action="store_true", help="Run even with DEBUG off")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("DEBUG вимкнено — це схоже на робочу базу. Додайте --force, якщо впевнені.")
+        if options["repeat"] < 1:
+            raise CommandError("--repeat має бути не менше 1.")
+
+        self.repeat = options["repeat"]
+        self.warmup = max(0, options["warmup"])
+        self.only = options["only"]
+        self.bulk_size = options["bulk_size"]
+
+        user, created = User.objects.get_or_create(
+            username=BENCH_USER, defaults={'is_staff': True, 'is_superuser': True},
+        )
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+        self.user = user
+        self.client = Client(HTTP_HOST=options["host"])
+        self.client.force_login(user)
+
+        results = {}
+        for name, url_name, params in VIEW_SCENARIOS:
+            if self._selected(name):
+                url = reverse(f'equipment_accounting:{url_name}')
+                results[name] = self._measure(name, lambda url=url, params=params: self._get(url, params))
+        for name, kind, fmt, params in EXPORT_SCENARIOS:
+            if self._selected(name):
+                results[name] = self._measure(name, lambda kind=kind, fmt=fmt, params=params: self._export(kind, fmt, params))
+        for name, post in self._bulk_scenarios():
+            if self._selected(name):
+                results[name] = self._measure(name, lambda post=post: self._rolled_back(post))
+
+        report = {'meta': self._meta(), 'results': results}
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(text, encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"Звіт збережено: {options['output']}"))
+        else:
+            self.stdout.write(text)
+        if options["compare"]:
+            self._compare(options["compare"], results)
+
+    # ── Scenarios ────────────────────────────────────────────────────
+
+    def _selected(self, name):
+        return not self.only or any(part in name for part in self.only)
+
+    def _get(self, url, params):
+        response = self.client.get(url, params)
+        if response.status_code != 200:
+            raise CommandError(f"{url} {params}: HTTP {response.status_code}")
+
+    def _export(self, kind, fmt, params):
+        filename, title, columns, rows, styles = EXPORT_BUILDERS[kind](QueryDict(params))
+        with tempfile.TemporaryFile() as fh:
+            exports.write_export(fh, fmt, title, columns, rows, styles)
+
+    def _post(self, url_name, data):
+        response = self.client.post(reverse(f'equipment_accounting:{url_name}'), data)
+        if response.status_code != 302:
+            raise CommandError(f"{url_name}: HTTP {response.status_code}")
+
+    def _rolled_back(self, post):
+        with transaction.atomic():
+            post()
+            transaction.set_rollback(True)
+
+    def _bulk_scenarios(self):
+        """POST callables for the bulk actions, built from the current data."""
+        ready = list(
+            UAVInstance.objects.filter(status='ready')
+            .order_by('pk').values_list('pk', flat=True)[:self.bulk_size]
+        )
+        target = Location.objects.exclude(name='Позиція').order_by('pk').first()
+        scenarios = []
+        if ready:
+            for action in ('repair', 'delete'):
+                scenarios.append((f'bulk.{action}', lambda action=action: self._post(
+                    'uav_bulk_action', {'selected': ready, 'bulk_action': action},
+                )))
+            if target:
+                scenarios.append(('bulk.given', lambda: self._post(
+                    'uav_bulk_action',
+                    {'selected': ready, 'bulk_action': 'given', 'to_location_id': target.pk},
+                )))
+        # Largest in-transit group — what quantity mode confirms in one click
+        transit = (
+            UAVInstance.objects.filter(status='transit')
+            .values('content_type_id', 'object_id')
+            .annotate(n=Count('pk')).order_by('-n').first()
+        )
+        if transit:
+            scenarios.append(('bulk.confirm_arrival', lambda: self._post('uav_quantity_action', {
+                'content_type_id': transit['content_type_id'], 'object_id': transit['object_id'],
+                'from_status': 'transit', 'action': 'confirm_arrival',
+            })))
+        return scenarios
+
+    # ── Measurement ──────────────────────────────────────────────────
+
+    def _run(self, fn):
+        labels._expire_local()
+        connection.queries_log.clear()  # bounded deque — keep counts exact
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            fn()
+            elapsed = (time.perf_counter() - start) * 1000
+        return elapsed, len(ctx.captured_queries)
+
+    def _measure(self, name, fn):
+        for _ in range(self.warmup):
+            self._run(fn)
+        timings, queries = [], 0
+        for _ in range(self.repeat):
+            elapsed, queries = self._run(fn)
+            timings.append(elapsed)
+        result = {
+            'min_ms': round(min(timings), 2),
+            'median_ms': round(statistics.median(timings), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'max_ms': round(max(timings), 2),
+            'queries': queries,
+            'runs': self.repeat,
+        }
+        self.stderr.write(f"{name:<28} {result['median_ms']:>10.1f} мс  {queries:>5} запитів")
+        return result
+
+    # ── Report ───────────────────────────────────────────────────────
+
+    def _meta(self):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': self.repeat,
+            'bulk_size': self.bulk_size,
+            'dataset': {
+                'uavs': UAVInstance.objects.all_with_deleted().count(),
+                'components': Component.objects.count(),
+                'movements': UAVMovement.objects.count(),
+                'status_logs': UAVStatusLog.objects.count(),
+            },
+        }
+
+    def _compare(self, path, results):
+        try:
+            baseline = json.loads(Path(path).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Не вдалося прочитати {path}: {exc}")
+        self.stdout.write(f"\nПорівняння з {path} (commit {baseline['meta'].get('commit') or '?'}):")
+        for name, result in results.items():
+            old = baseline['results'].get(name)
+            if not old:
+                self.stdout.write(f"  {name:<28} новий сценарій")
+                continue
+            before, after = old['median_ms'], result['median_ms']
+            change = (after - before) / before * 100 if before else 0.0
+            line = (
+                f"  {name:<28} {before:>10.1f} → {after:>10.1f} мс ({change:+.1f}%)"
+                f"  запитів {old['queries']} → {result['queries']}"
+            )
+            style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+            self.stdout.write(style(line))
@@ -0,0 +1,56 @@
+"""
+Build queued equipment exports (ExportJob) in the background.
+
+Run one or more workers next to the web server.  Each running job carries
+its worker's heartbeat; an idle worker returns jobs whose worker stopped
+sending heartbeats (it died mid-build) to the queue.
+
+Usage:
+  python manage.py run_export_jobs                 # keep polling for jobs
+  python manage.py run_export_jobs --once          # drain the queue and exit
+  python manage.py run_export_jobs --interval 5    # poll every 5 seconds
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from equipment_accounting import export_jobs
+from equipment_accounting.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = "Process pending equipment export jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the jobs currently queued and exit",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds between queue polls (default: 2)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job = export_jobs.next_pending()
+            if job is None:
+                requeued = export_jobs.requeue_stale()
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f"Повернуто в чергу незавершених: {requeued}"))
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+                continue
+            if not export_jobs.claim(job):
+                continue
+            job = export_jobs.run_job(job)
+            if job.status == ExportJob.STATUS_DONE:
+                self.stdout.write(self.style.SUCCESS(f"  ✓ {job}: {job.size} байт"))
+            else:
+                self.stdout.write(self.style.ERROR(f"  ✗ {job}: {job.error}"))
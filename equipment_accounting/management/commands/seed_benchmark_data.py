@@ -0,0 +1,255 @@
+"""
+Fill the database with synthetic equipment data for benchmarking.
+
+Generates drone types, locations, positions, UAVs spread over daily intake
+batches, components, movements and status logs, then rebuilds the derived
+tables (labels, inventory counters, kit status, search index).  Reference
+rows are named "Бенч …" so they are easy to tell apart.  Refuses to run
+with DEBUG off unless --force is given.
+
+Usage:
+  python manage.py seed_benchmark_data                          # defaults (100k UAVs)
+  python manage.py seed_benchmark_data --uavs 20000 --days 90   # smaller set
+  python manage.py seed_benchmark_data --seed 7 --force         # other seed, non-DEBUG DB
+"""
+
+import random
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from equipment_accounting import inventory, labels, search
+from equipment_accounting.models import (
+    Component, DroneModel, DronePurpose, FPVDroneType, Frequency, Location,
+    Manufacturer, OpticalDroneType, Position, PowerTemplate, UAVInstance,
+    UAVMovement, UAVStatusLog, VideoTemplate,
+)
+
+BATCH_SIZE = 2000
+
+# Status mix of generated drones (weights)
+STATUS_WEIGHTS = {
+    'ready': 40, 'inspection': 15, 'repair': 10, 'deferred': 5,
+    'transit': 5, 'given': 20, 'deleted': 5,
+}
+ROLE_NAMES = ['Ударний', 'Носій', 'Мінувальник', 'Перехоплювач', 'Бомбардувальник']
+NOTE_WORDS = ['запасний', 'після ремонту', 'новий', 'перевірено', 'без пропелерів', 'з тепловізором', '']
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic equipment data for benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--uavs", type=int, default=100_000, help="UAVs to create (default: 100000)")
+        parser.add_argument("--types", type=int, default=40, help="Drone types, ~1/4 optical (default: 40)")
+        parser.add_argument("--locations", type=int, default=12, help="Locations (default: 12)")
+        parser.add_argument("--positions", type=int, default=40, help="Positions (default: 40)")
+        parser.add_argument("--components", type=int, default=60_000, help="Components (default: 60000)")
+        parser.add_argument("--movements", type=int, default=150_000, help="Movements (default: 150000)")
+        parser.add_argument("--status-logs", type=int, default=150_000, help="Status log rows (default: 150000)")
+        parser.add_argument("--days", type=int, default=365, help="Spread intake over N days (default: 365)")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+        parser.add_argument("--force", action="store_true", help="Run even with DEBUG off")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("DEBUG вимкнено — це схоже на робочу базу. Додайте --force, якщо впевнені.")
+
+        self.rng = random.Random(options["seed"])
+        self.days = max(1, options["days"])
+
+        with transaction.atomic():
+            self._seed_reference(options["types"], options["locations"], options["positions"])
+            uav_ids = self._seed_uavs(options["uavs"])
+            self._seed_components(options["components"], uav_ids)
+            self._seed_movements(options["movements"], uav_ids)
+
+        self.stdout.write("Перебудова похідних таблиць…")
+        labels.rebuild_labels()
+        self._seed_status_logs(options["status_logs"], uav_ids)
+        inventory.rebuild_counters()
+        for start in range(0, len(uav_ids), BATCH_SIZE):
+            chunk = uav_ids[start:start + BATCH_SIZE]
+            UAVInstance.objects.all_with_deleted().filter(pk__gte=chunk[0], pk__lte=chunk[-1]).update(
+                kit_status=UAVInstance.kit_status_expression(),
+            )
+        indexed = search.reindex_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово: {len(uav_ids)} БПЛА, {len(self.fpv_types) + len(self.opt_types)} типів, "
+            f"пошуковий індекс: {indexed}."
+        ))
+
+    # ── Helpers ──────────────────────────────────────────────────────
+
+    def _day(self, offset):
+        """Aware datetime ``offset`` days ago (at a random hour)."""
+        day = timezone.localdate() - timedelta(days=offset)
+        moment = datetime.combine(day, time(hour=self.rng.randint(6, 20)))
+        return timezone.make_aware(moment) if settings.USE_TZ else moment
+
+    def _bulk_by_day(self, model, objects_by_day):
+        """bulk_create each day's rows, then stamp their created_at (auto_now_add)."""
+        ids = []
+        for offset, objs in sorted(objects_by_day.items(), reverse=True):
+            for start in range(0, len(objs), BATCH_SIZE):
+                created = model.objects.bulk_create(objs[start:start + BATCH_SIZE])
+                pks = [o.pk for o in created]
+                model.objects.filter(pk__gte=pks[0], pk__lte=pks[-1]).update(created_at=self._day(offset))
+                ids.extend(pks)
+        return ids
+
+    # ── Reference data ───────────────────────────────────────────────
+
+    def _seed_reference(self, n_types, n_locations, n_positions):
+        rng = self.rng
+        makers = [Manufacturer.objects.get_or_create(name=f"Бенч виробник {i}")[0] for i in range(1, 6)]
+        freqs = [
+            Frequency.objects.get_or_create(value=value, unit=unit)[0]
+            for value, unit in ((900, 'mhz'), (1.2, 'ghz'), (2.4, 'ghz'), (5.8, 'ghz'))
+        ]
+        self.roles = [DronePurpose.objects.get_or_create(name=name)[0] for name in ROLE_NAMES]
+        powers = [
+            PowerTemplate.objects.get_or_create(
+                name=f"Бенч {cfg.upper()} {cap}",
+                defaults={'connector': 'xt60', 'configuration': cfg, 'capacity': cap},
+            )[0]
+            for cfg, cap in (('4s1p', 5000), ('6s1p', 5000), ('6s2p', 8000), ('6s3p', 12000))
+        ]
+
+        fpv_ct = ContentType.objects.get_for_model(FPVDroneType)
+        opt_ct = ContentType.objects.get_for_model(OpticalDroneType)
+        self.fpv_types, self.opt_types = [], []
+        for i in range(1, n_types + 1):
+            model = DroneModel.objects.get_or_create(
+                name=f"Бенч модель {i}", manufacturer=makers[i % len(makers)],
+            )[0]
+            common = {
+                'model': model,
+                'prop_size': rng.choice(['7', '8', '10', '13']),
+                'power_template': rng.choice(powers),
+                'has_thermal': rng.random() < 0.3,
+                'purpose': rng.choice(self.roles),
+            }
+            if i % 4 == 0:
+                video = VideoTemplate.objects.get_or_create(
+                    name=f"Бенч котушка {i}",
+                    defaults={'drone_model': model, 'max_distance': rng.choice([5, 10, 15, 20])},
+                )[0]
+                self.opt_types.append(OpticalDroneType.objects.create(video_template=video, **common))
+            else:
+                dt = FPVDroneType.objects.create(video_frequency=rng.choice(freqs), **common)
+                dt.control_frequencies.set(rng.sample(freqs, 2))
+                self.fpv_types.append(dt)
+        self.types = (
+            [(fpv_ct.pk, dt) for dt in self.fpv_types]
+            + [(opt_ct.pk, dt) for dt in self.opt_types]
+        )
+
+        self.position_location = Location.objects.get_or_create(name="Позиція")[0]
+        self.locations = [self.position_location] + [
+            Location.objects.get_or_create(name=f"Бенч локація {i}", defaults={'can_repair': i % 3 == 0})[0]
+            for i in range(1, n_locations)
+        ]
+        self.positions = [Position.objects.get_or_create(name=f"Бенч позиція {i}")[0] for i in range(1, n_positions + 1)]
+        self.stdout.write(f"Довідники: {len(self.types)} типів, {len(self.locations)} локацій, {len(self.positions)} позицій.")
+
+    # ── UAVs ─────────────────────────────────────────────────────────
+
+    def _seed_uavs(self, n):
+        rng = self.rng
+        statuses = list(STATUS_WEIGHTS)
+        weights = list(STATUS_WEIGHTS.values())
+        type_attrs = {(ct_id, dt.pk): UAVInstance.type_attributes(dt) for ct_id, dt in self.types}
+        by_day = {}
+        for _ in range(n):
+            ct_id, dt = rng.choice(self.types)
+            status = rng.choices(statuses, weights)[0]
+            location = rng.choice(self.locations)
+            uav = UAVInstance(
+                content_type_id=ct_id, object_id=dt.pk, status=status,
+                current_location=location,
+                role=rng.choice(self.roles) if rng.random() < 0.8 else None,
+                notes=rng.choice(NOTE_WORDS),
+                kit_status=UAVInstance.KIT_NONE,
+                **type_attrs[(ct_id, dt.pk)],
+            )
+            if status == 'given' or location == self.position_location:
+                uav.current_location = self.position_location
+                uav.position = rng.choice(self.positions)
+            if status == 'transit':
+                uav.pending_to_location = rng.choice(self.locations)
+            by_day.setdefault(rng.randrange(self.days), []).append(uav)
+        ids = self._bulk_by_day(UAVInstance, by_day)
+        self.stdout.write(f"БПЛА: {len(ids)}")
+        return ids
+
+    # ── Components / history ─────────────────────────────────────────
+
+    def _seed_components(self, n, uav_ids):
+        rng = self.rng
+        powers = list(PowerTemplate.objects.filter(name__startswith="Бенч"))
+        videos = list(VideoTemplate.objects.filter(name__startswith="Бенч"))
+        active = dict(
+            UAVInstance.objects.filter(pk__in=rng.sample(uav_ids, min(len(uav_ids), n)))
+            .exclude(status='given')
+            .values_list('pk', 'type_power_template_id')
+        )
+        assignable = list(active.items())
+        by_day = {}
+        for i in range(n):
+            comp = Component(kind='battery', power_template=rng.choice(powers))
+            if videos and i % 5 == 0:
+                comp = Component(kind='spool', video_template=rng.choice(videos))
+            elif assignable and rng.random() < 0.7:
+                uav_id, power_id = assignable.pop()
+                comp.assigned_to_uav_id, comp.power_template_id = uav_id, power_id
+            if rng.random() < 0.05:
+                comp.status = 'damaged'
+                comp.assigned_to_uav_id = None
+            by_day.setdefault(rng.randrange(self.days), []).append(comp)
+        ids = self._bulk_by_day(Component, by_day)
+        self.stdout.write(f"Комплектуючі: {len(ids)}")
+
+    def _seed_movements(self, n, uav_ids):
+        if not uav_ids:
+            return
+        rng = self.rng
+        reasons = [code for code, _ in UAVMovement.REASON_CHOICES]
+        by_day = {}
+        for _ in range(n):
+            src, dst = rng.sample(self.locations, 2)
+            offset = rng.randrange(self.days)
+            by_day.setdefault(offset, []).append(UAVMovement(
+                uav_id=rng.choice(uav_ids), from_location=src, to_location=dst,
+                reason=rng.choice(reasons),
+                confirmed_at=self._day(offset) if rng.random() < 0.9 else None,
+            ))
+        ids = self._bulk_by_day(UAVMovement, by_day)
+        self.stdout.write(f"Переміщення: {len(ids)}")
+
+    def _seed_status_logs(self, n, uav_ids):
+        rng = self.rng
+        statuses = [s for s in STATUS_WEIGHTS if s != 'deleted']
+        if not uav_ids:
+            return
+        uav_types = {
+            pk: (ct_id, obj_id)
+            for pk, ct_id, obj_id in UAVInstance.objects.all_with_deleted().filter(pk__gte=uav_ids[0])
+            .values_list('pk', 'content_type_id', 'object_id')
+        }
+        by_day = {}
+        for _ in range(n):
+            uav_id = rng.choice(uav_ids)
+            from_status, to_status = rng.sample(statuses, 2)
+            by_day.setdefault(rng.randrange(self.days), []).append(UAVStatusLog(
+                uav_id=uav_id, from_status=from_status, to_status=to_status,
+                drone_type_label=labels.full_label(*uav_types[uav_id]),
+                drone_type_key=UAVStatusLog.type_key(*uav_types[uav_id]),
+            ))
+        with transaction.atomic():
+            ids = self._bulk_by_day(UAVStatusLog, by_day)
+        self.stdout.write(f"Журнал статусів: {len(ids)}")
@@ -10,6 +10,7 @@ Usage:
 
 from django.core.management.base import BaseCommand
 
+from equipment_accounting import inventory, labels, reference, search
 from equipment_accounting.models import (
     DronePurpose, FPVDroneType, OpticalDroneType, UAVInstance,
 )
@@ -34,7 +35,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('DronePurpose "Ударний" not found — nothing to do.'))
             return
 
-        uav_count = UAVInstance.objects.filter(role=ударний).exclude(status='deleted').count()
+        uav_count = UAVInstance.objects.filter(role=ударний).count()
         fpv_type_count = FPVDroneType.objects.filter(purpose=ударний).count()
         opt_type_count = OpticalDroneType.objects.filter(purpose=ударний).count()
 
@@ -52,7 +53,10 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(f'{action} DronePurpose "FPV" (pk={fpv.pk})'))
 
             if uav_count:
-                updated = UAVInstance.objects.filter(role=ударний).exclude(status='deleted').update(role=fpv)
+                # role is part of the counter key — keep the counters in step
+                pks = UAVInstance.objects.filter(role=ударний).values_list('pk', flat=True)
+                with inventory.tracked(pks):
+                    updated = UAVInstance.objects.filter(role=ударний).update(role=fpv)
                 self.stdout.write(self.style.SUCCESS(f'Updated {updated} UAVInstances: Ударний → FPV'))
             if fpv_type_count:
                 updated = FPVDroneType.objects.filter(purpose=ударний).update(purpose=fpv)
@@ -60,5 +64,11 @@ class Command(BaseCommand):
             if opt_type_count:
                 updated = OpticalDroneType.objects.filter(purpose=ударний).update(purpose=fpv)
                 self.stdout.write(self.style.SUCCESS(f'Updated {updated} OpticalDroneTypes: Ударний → FPV'))
+            reference.invalidate()
+            if fpv_type_count or opt_type_count:
+                # QuerySet.update() sends no post_save — labels and the search
+                # index (which holds the type label) must be rebuilt here
+                labels.rebuild_labels()
+                search.reindex_all()
         else:
             self.stdout.write(self.style.WARNING('Dry-run — use --commit to apply.'))
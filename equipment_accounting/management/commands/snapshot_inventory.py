@@ -0,0 +1,39 @@
+"""
+Store today's inventory snapshot for the trends page.
+
+Meant to run nightly (cron, shortly before midnight); running it again the
+same day replaces that day's rows.  --backfill reconstructs the snapshots of
+past days from the status log and movements, e.g. right after installing.
+
+Usage:
+  python manage.py snapshot_inventory                           # today's snapshot
+  python manage.py snapshot_inventory --backfill 180            # also the last 180 days
+  python manage.py snapshot_inventory --backfill 30 --overwrite # redo existing days
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from equipment_accounting.snapshots import backfill, take_snapshot
+
+
+class Command(BaseCommand):
+    help = "Store the daily UAV inventory snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--backfill", type=int, default=0, metavar="DAYS",
+                            help="Reconstruct the DAYS days before today from history")
+        parser.add_argument("--overwrite", action="store_true",
+                            help="With --backfill, replace days that already have a snapshot")
+
+    def handle(self, *args, **options):
+        if options["backfill"] < 0:
+            raise CommandError("--backfill має бути невід'ємним.")
+        if options["backfill"]:
+            written = backfill(options["backfill"], overwrite=options["overwrite"])
+            skipped = options["backfill"] - len(written)
+            self.stdout.write(
+                f"Відновлено днів: {len(written)}, рядків: {sum(written.values())}"
+                + (f" (пропущено вже наявних: {skipped})" if skipped else "")
+            )
+        rows = take_snapshot()
+        self.stdout.write(self.style.SUCCESS(f"Знімок інвентарю за сьогодні: {rows} рядків."))
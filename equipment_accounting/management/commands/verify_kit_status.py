@@ -0,0 +1,43 @@
+"""
+Verify the denormalized UAVInstance.kit_status against assigned components.
+
+Usage:
+  python manage.py verify_kit_status            # report and repair drift
+  python manage.py verify_kit_status --check    # report drift only
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from equipment_accounting.models import UAVInstance
+
+
+class Command(BaseCommand):
+    help = "Find and repair drones whose stored kit status disagrees with their components"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report mismatches, do not repair them",
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(
+            UAVInstance.objects.all_with_deleted()
+            .annotate(actual_kit=UAVInstance.kit_status_expression())
+            .exclude(kit_status=F("actual_kit"))
+            .values_list("pk", "kit_status", "actual_kit")
+        )
+        for pk, stored, actual in drifted:
+            self.stdout.write(f"  ≠ БПЛА #{pk}: збережено {stored}, фактично {actual}")
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Комплектність узгоджена."))
+            return
+        if options["check"]:
+            self.stdout.write(self.style.WARNING(f"\nРозбіжностей: {len(drifted)}"))
+            return
+
+        UAVInstance.refresh_kit_status([pk for pk, _, _ in drifted])
+        self.stdout.write(self.style.SUCCESS(f"\nВиправлено: {len(drifted)}"))
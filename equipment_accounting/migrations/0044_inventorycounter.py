@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+KEY_FIELDS = (
+    'content_type_id', 'object_id', 'current_location_id', 'position_id',
+    'pending_to_location_id', 'role_id', 'status',
+)
+
+
+def populate_counters(apps, schema_editor):
+    UAVInstance = apps.get_model('equipment_accounting', 'UAVInstance')
+    InventoryCounter = apps.get_model('equipment_accounting', 'InventoryCounter')
+    rows = (
+        UAVInstance.objects
+        .exclude(status='deleted')
+        .values(*KEY_FIELDS)
+        .annotate(n=models.Count('pk'))
+    )
+    InventoryCounter.objects.bulk_create([
+        InventoryCounter(count=row['n'], **{f: row[f] for f in KEY_FIELDS})
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('equipment_accounting', '0043_remove_component_component_status_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('ready', 'Готовий'), ('inspection', 'На перевірці'), ('repair', 'Ремонт'), ('deferred', 'Відкладено'), ('transit', 'В дорозі'), ('given', 'Віддано'), ('deleted', 'Видалено')], max_length=20, verbose_name='Статус')),
+                ('count', models.IntegerField(default=0, verbose_name='Кількість')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype', verbose_name='Тип БПЛА')),
+                ('current_location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment_accounting.location', verbose_name='Поточна локація')),
+                ('pending_to_location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment_accounting.location', verbose_name='Очікувана локація')),
+                ('position', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment_accounting.position', verbose_name='Позиція')),
+                ('role', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment_accounting.dronepurpose', verbose_name='Призначення')),
+            ],
+            options={
+                'verbose_name': 'Лічильник інвентарю',
+                'verbose_name_plural': 'Лічильники інвентарю',
+                'indexes': [models.Index(fields=['content_type', 'object_id'], name='invcounter_type_idx'), models.Index(fields=['status'], name='invcounter_status_idx')],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
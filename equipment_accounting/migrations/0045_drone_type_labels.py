@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('equipment_accounting', '0044_inventorycounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True, verbose_name='Ключ')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Версія')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Оновлено')),
+            ],
+            options={
+                'verbose_name': 'Версія кешу',
+                'verbose_name_plural': 'Версії кешу',
+            },
+        ),
+        migrations.CreateModel(
+            name='DroneTypeLabel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('list_label', models.CharField(max_length=255, verbose_name='Мітка для списку')),
+                ('export_label', models.CharField(max_length=255, verbose_name='Мітка для експорту')),
+                ('has_thermal', models.BooleanField(default=False, verbose_name='Термальна камера')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype', verbose_name='Тип БПЛА')),
+            ],
+            options={
+                'verbose_name': 'Мітка типу БПЛА',
+                'verbose_name_plural': 'Мітки типів БПЛА',
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+    ]
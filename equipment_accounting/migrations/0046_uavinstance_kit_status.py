@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:27
+
+from django.db import migrations, models
+
+
+def populate_kit_status(apps, schema_editor):
+    UAVInstance = apps.get_model('equipment_accounting', 'UAVInstance')
+    Component = apps.get_model('equipment_accounting', 'Component')
+    has_battery = models.Exists(Component.objects.filter(assigned_to_uav=models.OuterRef('pk'), kind='battery'))
+    has_spool = models.Exists(Component.objects.filter(assigned_to_uav=models.OuterRef('pk'), kind='spool'))
+    optical_ct_ids = list(
+        UAVInstance.objects.filter(content_type__model='opticaldronetype')
+        .values_list('content_type_id', flat=True).distinct()
+    )
+    UAVInstance.objects.update(kit_status=models.Case(
+        models.When(has_battery & has_spool, then=models.Value('full')),
+        models.When(has_battery & ~models.Q(content_type_id__in=optical_ct_ids), then=models.Value('full')),
+        models.When(has_battery | has_spool, then=models.Value('partial')),
+        default=models.Value('none'),
+        output_field=models.CharField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_accounting', '0045_drone_type_labels'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uavinstance',
+            name='kit_status',
+            field=models.CharField(choices=[('full', 'Повний'), ('partial', 'Неповний'), ('none', 'Некомплект')], db_index=True, default='none', max_length=10, verbose_name='Комплектність'),
+        ),
+        migrations.RunPython(populate_kit_status, migrations.RunPython.noop),
+    ]
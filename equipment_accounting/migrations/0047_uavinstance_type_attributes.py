@@ -0,0 +1,69 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_type_attributes(apps, schema_editor):
+    UAVInstance = apps.get_model('equipment_accounting', 'UAVInstance')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    for model_name, category in (('fpvdronetype', 'fpv'), ('opticaldronetype', 'optical')):
+        ct = ContentType.objects.filter(app_label='equipment_accounting', model=model_name).first()
+        if ct is None:
+            continue
+        DroneType = apps.get_model('equipment_accounting', model_name)
+        for dt in DroneType.objects.select_related(*(['video_template'] if category == 'optical' else [])):
+            vt = dt.video_template if category == 'optical' else None
+            UAVInstance.objects.filter(content_type=ct, object_id=dt.pk).update(
+                type_category=category,
+                type_has_thermal=dt.has_thermal,
+                type_model_id=dt.model_id,
+                type_power_template_id=dt.power_template_id,
+                type_video_model_id=vt.drone_model_id if vt else None,
+                type_is_analog=vt.is_analog if vt else None,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_accounting', '0046_uavinstance_kit_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uavinstance',
+            name='type_category',
+            field=models.CharField(blank=True, choices=[('fpv', 'Радіо'), ('optical', 'Оптика')], db_index=True, max_length=10, verbose_name='Категорія типу'),
+        ),
+        migrations.AddField(
+            model_name='uavinstance',
+            name='type_has_thermal',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Термальна камера'),
+        ),
+        migrations.AddField(
+            model_name='uavinstance',
+            name='type_is_analog',
+            field=models.BooleanField(blank=True, db_index=True, null=True, verbose_name='Аналоговий сигнал'),
+        ),
+        migrations.AddField(
+            model_name='uavinstance',
+            name='type_model',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment_accounting.dronemodel', verbose_name='Модель типу'),
+        ),
+        migrations.AddField(
+            model_name='uavinstance',
+            name='type_power_template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment_accounting.powertemplate', verbose_name='Шаблон живлення типу'),
+        ),
+        migrations.AddField(
+            model_name='uavinstance',
+            name='type_video_model',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment_accounting.dronemodel', verbose_name='Модель шаблону відео'),
+        ),
+        migrations.AddIndex(
+            model_name='uavinstance',
+            index=models.Index(fields=['type_category', 'type_has_thermal'], name='uav_type_cat_thermal_idx'),
+        ),
+        migrations.RunPython(populate_type_attributes, migrations.RunPython.noop),
+    ]
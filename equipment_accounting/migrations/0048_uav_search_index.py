@@ -0,0 +1,33 @@
+from django.db import migrations, transaction
+from django.db.utils import OperationalError
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS equipment_uav_search USING fts5("
+                "notes, type_label, manufacturer, location, position, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+    except OperationalError:
+        # SQLite built without FTS5 — search falls back to icontains
+        pass
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS equipment_uav_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_accounting', '0047_uavinstance_type_attributes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
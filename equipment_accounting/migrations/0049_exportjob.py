@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('equipment_accounting', '0048_uav_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=30, verbose_name='Вид експорту')),
+                ('fmt', models.CharField(max_length=10, verbose_name='Формат')),
+                ('params', models.TextField(blank=True, verbose_name='Параметри')),
+                ('key', models.CharField(db_index=True, max_length=64, verbose_name='Ключ')),
+                ('status', models.CharField(choices=[('pending', 'В черзі'), ('running', 'Формується'), ('done', 'Готово'), ('failed', 'Помилка')], db_index=True, default='pending', max_length=10, verbose_name='Статус')),
+                ('file_name', models.CharField(blank=True, max_length=255, verbose_name='Файл')),
+                ('download_name', models.CharField(blank=True, max_length=255, verbose_name="Ім'я для завантаження")),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='Розмір')),
+                ('error', models.TextField(blank=True, verbose_name='Помилка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Створено')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+                ('last_accessed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Останнє звернення')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Замовив')),
+            ],
+            options={
+                'verbose_name': 'Експорт',
+                'verbose_name_plural': 'Експорти',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:55
+
+from django.db import migrations, models
+from django.db.models.functions import Cast, Concat
+
+
+def populate_drone_type_key(apps, schema_editor):
+    # Older entries take the drone's current type (types rarely change after intake)
+    UAVInstance = apps.get_model('equipment_accounting', 'UAVInstance')
+    UAVStatusLog = apps.get_model('equipment_accounting', 'UAVStatusLog')
+    key = (
+        UAVInstance.objects
+        .filter(pk=models.OuterRef('uav_id'))
+        .annotate(key=Concat(
+            Cast('content_type_id', models.CharField()), models.Value('-'),
+            Cast('object_id', models.CharField()),
+            output_field=models.CharField(),
+        ))
+        .values('key')[:1]
+    )
+    UAVStatusLog.objects.update(drone_type_key=models.Subquery(key))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_accounting', '0049_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uavstatuslog',
+            name='drone_type_key',
+            field=models.CharField(blank=True, db_index=True, max_length=30, verbose_name='Ключ типу'),
+        ),
+        migrations.RunPython(populate_drone_type_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('equipment_accounting', '0050_uavstatuslog_drone_type_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySnapshotTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('dimension', models.CharField(choices=[('status', 'Статус'), ('location', 'Локація'), ('type', 'Тип'), ('role', 'Призначення')], max_length=10, verbose_name='Розріз')),
+                ('key', models.CharField(blank=True, max_length=30, verbose_name='Значення')),
+                ('count', models.IntegerField(default=0, verbose_name='Кількість')),
+            ],
+            options={
+                'verbose_name': 'Підсумок знімка інвентарю',
+                'verbose_name_plural': 'Підсумки знімків інвентарю',
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['dimension', 'date'], name='invsnaptotal_dim_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='InventorySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('object_id', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('ready', 'Готовий'), ('inspection', 'На перевірці'), ('repair', 'Ремонт'), ('deferred', 'Відкладено'), ('transit', 'В дорозі'), ('given', 'Віддано'), ('deleted', 'Видалено')], max_length=20, verbose_name='Статус')),
+                ('count', models.IntegerField(default=0, verbose_name='Кількість')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype', verbose_name='Тип БПЛА')),
+                ('current_location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment_accounting.location', verbose_name='Локація')),
+                ('role', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment_accounting.dronepurpose', verbose_name='Призначення')),
+            ],
+            options={
+                'verbose_name': 'Знімок інвентарю',
+                'verbose_name_plural': 'Знімки інвентарю',
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['date'], name='invsnapshot_date_idx'), models.Index(fields=['status', 'date'], name='invsnapshot_status_date_idx'), models.Index(fields=['content_type', 'object_id', 'date'], name='invsnapshot_type_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_accounting', '0051_inventorysnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['-created_at'], name='component_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['status', '-created_at'], name='component_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['kind', '-created_at'], name='component_kind_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uavmovement',
+            index=models.Index(fields=['-created_at'], name='uavmove_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uavmovement',
+            index=models.Index(fields=['reason', '-created_at'], name='uavmove_reason_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uavmovement',
+            index=models.Index(condition=models.Q(('confirmed_at__isnull', True)), fields=['uav', '-created_at', '-id'], name='uavmove_unconfirmed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uavstatuslog',
+            index=models.Index(fields=['to_status', '-created_at'], name='statuslog_to_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uavstatuslog',
+            index=models.Index(fields=['from_status', '-created_at'], name='statuslog_from_created_idx'),
+        ),
+    ]
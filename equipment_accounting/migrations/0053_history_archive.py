@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('equipment_accounting', '0052_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedStatusDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Дата')),
+                ('drone_type_label', models.CharField(blank=True, max_length=200, verbose_name='Тип БПЛА')),
+                ('drone_type_key', models.CharField(blank=True, max_length=30, verbose_name='Ключ типу')),
+                ('from_status', models.CharField(blank=True, choices=[('ready', 'Готовий'), ('inspection', 'На перевірці'), ('repair', 'Ремонт'), ('deferred', 'Відкладено'), ('transit', 'В дорозі'), ('given', 'Віддано'), ('deleted', 'Видалено')], max_length=20, verbose_name='Від')),
+                ('to_status', models.CharField(choices=[('ready', 'Готовий'), ('inspection', 'На перевірці'), ('repair', 'Ремонт'), ('deferred', 'Відкладено'), ('transit', 'В дорозі'), ('given', 'Віддано'), ('deleted', 'Видалено')], max_length=20, verbose_name='До')),
+                ('count', models.IntegerField(default=0, verbose_name='Кількість')),
+                ('latest', models.DateTimeField(verbose_name='Останнє')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_status_days', to=settings.AUTH_USER_MODEL, verbose_name='Хто змінив')),
+            ],
+            options={
+                'verbose_name': 'Архів змін статусів за день',
+                'verbose_name_plural': 'Архів змін статусів за дні',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['-day'], name='archstatus_day_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedMovementDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Дата')),
+                ('reason', models.CharField(choices=[('created', 'Надійшов'), ('given', 'Відданий'), ('repair', 'Ремонт'), ('returned', 'Повернуто'), ('transferred', 'Переміщено')], max_length=20, verbose_name='Причина')),
+                ('count', models.IntegerField(default=0, verbose_name='Кількість')),
+                ('last', models.DateTimeField(verbose_name='Останнє')),
+                ('from_location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment_accounting.location', verbose_name='Звідки')),
+                ('moved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Хто переміщав')),
+                ('to_location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment_accounting.location', verbose_name='Куди')),
+            ],
+            options={
+                'verbose_name': 'Архів переміщень за день',
+                'verbose_name_plural': 'Архів переміщень за дні',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['-day'], name='archmove_day_idx')],
+            },
+        ),
+    ]
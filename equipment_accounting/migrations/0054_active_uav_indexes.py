@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_accounting', '0053_history_archive'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='uavinstance',
+            name='uav_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='uavinstance',
+            name='uav_gfk_idx',
+        ),
+        migrations.AlterField(
+            model_name='uavinstance',
+            name='current_location',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='current_uavs', to='equipment_accounting.location', verbose_name='Поточна локація'),
+        ),
+        migrations.AddIndex(
+            model_name='uavinstance',
+            index=models.Index(condition=models.Q(('status', 'deleted'), _negated=True), fields=['status'], name='uav_active_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uavinstance',
+            index=models.Index(condition=models.Q(('status', 'deleted'), _negated=True), fields=['content_type', 'object_id'], name='uav_active_gfk_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uavinstance',
+            index=models.Index(condition=models.Q(('status', 'deleted'), _negated=True), fields=['current_location'], name='uav_active_location_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 
 
 # ============== ЛОКАЦІЇ ==============
@@ -368,6 +369,9 @@ class Component(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['assigned_to_uav', 'kind'], name='component_uav_kind_idx'),
+            models.Index(fields=['-created_at'], name='component_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='component_status_created_idx'),
+            models.Index(fields=['kind', '-created_at'], name='component_kind_created_idx'),
         ]
 
     def __str__(self):
@@ -380,6 +384,24 @@ class Component(models.Model):
 
 # ============== ІНВЕНТАРНІ ЕКЗЕМПЛЯРИ ==============
 
+class ActiveUAVManager(models.Manager):
+    """Default UAVInstance manager: soft-deleted drones are left out.
+
+    Related managers (``location.current_uavs``), model forms and querysets
+    built from ``UAVInstance.objects`` go through it, so their queries can use
+    the partial indexes on non-deleted rows.  ``all_with_deleted()`` is the
+    explicit way to include deleted drones; FK access (``movement.uav``),
+    ``refresh_from_db`` and deletion use the base manager and still see them.
+    ``dumpdata`` goes through the default manager too: use ``--all``.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().exclude(status='deleted')
+
+    def all_with_deleted(self):
+        return super().get_queryset()
+
+
 class UAVInstance(models.Model):
     """Конкретні екземпляри БПЛА в інвентарі"""
 
@@ -396,6 +418,15 @@ class UAVInstance(models.Model):
     # Statuses visible in the list (excludes soft-deleted)
     ACTIVE_STATUSES = ['ready', 'inspection', 'repair', 'deferred', 'transit']
 
+    KIT_FULL = 'full'
+    KIT_PARTIAL = 'partial'
+    KIT_NONE = 'none'
+    KIT_LABELS = {
+        'full': 'Повний',
+        'partial': 'Неповний',
+        'none': 'Некомплект',
+    }
+
     # Полиморфне посилання на тип БПЛА
     content_type = models.ForeignKey(
         ContentType,
@@ -416,6 +447,8 @@ class UAVInstance(models.Model):
         null=True, blank=True,
         on_delete=models.SET_NULL,
         related_name='current_uavs',
+        # Indexed for non-deleted drones only, see Meta.indexes
+        db_index=False,
         verbose_name="Поточна локація",
     )
     pending_to_location = models.ForeignKey(
@@ -447,24 +480,118 @@ class UAVInstance(models.Model):
         related_name='uavs',
         verbose_name="Позиція",
     )
+    # Denormalized from assigned components — see refresh_kit_status()
+    kit_status = models.CharField(
+        max_length=10,
+        choices=list(KIT_LABELS.items()),
+        default=KIT_NONE,
+        db_index=True,
+        verbose_name="Комплектність",
+    )
+
+    # Denormalized from the drone type — see type_attributes()/sync_type_attributes()
+    CATEGORY_CHOICES = [
+        ('fpv', 'Радіо'),
+        ('optical', 'Оптика'),
+    ]
+    type_category = models.CharField(
+        max_length=10,
+        choices=CATEGORY_CHOICES,
+        blank=True,
+        db_index=True,
+        verbose_name="Категорія типу",
+    )
+    type_has_thermal = models.BooleanField(
+        default=False,
+        db_index=True,
+        verbose_name="Термальна камера",
+    )
+    type_model = models.ForeignKey(
+        'DroneModel',
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Модель типу",
+    )
+    type_power_template = models.ForeignKey(
+        'PowerTemplate',
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Шаблон живлення типу",
+    )
+    type_video_model = models.ForeignKey(
+        'DroneModel',
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Модель шаблону відео",
+    )
+    type_is_analog = models.BooleanField(
+        null=True, blank=True,
+        db_index=True,
+        verbose_name="Аналоговий сигнал",
+    )
 
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Створено")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
 
+    objects = ActiveUAVManager()
+
     class Meta:
         verbose_name = "БПЛА (екземпляр)"
         verbose_name_plural = "БПЛА (екземпляри)"
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['status'], name='uav_status_idx'),
+            # Partial: soft-deleted drones only accumulate and are never listed
+            models.Index(fields=['status'], name='uav_active_status_idx', condition=~models.Q(status='deleted')),
             models.Index(fields=['created_at'], name='uav_created_at_idx'),
-            models.Index(fields=['content_type', 'object_id'], name='uav_gfk_idx'),
+            models.Index(
+                fields=['content_type', 'object_id'], name='uav_active_gfk_idx',
+                condition=~models.Q(status='deleted'),
+            ),
+            models.Index(
+                fields=['current_location'], name='uav_active_location_idx',
+                condition=~models.Q(status='deleted'),
+            ),
             models.Index(fields=['status', 'content_type', 'object_id'], name='uav_status_gfk_idx'),
+            models.Index(fields=['type_category', 'type_has_thermal'], name='uav_type_cat_thermal_idx'),
         ]
 
     def __str__(self):
         return f"БПЛА #{self.pk} - {self.uav_type}"
 
+    def save(self, *args, **kwargs):
+        # Full saves may change the drone type — refresh the copied attributes
+        if kwargs.get('update_fields') is None and self.content_type_id and self.object_id:
+            drone_type = self.uav_type
+            if drone_type is not None:
+                for field, value in self.type_attributes(drone_type).items():
+                    setattr(self, field, value)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def type_attributes(drone_type):
+        """Return the denormalized type_* field values for a drone type."""
+        is_opt = isinstance(drone_type, OpticalDroneType)
+        video_template = drone_type.video_template if is_opt else None
+        return {
+            'type_category': 'optical' if is_opt else 'fpv',
+            'type_has_thermal': drone_type.has_thermal,
+            'type_model_id': drone_type.model_id,
+            'type_power_template_id': drone_type.power_template_id,
+            'type_video_model_id': video_template.drone_model_id if video_template else None,
+            'type_is_analog': video_template.is_analog if video_template else None,
+        }
+
+    @classmethod
+    def sync_type_attributes(cls, drone_type):
+        """Copy a (changed) drone type's attributes onto all its drones, deleted ones included."""
+        cls._base_manager.filter(
+            content_type=ContentType.objects.get_for_model(drone_type),
+            object_id=drone_type.pk,
+        ).update(**cls.type_attributes(drone_type))
+
     def get_category(self):
         type_map = {
             'fpvdronetype': 'Радіо',
@@ -472,36 +599,39 @@ class UAVInstance(models.Model):
         }
         return type_map.get(self.content_type.model, 'Невідомо')
 
-    KIT_FULL = 'full'
-    KIT_PARTIAL = 'partial'
-    KIT_NONE = 'none'
-    KIT_LABELS = {
-        'full': 'Повний',
-        'partial': 'Неповний',
-        'none': 'Некомплект',
-    }
-
     def get_kit_status(self):
-        """Compute kit completeness based on assigned components.
+        """Kit completeness, stored in ``kit_status`` — no DB queries.
 
-        Uses prefetch cache (list iteration) — no extra DB queries.
         Expected: FPV → 1 battery; Optical → 1 battery + 1 spool.
         """
-        assigned = list(self.components.all())
-        if not assigned:
-            return self.KIT_NONE
-
-        has_battery = any(c.kind == 'battery' for c in assigned)
-
-        if self.content_type.model == 'opticaldronetype':
-            has_spool = any(c.kind == 'spool' for c in assigned)
-            if has_battery and has_spool:
-                return self.KIT_FULL
-            return self.KIT_PARTIAL
-        return self.KIT_FULL if has_battery else self.KIT_PARTIAL
+        return self.kit_status
 
     def get_kit_status_display(self):
-        return self.KIT_LABELS[self.get_kit_status()]
+        return self.KIT_LABELS[self.kit_status]
+
+    @classmethod
+    def kit_status_expression(cls):
+        """SQL expression computing kit status from the assigned components."""
+        has_battery = models.Exists(Component.objects.filter(assigned_to_uav=models.OuterRef('pk'), kind='battery'))
+        has_spool = models.Exists(Component.objects.filter(assigned_to_uav=models.OuterRef('pk'), kind='spool'))
+        optical = models.Q(content_type_id=ContentType.objects.get_for_model(OpticalDroneType).pk)
+        return models.Case(
+            models.When(has_battery & has_spool, then=models.Value(cls.KIT_FULL)),
+            models.When(has_battery & ~optical, then=models.Value(cls.KIT_FULL)),
+            models.When(has_battery | has_spool, then=models.Value(cls.KIT_PARTIAL)),
+            default=models.Value(cls.KIT_NONE),
+            output_field=models.CharField(),
+        )
+
+    @classmethod
+    def refresh_kit_status(cls, pks):
+        """Recompute ``kit_status`` for the given UAV PKs in one UPDATE.
+
+        Call after any change to which components are assigned to a drone.
+        """
+        pks = [pk for pk in pks if pk]
+        if pks:
+            cls._base_manager.filter(pk__in=pks).update(kit_status=cls.kit_status_expression())
 
 
 class UAVMovement(models.Model):
@@ -565,6 +695,15 @@ class UAVMovement(models.Model):
         verbose_name = "Переміщення БПЛА"
         verbose_name_plural = "Переміщення БПЛА"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='uavmove_created_idx'),
+            models.Index(fields=['reason', '-created_at'], name='uavmove_reason_created_idx'),
+            # Latest unconfirmed movement of a drone in transit
+            models.Index(
+                fields=['uav', '-created_at', '-id'], name='uavmove_unconfirmed_idx',
+                condition=models.Q(confirmed_at__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         frm = self.from_location or "—"
@@ -597,6 +736,8 @@ class UAVStatusLog(models.Model):
     )
     # Snapshot of the drone type label at the moment of the change
     drone_type_label = models.CharField(max_length=200, blank=True, verbose_name="Тип БПЛА")
+    # "<content_type_id>-<object_id>" of the drone type — what the type filter matches
+    drone_type_key = models.CharField(max_length=30, blank=True, db_index=True, verbose_name="Ключ типу")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Коли")
 
     class Meta:
@@ -606,11 +747,370 @@ class UAVStatusLog(models.Model):
         indexes = [
             models.Index(fields=['-created_at'], name='statuslog_created_idx'),
             models.Index(fields=['uav'], name='statuslog_uav_idx'),
+            models.Index(fields=['to_status', '-created_at'], name='statuslog_to_created_idx'),
+            models.Index(fields=['from_status', '-created_at'], name='statuslog_from_created_idx'),
         ]
 
     def __str__(self):
         return f"БПЛА #{self.uav_id}: {self.from_status} → {self.to_status}"
 
+    @staticmethod
+    def type_key(content_type_id, object_id):
+        return f"{content_type_id}-{object_id}"
+
+    def save(self, *args, **kwargs):
+        # bulk_create callers set the key themselves
+        if not self.drone_type_key and self.uav_id:
+            self.drone_type_key = self.type_key(self.uav.content_type_id, self.uav.object_id)
+        super().save(*args, **kwargs)
+
+
+class ArchivedMovementDay(models.Model):
+    """Per-day totals of UAVMovement rows moved to the history archive.
+
+    One row per (day, reason, from, to, user) — the grouping of the movements
+    page — written by ``python manage.py archive_history``; the rows themselves
+    live in the archive files.  See ``equipment_accounting.history_archive``.
+    """
+
+    day = models.DateField(verbose_name="Дата")
+    reason = models.CharField(
+        max_length=20,
+        choices=UAVMovement.REASON_CHOICES,
+        verbose_name="Причина",
+    )
+    from_location = models.ForeignKey(
+        Location,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Звідки",
+    )
+    to_location = models.ForeignKey(
+        Location,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Куди",
+    )
+    moved_by = models.ForeignKey(
+        User,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Хто переміщав",
+    )
+    count = models.IntegerField(default=0, verbose_name="Кількість")
+    last = models.DateTimeField(verbose_name="Останнє")
+
+    class Meta:
+        verbose_name = "Архів переміщень за день"
+        verbose_name_plural = "Архів переміщень за дні"
+        ordering = ['-day']
+        indexes = [
+            models.Index(fields=['-day'], name='archmove_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.reason}: {self.count}"
+
+
+class ArchivedStatusDay(models.Model):
+    """Per-day totals of UAVStatusLog rows moved to the history archive.
+
+    One row per (day, drone type, from→to, user) — the grouping of the status
+    log page.  See ``equipment_accounting.history_archive``.
+    """
+
+    day = models.DateField(verbose_name="Дата")
+    drone_type_label = models.CharField(max_length=200, blank=True, verbose_name="Тип БПЛА")
+    drone_type_key = models.CharField(max_length=30, blank=True, verbose_name="Ключ типу")
+    from_status = models.CharField(
+        max_length=20, blank=True, verbose_name="Від",
+        choices=UAVInstance.STATUS_CHOICES,
+    )
+    to_status = models.CharField(
+        max_length=20, verbose_name="До",
+        choices=UAVInstance.STATUS_CHOICES,
+    )
+    changed_by = models.ForeignKey(
+        User,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_status_days',
+        verbose_name="Хто змінив",
+    )
+    count = models.IntegerField(default=0, verbose_name="Кількість")
+    latest = models.DateTimeField(verbose_name="Останнє")
+
+    class Meta:
+        verbose_name = "Архів змін статусів за день"
+        verbose_name_plural = "Архів змін статусів за дні"
+        ordering = ['-day']
+        indexes = [
+            models.Index(fields=['-day'], name='archstatus_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.from_status} → {self.to_status}: {self.count}"
+
+
+class InventoryCounter(models.Model):
+    """Denormalized UAV count per (type, location, position, destination, role, status).
+
+    Kept in step with UAVInstance by ``equipment_accounting.inventory.tracked``
+    on every write path; soft-deleted drones are never counted.  Rebuild with
+    ``python manage.py rebuild_inventory_counters`` if it ever drifts.
+    """
+
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Тип БПЛА",
+    )
+    object_id = models.PositiveIntegerField()
+    current_location = models.ForeignKey(
+        Location,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Поточна локація",
+    )
+    position = models.ForeignKey(
+        Position,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Позиція",
+    )
+    pending_to_location = models.ForeignKey(
+        Location,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Очікувана локація",
+    )
+    role = models.ForeignKey(
+        DronePurpose,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Призначення",
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=UAVInstance.STATUS_CHOICES,
+        verbose_name="Статус",
+    )
+    count = models.IntegerField(default=0, verbose_name="Кількість")
+
+    class Meta:
+        verbose_name = "Лічильник інвентарю"
+        verbose_name_plural = "Лічильники інвентарю"
+        indexes = [
+            models.Index(fields=['content_type', 'object_id'], name='invcounter_type_idx'),
+            models.Index(fields=['status'], name='invcounter_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type_id}-{self.object_id} [{self.status}]: {self.count}"
+
+
+class InventorySnapshot(models.Model):
+    """End-of-day UAV count per (type, status, location, role) for trend reports.
+
+    Written once a day by ``python manage.py snapshot_inventory`` from the
+    inventory counters; past days can be reconstructed from the movement and
+    status history with ``--backfill``.  See ``equipment_accounting.snapshots``.
+    """
+
+    date = models.DateField(verbose_name="Дата")
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Тип БПЛА",
+    )
+    object_id = models.PositiveIntegerField()
+    status = models.CharField(
+        max_length=20,
+        choices=UAVInstance.STATUS_CHOICES,
+        verbose_name="Статус",
+    )
+    current_location = models.ForeignKey(
+        Location,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Локація",
+    )
+    role = models.ForeignKey(
+        DronePurpose,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Призначення",
+    )
+    count = models.IntegerField(default=0, verbose_name="Кількість")
+
+    class Meta:
+        verbose_name = "Знімок інвентарю"
+        verbose_name_plural = "Знімки інвентарю"
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['date'], name='invsnapshot_date_idx'),
+            models.Index(fields=['status', 'date'], name='invsnapshot_status_date_idx'),
+            models.Index(fields=['content_type', 'object_id', 'date'], name='invsnapshot_type_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.content_type_id}-{self.object_id} [{self.status}]: {self.count}"
+
+
+class InventorySnapshotTotal(models.Model):
+    """Daily InventorySnapshot total along one dimension — what an unfiltered trend chart reads.
+
+    A few dozen rows per day instead of one per (type, status, location,
+    role), written together with the snapshot rows of the same day.
+    """
+
+    DIMENSION_CHOICES = [
+        ('status', 'Статус'),
+        ('location', 'Локація'),
+        ('type', 'Тип'),
+        ('role', 'Призначення'),
+    ]
+
+    date = models.DateField(verbose_name="Дата")
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES, verbose_name="Розріз")
+    # Status code, location / role PK or "ct_id-obj_id" type key; empty when unset
+    key = models.CharField(max_length=30, blank=True, verbose_name="Значення")
+    count = models.IntegerField(default=0, verbose_name="Кількість")
+
+    class Meta:
+        verbose_name = "Підсумок знімка інвентарю"
+        verbose_name_plural = "Підсумки знімків інвентарю"
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['dimension', 'date'], name='invsnaptotal_dim_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.dimension}={self.key}: {self.count}"
+
+
+class CacheVersion(models.Model):
+    """Version stamp shared by all worker processes for one cached dataset.
+
+    A process keeps its own in-memory copy and reloads it when the stored
+    stamp differs from the one it loaded; writers call ``bump``.
+    """
+
+    key = models.CharField(max_length=50, unique=True, verbose_name="Ключ")
+    version = models.PositiveIntegerField(default=0, verbose_name="Версія")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
+
+    class Meta:
+        verbose_name = "Версія кешу"
+        verbose_name_plural = "Версії кешу"
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+    @classmethod
+    def stamp(cls, key):
+        """Return (version, updated_at) for ``key``, or None if never bumped.
+
+        The timestamp disambiguates equal counters after a restore/rollback.
+        """
+        return cls.objects.filter(key=key).values_list('version', 'updated_at').first()
+
+    @classmethod
+    def bump(cls, key):
+        now = timezone.now()
+        if not cls.objects.filter(key=key).update(version=models.F('version') + 1, updated_at=now):
+            cls.objects.create(key=key, version=1)
+
+
+class DroneTypeLabel(models.Model):
+    """Precomputed display labels for one FPV/optical drone type.
+
+    Rebuilt by ``equipment_accounting.signals`` whenever the type or anything
+    its label is made of changes; read through ``equipment_accounting.labels``.
+    """
+
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Тип БПЛА",
+    )
+    object_id = models.PositiveIntegerField()
+    list_label = models.CharField(max_length=255, verbose_name="Мітка для списку")
+    export_label = models.CharField(max_length=255, verbose_name="Мітка для експорту")
+    has_thermal = models.BooleanField(default=False, verbose_name="Термальна камера")
+
+    class Meta:
+        verbose_name = "Мітка типу БПЛА"
+        verbose_name_plural = "Мітки типів БПЛА"
+        unique_together = ['content_type', 'object_id']
+
+    def __str__(self):
+        return self.list_label
+
+
+class ExportJob(models.Model):
+    """One requested export, built by the ``run_export_jobs`` worker.
+
+    ``key`` identifies the output (kind, format, normalized params and the
+    inventory/label versions it was built from); a finished job is served to
+    every later request with the same key until the inventory changes.
+    A running job belongs to ``worker``, which refreshes ``heartbeat_at``
+    while it builds the file.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'В черзі'),
+        (STATUS_RUNNING, 'Формується'),
+        (STATUS_DONE, 'Готово'),
+        (STATUS_FAILED, 'Помилка'),
+    ]
+
+    kind = models.CharField(max_length=30, verbose_name="Вид експорту")
+    fmt = models.CharField(max_length=10, verbose_name="Формат")
+    params = models.TextField(blank=True, verbose_name="Параметри")
+    key = models.CharField(max_length=64, db_index=True, verbose_name="Ключ")
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING,
+        db_index=True, verbose_name="Статус",
+    )
+    file_name = models.CharField(max_length=255, blank=True, verbose_name="Файл")
+    download_name = models.CharField(max_length=255, blank=True, verbose_name="Ім'я для завантаження")
+    size = models.PositiveBigIntegerField(default=0, verbose_name="Розмір")
+    error = models.TextField(blank=True, verbose_name="Помилка")
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='+', verbose_name="Замовив",
+    )
+    worker = models.CharField(max_length=100, blank=True, verbose_name="Воркер")
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="Останній сигнал воркера")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Створено")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершено")
+    last_accessed_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Останнє звернення")
+
+    class Meta:
+        verbose_name = "Експорт"
+        verbose_name_plural = "Експорти"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.kind}.{self.fmt} #{self.pk} ({self.get_status_display()})"
+
 
 def _uav_photo_path(instance, filename):
     return f"uav_photos/{instance.uav_id}/{filename}"
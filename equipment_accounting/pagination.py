@@ -0,0 +1,107 @@
+"""Keyset (cursor) pagination for grouped querysets.
+
+Offset pagination has to aggregate and skip every row before the requested
+page; a keyset page instead filters on the last seen key, so the database only
+ever produces ``per_page + 1`` groups regardless of how deep the page is.
+
+The cursor is the page boundary key encoded as ``value.value.…``; it travels
+in ``?after=`` (next page) or ``?before=`` (previous page).
+"""
+
+from django.db.models import Q
+
+CURSOR_SEP = '.'
+
+
+def encode_cursor(values):
+    return CURSOR_SEP.join(str(v) for v in values)
+
+
+def decode_cursor(raw, converters):
+    """Parse a cursor string with one converter per key field; None if invalid."""
+    if not raw:
+        return None
+    parts = raw.split(CURSOR_SEP)
+    if len(parts) != len(converters):
+        return None
+    try:
+        return tuple(conv(part) for conv, part in zip(converters, parts))
+    except (TypeError, ValueError):
+        return None
+
+
+def _keyset_q(keys, values, forward):
+    """Q selecting rows strictly past ``values`` in ``keys`` order.
+
+    keys: sequence of (field, descending).  For the key (a desc, b asc) and
+    forward=True this is ``a < va OR (a = va AND b > vb)``.
+    """
+    q = Q()
+    for i, (field, desc) in enumerate(keys):
+        lookup = 'lt' if desc == forward else 'gt'
+        term = Q(**{f'{field}__{lookup}': values[i]})
+        for j, (prev_field, _) in enumerate(keys[:i]):
+            term &= Q(**{prev_field: values[j]})
+        q |= term
+    return q
+
+
+class KeysetPage:
+    """A page of rows plus the cursors to its neighbours.
+
+    Iterable like a Paginator page; ``has_other_pages`` mirrors
+    ``django.core.paginator.Page`` so templates read the same way.  Cursors are
+    taken from the raw rows up front, so callers may replace ``object_list``
+    with display objects built from them.
+    """
+
+    def __init__(self, object_list, keys, has_previous, has_next, cursor=''):
+        self.object_list = object_list
+        self._has_previous = has_previous
+        self._has_next = has_next
+        # An empty page (its groups vanished, or a stale cursor) links back
+        # through the cursor it was requested with
+        first = _row_cursor(object_list[0], keys) if object_list else cursor
+        last = _row_cursor(object_list[-1], keys) if object_list else cursor
+        self.previous_cursor = first if has_previous else ''
+        self.next_cursor = last if has_next else ''
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+
+def _row_cursor(row, keys):
+    return encode_cursor(row[field] for field, _ in keys)
+
+
+def paginate_keyset(qs, keys, after=None, before=None, per_page=20):
+    """Return a KeysetPage of ``qs`` ordered by ``keys``.
+
+    qs must yield dicts (``values()``) containing every key field; ``after`` /
+    ``before`` are decoded cursors.  Only ``per_page + 1`` rows are fetched —
+    the extra row just tells whether another page exists.
+    """
+    keys = list(keys)
+    order = [('-' if desc else '') + field for field, desc in keys]
+    if before is not None:
+        reverse_order = [o[1:] if o.startswith('-') else '-' + o for o in order]
+        rows = list(qs.filter(_keyset_q(keys, before, forward=False)).order_by(*reverse_order)[:per_page + 1])
+        has_previous = len(rows) > per_page
+        return KeysetPage(rows[:per_page][::-1], keys, has_previous, True, encode_cursor(before))
+    if after is not None:
+        qs = qs.filter(_keyset_q(keys, after, forward=True))
+    rows = list(qs.order_by(*order)[:per_page + 1])
+    return KeysetPage(rows[:per_page], keys, after is not None, len(rows) > per_page,
+                      encode_cursor(after) if after is not None else '')
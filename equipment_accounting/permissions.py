@@ -0,0 +1,71 @@
+"""Per-request permission snapshot for the equipment views.
+
+``for_request`` resolves the user's permission set once (from the cache
+primed by ``app_drones.user_cache``) and turns it into ``can_*`` attributes:
+``can_add_uav``, ``can_edit_location``, ``can_tab_types`` and so on.  The
+view decorators and the equipment list read these flags instead of calling
+``has_perm`` for every check; ``as_context`` hands the same flags to
+templates under their existing names.
+"""
+
+APP = 'equipment_accounting'
+
+# Flag suffix → model codename
+MODELS = {
+    'uav': 'uavinstance',
+    'component': 'component',
+    'manufacturer': 'manufacturer',
+    'dronemodel': 'dronemodel',
+    'fpvtype': 'fpvdronetype',
+    'opticaltype': 'opticaldronetype',
+    'powertemplate': 'powertemplate',
+    'videotemplate': 'videotemplate',
+    'location': 'location',
+    'position': 'position',
+}
+
+# Flag prefix → permission action
+ACTIONS = {'view': 'view', 'add': 'add', 'edit': 'change', 'delete': 'delete'}
+
+
+class PermissionSnapshot:
+    """The equipment permissions of one user, as plain boolean attributes."""
+
+    def __init__(self, user):
+        self.user_id = user.pk
+        self.perms = frozenset(user.get_all_permissions()) if user.is_active else frozenset()
+        for flag, model in MODELS.items():
+            for prefix, action in ACTIONS.items():
+                setattr(self, f'can_{prefix}_{flag}', f'{APP}.{action}_{model}' in self.perms)
+
+        self.is_master = self._any('uav')
+        self.can_see_powertemplate = self._any('powertemplate')
+        self.can_see_videotemplate = self._any('videotemplate')
+        self.can_tab_components = (
+            self.can_add_component or self.can_edit_component or self.can_delete_component
+        )
+        self.can_tab_types = any(
+            self._any(flag) for flag in ('manufacturer', 'dronemodel', 'fpvtype', 'opticaltype')
+        )
+        self.can_tab_templates = self.can_see_powertemplate or self.can_see_videotemplate
+        self.can_tab_locations = self._any('location') or self._any('position')
+
+    def _any(self, flag):
+        """True if the user has any of view/add/change/delete on the ``flag`` model."""
+        return any(getattr(self, f'can_{prefix}_{flag}') for prefix in ACTIONS)
+
+    def has(self, perm):
+        """Same answer as ``user.has_perm(perm)`` for a model permission."""
+        return perm in self.perms
+
+    def as_context(self):
+        """Return the ``can_*`` flags as a template context dict."""
+        return {name: value for name, value in vars(self).items() if name.startswith('can_')}
+
+
+def for_request(request):
+    """Return the permission snapshot of ``request.user``, computed once per request."""
+    snapshot = getattr(request, '_equipment_perms', None)
+    if snapshot is None or snapshot.user_id != request.user.pk:
+        snapshot = request._equipment_perms = PermissionSnapshot(request.user)
+    return snapshot
@@ -0,0 +1,298 @@
+"""EXPLAIN QUERY PLAN checks for the project's hot querysets.
+
+``CATALOGUE`` rebuilds the querysets the busiest views and background jobs
+run — same filters, same ordering, placeholder parameter values — and
+``check`` asks SQLite how it would execute each one.  A plan step that scans a
+whole table, or sorts/groups through a temporary B-tree, is flagged unless
+the catalogue marks it as reviewed and accepted; for a query that has an
+index meant to serve it, the report also says whether that index exists in
+the database.
+
+Querysets are only planned, never executed, so the check is safe against a
+production copy.  Used by ``python manage.py analyze_queries``.
+"""
+
+import re
+from datetime import timedelta
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from django.db import connection
+from django.db.models import Count, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from app_drones.user_cache import ACTIVE_ORDER_STATUSES
+
+from .models import (
+    ArchivedMovementDay, ArchivedStatusDay, Component, InventoryCounter, UAVInstance, UAVMovement,
+    UAVStatusLog,
+)
+
+# Placeholder parameter values; plans do not depend on them
+SOME_ID = 1
+SOME_KEY = '1-1'
+
+# "SCAN <table>" without an index reads every row; "SCAN <table> USING INDEX"
+# walks an index in order and is how SQLite serves ORDER BY … LIMIT
+_FULL_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW)(?!\()(?!.*\bINDEX\b)')
+_TEMP_BTREE = re.compile(r'^USE TEMP B-TREE FOR ')
+
+
+def _since(days):
+    return timezone.now() - timedelta(days=days)
+
+
+def _uav_movements(**filters):
+    return (
+        UAVMovement.objects.filter(**filters)
+        .annotate(day=TruncDate('created_at'))
+        .values('day').annotate(count=Count('pk')).order_by('-day')
+    )
+
+
+def _uav_movements_page():
+    return (
+        UAVMovement.objects
+        .annotate(day=TruncDate('created_at'))
+        .filter(created_at__gte=_since(30), created_at__lt=timezone.now())
+        .values('day', 'reason', 'from_location_id', 'to_location_id', 'moved_by_id')
+        .annotate(count=Count('pk'), last=Max('created_at'))
+        .order_by('-day', '-last')
+    )
+
+
+def _uav_movements_by_location():
+    return _uav_movements().filter(Q(from_location_id=SOME_ID) | Q(to_location_id=SOME_ID))
+
+
+def _pending_movements():
+    latest = (
+        UAVMovement.objects
+        .filter(uav=OuterRef('pk'), confirmed_at__isnull=True)
+        .order_by('-created_at', '-pk')
+        .values('pk')[:1]
+    )
+    return UAVInstance.objects.filter(pk__in=[SOME_ID], status='transit').annotate(movement_id=Subquery(latest))
+
+
+def _status_log(**filters):
+    return (
+        UAVStatusLog.objects.filter(**filters)
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'drone_type_label', 'from_status', 'to_status', 'changed_by_id')
+        .annotate(count=Count('pk'), last=Max('created_at'))
+        .order_by('-day', '-last')[:50]
+    )
+
+
+def _archived_movement_days():
+    return ArchivedMovementDay.objects.values('day').annotate(count=Sum('count')).order_by('-day')
+
+
+def _archived_status_log():
+    return (
+        ArchivedStatusDay.objects
+        .values('day', 'drone_type_label', 'from_status', 'to_status', 'changed_by_id')
+        .annotate(count=Sum('count'), latest=Max('latest'))
+        .order_by('-latest')[:50]
+    )
+
+
+def _uavs(**filters):
+    return UAVInstance.objects.filter(**filters).order_by()
+
+
+def _components(**filters):
+    return Component.objects.exclude(status='given').filter(**filters).order_by('-created_at')[:20]
+
+
+def _component_summary():
+    return (
+        Component.objects.exclude(status='given')
+        .filter(kind__in=('battery', 'spool'))
+        .values('kind', 'status').annotate(cnt=Count('pk'))
+    )
+
+
+def _free_batteries():
+    return Component.objects.filter(
+        assigned_to_uav=None, status__in=['in_use', 'disassembled'],
+        kind='battery', power_template_id=SOME_ID,
+    )
+
+
+def _available_uavs():
+    occupied = Component.objects.filter(kind='battery', assigned_to_uav__isnull=False)
+    return (
+        UAVInstance.objects.filter(status__in=UAVInstance.ACTIVE_STATUSES)
+        .exclude(pk__in=occupied.values_list('assigned_to_uav_id', flat=True))
+    )
+
+
+def _workshop_orders():
+    from pilots.models import DroneOrder
+    return DroneOrder.objects.filter(status__in=ACTIVE_ORDER_STATUSES).order_by('pilot__id', '-created_at')
+
+
+def _active_orders_count():
+    from pilots.models import DroneOrder
+    return DroneOrder.objects.filter(status__in=ACTIVE_ORDER_STATUSES).values('status').annotate(n=Count('pk'))
+
+
+def _orders_archive():
+    from pilots.models import DroneOrder
+    return DroneOrder.objects.filter(status__in=['delivered', 'cancelled']).order_by('-updated_at')
+
+
+def _my_orders():
+    from pilots.models import DroneOrder
+    return DroneOrder.objects.filter(pilot_id=SOME_ID).order_by('-created_at')
+
+
+def _strike_reports(**filters):
+    from pilots.models import StrikeReport
+    return StrikeReport.objects.filter(**filters).order_by('-reported_at')
+
+
+def _snapshot_status_events():
+    return UAVStatusLog.objects.filter(created_at__gte=_since(90)).values_list('created_at', 'uav_id', 'from_status')
+
+
+def _counter_totals():
+    return InventoryCounter.objects.values('status').annotate(n=Sum('count'))
+
+
+class HotQuery(NamedTuple):
+    name: str
+    source: str                 # where the real query runs
+    queryset: Callable          # builds the queryset to plan
+    index: Optional[Tuple[str, str]] = None   # (table, index name) meant to serve it
+    accepted: Tuple[str, ...] = ()            # problem kinds reviewed and accepted
+
+
+# Grouping by calendar day sorts on an expression no index can provide
+DAY_GROUPING = ('temp_btree',)
+# ... and without a filter every row is part of some group
+DAY_GROUPING_ALL = ('scan', 'temp_btree')
+
+CATALOGUE = [
+    HotQuery('movements.days', 'views.uav_movements', _uav_movements, accepted=DAY_GROUPING_ALL),
+    HotQuery('movements.days.reason', 'views.uav_movements', lambda: _uav_movements(reason='given'),
+             ('equipment_accounting_uavmovement', 'uavmove_reason_created_idx'), DAY_GROUPING),
+    HotQuery('movements.days.location', 'views.uav_movements', _uav_movements_by_location,
+             accepted=DAY_GROUPING),
+    HotQuery('movements.page', 'views.uav_movements', _uav_movements_page,
+             ('equipment_accounting_uavmovement', 'uavmove_created_idx'), DAY_GROUPING),
+    HotQuery('movements.pending', 'arrivals.pending_movements', _pending_movements,
+             ('equipment_accounting_uavmovement', 'uavmove_unconfirmed_idx')),
+    HotQuery('status_log.page', 'views.uav_status_log', _status_log, accepted=DAY_GROUPING_ALL),
+    HotQuery('status_log.to_status', 'views.uav_status_log', lambda: _status_log(to_status='repair'),
+             ('equipment_accounting_uavstatuslog', 'statuslog_to_created_idx'), DAY_GROUPING),
+    HotQuery('status_log.from_status', 'views.uav_status_log', lambda: _status_log(from_status='ready'),
+             ('equipment_accounting_uavstatuslog', 'statuslog_from_created_idx'), DAY_GROUPING),
+    HotQuery('status_log.user', 'views.uav_status_log', lambda: _status_log(changed_by_id=SOME_ID),
+             accepted=DAY_GROUPING),
+    HotQuery('status_log.type', 'views.uav_status_log', lambda: _status_log(drone_type_key=SOME_KEY),
+             accepted=DAY_GROUPING),
+    HotQuery('archive.movements.days', 'views.uav_movements', _archived_movement_days,
+             ('equipment_accounting_archivedmovementday', 'archmove_day_idx')),
+    # Already one row per group and day: far fewer rows than the live log
+    HotQuery('archive.status_log', 'views.uav_status_log', _archived_status_log, accepted=DAY_GROUPING_ALL),
+    # Soft-deleted drones are left out of these indexes (ActiveUAVManager)
+    HotQuery('uavs.status', 'views.equipment_list', lambda: _uavs(status='repair'),
+             ('equipment_accounting_uavinstance', 'uav_active_status_idx')),
+    HotQuery('uavs.type', 'views.equipment_list', lambda: _uavs(content_type_id=SOME_ID, object_id=SOME_ID),
+             ('equipment_accounting_uavinstance', 'uav_active_gfk_idx')),
+    HotQuery('uavs.location', 'views.location_delete', lambda: _uavs(current_location_id=SOME_ID),
+             ('equipment_accounting_uavinstance', 'uav_active_location_idx')),
+    HotQuery('components.list', 'views.equipment_list', _components,
+             ('equipment_accounting_component', 'component_created_idx')),
+    HotQuery('components.list.status', 'views.equipment_list', lambda: _components(status='damaged'),
+             ('equipment_accounting_component', 'component_status_created_idx')),
+    HotQuery('components.list.kind', 'views.equipment_list', lambda: _components(kind='battery'),
+             ('equipment_accounting_component', 'component_kind_created_idx')),
+    # Counts every battery and spool by status
+    HotQuery('components.summary', 'views.equipment_list', _component_summary,
+             ('equipment_accounting_component', 'component_kind_created_idx'), ('temp_btree',)),
+    # Sorts the handful of free components of one kind
+    HotQuery('components.free', 'views.uav_detail', _free_batteries,
+             ('equipment_accounting_component', 'component_uav_kind_idx'), ('temp_btree',)),
+    # Active drones span several statuses, so their display order needs a sort
+    HotQuery('components.available_uavs', 'forms._get_available_uavs_for_kind', _available_uavs,
+             ('equipment_accounting_component', 'component_kind_created_idx'), ('temp_btree',)),
+    # Sorts only the orders still in progress
+    HotQuery('orders.workshop', 'pilots.views.workshop_orders', _workshop_orders,
+             ('pilots_droneorder', 'droneorder_status_idx'), ('temp_btree',)),
+    HotQuery('orders.active_count', 'user_cache.active_orders_count', _active_orders_count,
+             ('pilots_droneorder', 'droneorder_status_idx')),
+    # The page lists every archived order; sorting them costs less than rendering
+    HotQuery('orders.archive', 'pilots.views.workshop_orders_archive', _orders_archive,
+             ('pilots_droneorder', 'droneorder_status_idx'), ('temp_btree',)),
+    HotQuery('orders.mine', 'pilots.views.drone_order_list', _my_orders,
+             ('pilots_droneorder', 'droneorder_pilot_created_idx')),
+    HotQuery('strikes.all', 'pilots.views.strike_report_list', _strike_reports,
+             ('pilots_strikereport', 'strike_reported_idx')),
+    HotQuery('strikes.mine', 'pilots.views.strike_report_list', lambda: _strike_reports(pilot_id=SOME_ID),
+             ('pilots_strikereport', 'strike_pilot_reported_idx')),
+    HotQuery('snapshots.status_events', 'snapshots.backfill', _snapshot_status_events,
+             ('equipment_accounting_uavstatuslog', 'statuslog_created_idx')),
+    HotQuery('inventory.totals', 'views.drone_stats', _counter_totals),
+]
+
+
+def explain(queryset):
+    """Return the EXPLAIN QUERY PLAN detail lines of ``queryset``, indented by depth."""
+    sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        rows = cursor.fetchall()
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+
+def problems(plan):
+    """Return the flagged steps of an ``explain`` plan as (kind, detail) pairs."""
+    found = []
+    for line in plan:
+        detail = line.strip()
+        if _FULL_SCAN.match(detail):
+            found.append(('scan', detail))
+        elif _TEMP_BTREE.match(detail):
+            found.append(('temp_btree', detail))
+    return found
+
+
+def _existing_indexes(tables):
+    with connection.cursor() as cursor:
+        return {
+            table: set(connection.introspection.get_constraints(cursor, table))
+            for table in tables
+        }
+
+
+def check(only=()):
+    """Plan every catalogue query whose name contains one of ``only`` (all if empty).
+
+    Returns a list of dicts: name, source, plan, problems (not accepted),
+    accepted (accepted problems), index (name or None) and index_exists.
+    """
+    entries = [q for q in CATALOGUE if not only or any(o in q.name for o in only)]
+    indexes = _existing_indexes({q.index[0] for q in entries if q.index})
+    results = []
+    for query in entries:
+        plan = explain(query.queryset())
+        found = problems(plan)
+        results.append({
+            'name': query.name,
+            'source': query.source,
+            'plan': plan,
+            'problems': [p for p in found if p[0] not in query.accepted],
+            'accepted': [p for p in found if p[0] in query.accepted],
+            'index': query.index[1] if query.index else None,
+            'index_exists': bool(query.index) and query.index[1] in indexes[query.index[0]],
+        })
+    return results
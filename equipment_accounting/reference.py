@@ -0,0 +1,104 @@
+"""Cached reference data.
+
+Locations, positions, purposes, frequencies, templates, models,
+manufacturers and both drone-type tables are small and change rarely, yet
+almost every equipment view reads some of them.  They are loaded together
+into an in-process snapshot and served from memory; callers get fresh
+copies, so annotating a row (``loc.total = …``) never leaks into the shared
+snapshot or another request.
+
+Any save or delete of a cached model bumps the ``reference`` CacheVersion
+(see ``equipment_accounting.signals``); each process compares its loaded
+stamp with the stored one at most every ``CHECK_INTERVAL`` seconds and
+reloads everything on mismatch, like the label registry.  Code that writes
+these tables with ``QuerySet.update`` must call ``invalidate`` itself.
+
+ContentType lookups need no layer of their own: ``get_for_model`` is
+already cached per process by Django.
+"""
+
+import copy
+import time
+
+from app_drones import replica
+
+from .models import (
+    CacheVersion, DroneModel, DronePurpose, FPVDroneType, Frequency, Location,
+    Manufacturer, OpticalDroneType, Position, PowerTemplate, VideoTemplate,
+)
+
+VERSION_KEY = 'reference'
+CHECK_INTERVAL = 5  # seconds
+
+# Cached model → related objects loaded with it (reachable without queries)
+MODELS = {
+    Location: (),
+    Position: (),
+    DronePurpose: (),
+    Frequency: (),
+    Manufacturer: (),
+    PowerTemplate: (),
+    VideoTemplate: ('drone_model',),
+    DroneModel: ('manufacturer',),
+    FPVDroneType: ('model', 'model__manufacturer', 'power_template', 'purpose', 'video_frequency'),
+    OpticalDroneType: (
+        'model', 'model__manufacturer', 'power_template', 'purpose',
+        'video_template', 'video_template__drone_model',
+    ),
+}
+
+_cache = {'stamp': None, 'checked_at': 0.0, 'rows': {}, 'by_pk': {}}
+
+
+def _load():
+    rows = {
+        model: tuple(model.objects.select_related(*related) if related else model.objects.all())
+        for model, related in MODELS.items()
+    }
+    by_pk = {model: {obj.pk: obj for obj in objs} for model, objs in rows.items()}
+    return rows, by_pk
+
+
+def _snapshot():
+    now = time.monotonic()
+    if now - _cache['checked_at'] >= CHECK_INTERVAL:
+        # The snapshot outlives the request: never fill it from the replica
+        with replica.primary():
+            stamp = CacheVersion.stamp(VERSION_KEY)
+            if stamp is None:
+                CacheVersion.bump(VERSION_KEY)
+                stamp = CacheVersion.stamp(VERSION_KEY)
+            if stamp != _cache['stamp']:
+                _cache['rows'], _cache['by_pk'] = _load()
+                _cache['stamp'] = stamp
+        _cache['checked_at'] = now
+    return _cache
+
+
+def objects(model):
+    """Return copies of every ``model`` row in the model's default ordering."""
+    return [copy.copy(obj) for obj in _snapshot()['rows'][model]]
+
+
+def get(model, pk):
+    """Return a copy of the ``model`` row with ``pk``, or None."""
+    obj = _snapshot()['by_pk'][model].get(pk)
+    return copy.copy(obj) if obj is not None else None
+
+
+def first(model, **attrs):
+    """Return a copy of the first ``model`` row whose attributes equal ``attrs``, or None."""
+    for obj in _snapshot()['rows'][model]:
+        if all(getattr(obj, name) == value for name, value in attrs.items()):
+            return copy.copy(obj)
+    return None
+
+
+def invalidate():
+    """Mark the snapshot stale in every process."""
+    CacheVersion.bump(VERSION_KEY)
+    _expire_local()
+
+
+def _expire_local():
+    _cache['checked_at'] = 0.0
@@ -0,0 +1,141 @@
+"""Full-text search over UAVs backed by an SQLite FTS5 table.
+
+``equipment_uav_search`` holds one row per non-deleted UAV (rowid = UAV pk)
+with its notes, type label, manufacturer, location and position names.  It is
+kept current by ``equipment_accounting.signals``: every write wrapped in
+``inventory.tracked`` re-indexes the drones it touched, and renames of
+locations, positions, models, manufacturers and types re-index the drones
+that show them.
+
+The index is built once by ``rebuild_search_index`` (the deploy runs it with
+``--if-missing`` after migrating), never from a request: a full build holds
+the write lock for seconds on a large inventory.  On databases without FTS5,
+or before the index is built, callers fall back to ``icontains`` filtering.
+"""
+
+import re
+
+from django.db import OperationalError, connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from . import labels
+from .models import CacheVersion, UAVInstance
+
+TABLE = 'equipment_uav_search'
+VERSION_KEY = 'uav_search_index'
+
+_state = {'available': None}
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_available():
+    """True when the FTS5 table exists on the default database."""
+    if _state['available'] is None:
+        if connection.vendor != 'sqlite':
+            _state['available'] = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABLE])
+                _state['available'] = cursor.fetchone() is not None
+    return _state['available']
+
+
+def built():
+    """True once ``reindex_all`` has filled the index on this database."""
+    return CacheVersion.stamp(VERSION_KEY) is not None
+
+
+def _ready():
+    """FTS is usable: table exists and has been built at least once."""
+    return fts_available() and built()
+
+
+def match_expression(q):
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    tokens = _TOKEN_RE.findall(q)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _rows(pks=None):
+    qs = UAVInstance.objects.all()
+    if pks is not None:
+        qs = qs.filter(pk__in=pks)
+    for row in qs.values_list(
+        'pk', 'content_type_id', 'object_id', 'notes',
+        'type_model__manufacturer__name', 'current_location__name', 'position__name',
+    ).iterator():
+        pk, ct_id, obj_id, notes, manufacturer, location, position = row
+        yield (pk, notes or '', labels.full_label(ct_id, obj_id), manufacturer or '',
+               location or '', position or '')
+
+
+def _insert(cursor, rows):
+    cursor.executemany(
+        f"INSERT INTO {TABLE} (rowid, notes, type_label, manufacturer, location, position) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        list(rows),
+    )
+
+
+def index_uavs(pks):
+    """Re-index the given UAV PKs (deleted drones are dropped from the index)."""
+    pks = [pk for pk in pks if pk]
+    if not pks or not fts_available():
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        placeholders = ', '.join(['%s'] * len(pks))
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid IN ({placeholders})", pks)
+        _insert(cursor, _rows(pks))
+
+
+def index_matching(q):
+    """Re-index every UAV matching the filter ``q``."""
+    if fts_available():
+        index_uavs(list(UAVInstance.objects.filter(q).values_list('pk', flat=True)))
+
+
+def reindex_all():
+    """Rebuild the whole index; returns the number of indexed UAVs."""
+    if not fts_available():
+        return 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+        rows = list(_rows())
+        _insert(cursor, rows)
+        CacheVersion.bump(VERSION_KEY)
+    return len(rows)
+
+
+def filter_queryset(qs, q):
+    """Restrict a UAVInstance queryset to drones matching the search text."""
+    match = match_expression(q)
+    if not match:
+        return qs
+    if _ready():
+        return qs.filter(pk__in=RawSQL(f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s", [match]))
+    return qs.filter(
+        Q(notes__icontains=q) |
+        Q(type_model__name__icontains=q) |
+        Q(type_model__manufacturer__name__icontains=q)
+    )
+
+
+def suggest(q, limit=10):
+    """Return up to ``limit`` (uav_pk, rank) pairs, best match first."""
+    match = match_expression(q)
+    if not match:
+        return []
+    if _ready():
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT rowid, rank FROM {TABLE} WHERE {TABLE} MATCH %s ORDER BY rank LIMIT %s",
+                    [match, limit],
+                )
+                return cursor.fetchall()
+        except OperationalError:
+            return []
+    pks = filter_queryset(UAVInstance.objects.all(), q).values_list('pk', flat=True)[:limit]
+    return [(pk, 0) for pk in pks]
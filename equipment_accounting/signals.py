@@ -0,0 +1,148 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import inventory, labels, reference, search
+from .models import (
+    DroneModel, DronePurpose, FPVDroneType, Frequency, Location, Manufacturer,
+    OpticalDroneType, Position, PowerTemplate, UAVInstance, VideoTemplate,
+)
+
+
+# ── Reference-data snapshot ──────────────────────────────────────────
+
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=Position)
+@receiver(post_save, sender=DronePurpose)
+@receiver(post_save, sender=Frequency)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_save, sender=PowerTemplate)
+@receiver(post_save, sender=VideoTemplate)
+@receiver(post_save, sender=DroneModel)
+@receiver(post_save, sender=FPVDroneType)
+@receiver(post_save, sender=OpticalDroneType)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=Position)
+@receiver(post_delete, sender=DronePurpose)
+@receiver(post_delete, sender=Frequency)
+@receiver(post_delete, sender=Manufacturer)
+@receiver(post_delete, sender=PowerTemplate)
+@receiver(post_delete, sender=VideoTemplate)
+@receiver(post_delete, sender=DroneModel)
+@receiver(post_delete, sender=FPVDroneType)
+@receiver(post_delete, sender=OpticalDroneType)
+def invalidate_reference(sender, raw=False, **kwargs):
+    if not raw:
+        reference.invalidate()
+
+
+# ── Drone-type label registry ────────────────────────────────────────
+
+@receiver(post_save, sender=FPVDroneType)
+def rebuild_fpv_type_label(sender, instance, raw=False, **kwargs):
+    if not raw:
+        labels.rebuild_labels(fpv_qs=FPVDroneType.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=OpticalDroneType)
+def rebuild_optical_type_label(sender, instance, raw=False, **kwargs):
+    if not raw:
+        labels.rebuild_labels(opt_qs=OpticalDroneType.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=FPVDroneType)
+@receiver(post_delete, sender=OpticalDroneType)
+def drop_type_label(sender, instance, **kwargs):
+    labels.drop_label(sender, instance.pk)
+
+
+@receiver(m2m_changed, sender=FPVDroneType.control_frequencies.through)
+def rebuild_label_on_frequencies(sender, instance, action, reverse, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # Frequency side of the relation — any number of types may be affected
+        labels.rebuild_labels()
+    else:
+        labels.rebuild_labels(fpv_qs=FPVDroneType.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Frequency)
+@receiver(post_save, sender=DroneModel)
+@receiver(post_save, sender=DronePurpose)
+@receiver(post_save, sender=VideoTemplate)
+def rebuild_labels_on_reference_change(sender, instance, created, raw=False, **kwargs):
+    # A new row is not referenced by any type yet
+    if not created and not raw:
+        labels.rebuild_labels()
+
+
+# ── Type attributes copied onto UAVInstance ──────────────────────────
+
+@receiver(post_save, sender=FPVDroneType)
+@receiver(post_save, sender=OpticalDroneType)
+def sync_uav_type_attributes(sender, instance, created, raw=False, **kwargs):
+    # A new type has no drones yet
+    if not created and not raw:
+        UAVInstance.sync_type_attributes(instance)
+
+
+@receiver(post_save, sender=VideoTemplate)
+def sync_uav_video_attributes(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    for drone_type in OpticalDroneType.objects.filter(video_template=instance).select_related('video_template'):
+        UAVInstance.sync_type_attributes(drone_type)
+
+
+# ── Full-text search index ───────────────────────────────────────────
+# Registered after the label and type-attribute receivers so the index
+# reads the refreshed labels and ``type_*`` columns.
+
+@receiver(inventory.uavs_changed)
+def index_changed_uavs(sender, pks, **kwargs):
+    search.index_uavs(pks)
+
+
+@receiver(post_save, sender=FPVDroneType)
+@receiver(post_save, sender=OpticalDroneType)
+def index_type_uavs(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        ct = ContentType.objects.get_for_model(sender)
+        search.index_matching(Q(content_type=ct, object_id=instance.pk))
+
+
+@receiver(m2m_changed, sender=FPVDroneType.control_frequencies.through)
+def index_on_frequencies(sender, instance, action, reverse, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        search.reindex_all()
+    else:
+        ct = ContentType.objects.get_for_model(FPVDroneType)
+        search.index_matching(Q(content_type=ct, object_id=instance.pk))
+
+
+@receiver(post_save, sender=Frequency)
+@receiver(post_save, sender=DronePurpose)
+@receiver(post_save, sender=VideoTemplate)
+def reindex_on_label_change(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        search.reindex_all()
+
+
+@receiver(post_save, sender=DroneModel)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=Position)
+def index_on_name_change(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    lookup = {
+        DroneModel: 'type_model',
+        Manufacturer: 'type_model__manufacturer',
+        Location: 'current_location',
+        Position: 'position',
+    }[sender]
+    search.index_matching(Q(**{lookup: instance}))
@@ -0,0 +1,221 @@
+"""Daily inventory snapshots for trend reports.
+
+InventorySnapshot holds the number of non-deleted drones per (date, type,
+status, location, role); InventorySnapshotTotal sums each day along a single
+dimension, so an unfiltered chart reads a few dozen rows per day however many
+combinations the inventory has.  ``take_snapshot`` copies the current state
+from the inventory counters and is run nightly by
+``python manage.py snapshot_inventory``; ``series`` reads a date range for the
+trends page without touching UAVInstance or the history tables.
+
+``backfill`` reconstructs past days for a fresh install: it starts from the
+current state of every drone and walks the status log and movements
+backwards, undoing each event and writing the end-of-day totals.  Type and
+role are not recorded in the history, so reconstructed days use the drone's
+current ones.
+"""
+
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import history_archive
+from .models import (
+    InventoryCounter, InventorySnapshot, InventorySnapshotTotal, UAVInstance, UAVMovement,
+    UAVStatusLog,
+)
+
+SNAPSHOT_KEY_FIELDS = ('content_type_id', 'object_id', 'status', 'current_location_id', 'role_id')
+
+# Trend dimension → the snapshot fields it groups by
+DIMENSION_FIELDS = {
+    'status': ('status',),
+    'location': ('current_location_id',),
+    'type': ('content_type_id', 'object_id'),
+    'role': ('role_id',),
+}
+
+
+def _day_start(day):
+    moment = datetime.combine(day, time.min)
+    return timezone.make_aware(moment) if settings.USE_TZ else moment
+
+
+def _dimension_key(dimension, values):
+    """InventorySnapshotTotal key of the ``DIMENSION_FIELDS[dimension]`` values."""
+    if dimension == 'type':
+        return '-'.join(map(str, values))
+    return str(values[0] or '')
+
+
+def _dimension_keys(key):
+    """Map a snapshot key to its InventorySnapshotTotal key in every dimension."""
+    fields = dict(zip(SNAPSHOT_KEY_FIELDS, key))
+    return {
+        dimension: _dimension_key(dimension, [fields[f] for f in names])
+        for dimension, names in DIMENSION_FIELDS.items()
+    }
+
+
+def _write_day(day, counts):
+    """Replace the snapshot rows of ``day`` with {key: count}; return the row count."""
+    totals = Counter()
+    for key, n in counts.items():
+        if n > 0:
+            for dimension, value in _dimension_keys(key).items():
+                totals[dimension, value] += n
+    InventorySnapshot.objects.filter(date=day).delete()
+    InventorySnapshotTotal.objects.filter(date=day).delete()
+    rows = InventorySnapshot.objects.bulk_create([
+        InventorySnapshot(date=day, count=n, **dict(zip(SNAPSHOT_KEY_FIELDS, key)))
+        for key, n in counts.items()
+        if n > 0
+    ])
+    InventorySnapshotTotal.objects.bulk_create([
+        InventorySnapshotTotal(date=day, dimension=dimension, key=value, count=n)
+        for (dimension, value), n in totals.items()
+    ])
+    return len(rows)
+
+
+def take_snapshot(day=None):
+    """Store the current inventory as the snapshot of ``day`` (default: today)."""
+    day = day or timezone.localdate()
+    counts = {
+        tuple(row[f] for f in SNAPSHOT_KEY_FIELDS): row['n']
+        for row in InventoryCounter.objects
+        .values(*SNAPSHOT_KEY_FIELDS)
+        .annotate(n=Sum('count'))
+    }
+    with transaction.atomic():
+        return _write_day(day, counts)
+
+
+def _events_since(start):
+    """History events at or after ``start``, newest first.
+
+    Each event is (moment, uav_id, field, previous value); undoing it sets the
+    field back.  A status log restores ``from_status``; a movement restores
+    ``from_location`` as of its confirmation (or creation, if it was never
+    confirmed); an intake removes the drone.
+    """
+    events = [
+        (moment, uav_id, 'status', from_status)
+        for moment, uav_id, from_status in UAVStatusLog.objects
+        .filter(created_at__gte=start)
+        .values_list('created_at', 'uav_id', 'from_status')
+        .iterator()
+        if from_status
+    ]
+    events += [
+        (moment, uav_id, 'location', from_location_id)
+        for moment, uav_id, from_location_id in UAVMovement.objects
+        .annotate(moved_at=Coalesce('confirmed_at', 'created_at'))
+        .filter(moved_at__gte=start)
+        .exclude(reason='created')
+        .values_list('moved_at', 'uav_id', 'from_location_id')
+        .iterator()
+    ]
+    events += [
+        (moment, uav_id, 'created', None)
+        for moment, uav_id in UAVInstance.objects.all_with_deleted()
+        .filter(created_at__gte=start)
+        .values_list('created_at', 'pk')
+        .iterator()
+    ]
+    events.sort(key=lambda event: event[0], reverse=True)
+    return events
+
+
+def backfill(days, overwrite=False):
+    """Reconstruct the snapshots of the ``days`` days before today.
+
+    Days that already have snapshot rows are kept unless ``overwrite``.  Days
+    before the end of the archived history (``history_archive``) cannot be
+    reconstructed and are skipped.  Returns {date: rows written}.
+    """
+    today = timezone.localdate()
+    first = today - timedelta(days=days)
+    archived = [d for d in map(history_archive.archived_until, (UAVStatusLog, UAVMovement)) if d]
+    if archived:
+        first = max(first, max(archived))
+        days = (today - first).days
+    existing = set() if overwrite else set(
+        InventorySnapshot.objects.filter(date__gte=first, date__lt=today)
+        .values_list('date', flat=True).distinct()
+    )
+
+    # uav_id → [content_type_id, object_id, status, current_location_id, role_id]
+    state = {
+        row[0]: list(row[1:])
+        for row in UAVInstance.objects.all_with_deleted().values_list('pk', *SNAPSHOT_KEY_FIELDS).iterator()
+    }
+    counts = Counter(tuple(s) for s in state.values() if s[2] != 'deleted')
+
+    def undo(uav_id, field, value):
+        s = state.get(uav_id)
+        if s is None:
+            return
+        if s[2] != 'deleted':
+            counts[tuple(s)] -= 1
+        if field == 'created':
+            del state[uav_id]
+            return
+        s[2 if field == 'status' else 3] = value
+        if s[2] != 'deleted':
+            counts[tuple(s)] += 1
+
+    events = _events_since(_day_start(first + timedelta(days=1)))
+    written = {}
+    pos = 0
+    with transaction.atomic():
+        for offset in range(1, days + 1):
+            day = today - timedelta(days=offset)
+            boundary = _day_start(day + timedelta(days=1))
+            while pos < len(events) and events[pos][0] >= boundary:
+                undo(*events[pos][1:])
+                pos += 1
+            if day not in existing:
+                written[day] = _write_day(day, counts)
+    return written
+
+
+def series(by='status', days=90, filters=None):
+    """Daily totals of the last ``days`` snapshot days, split by ``by``.
+
+    Returns (dates, {dimension value: [count per date]}) with values keyed as
+    in InventorySnapshotTotal.  Without ``filters`` (snapshot field lookups)
+    only the per-dimension totals are read.
+    """
+    start = timezone.localdate() - timedelta(days=days)
+    dates = list(
+        InventorySnapshotTotal.objects
+        .filter(dimension='status', date__gte=start)
+        .order_by('date').values_list('date', flat=True).distinct()
+    )
+    index = {day: i for i, day in enumerate(dates)}
+    if filters:
+        rows = (
+            (day, _dimension_key(by, key), n)
+            for day, *key, n in InventorySnapshot.objects
+            .filter(date__gte=start, **filters)
+            .values_list('date', *DIMENSION_FIELDS[by])
+            .annotate(n=Sum('count'))
+            .order_by()
+        )
+    else:
+        rows = (
+            InventorySnapshotTotal.objects
+            .filter(dimension=by, date__gte=start)
+            .values_list('date', 'key', 'count')
+        )
+    values = {}
+    for day, key, n in rows:
+        if day in index:
+            values.setdefault(key, [0] * len(dates))[index[day]] += n
+    return dates, values
@@ -1,3 +1,879 @@
-from django.test import TestCase
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import timedelta
+from importlib import import_module
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from app_drones import replica, user_cache
+from app_drones.sqlite import base as sqlite_backend
+from app_drones.testing import QueryBudgetMixin
+
+from . import export_jobs, history_archive, labels, permissions, query_plans, reference, search, snapshots
+from .inventory import find_drift, rebuild_counters, tracked
+from .models import (
+    ArchivedMovementDay, CacheVersion, Component, DroneModel, DronePurpose, ExportJob, FPVDroneType, Frequency,
+    InventoryCounter, InventorySnapshot, Location, Manufacturer, Position, PowerTemplate,
+    UAVInstance, UAVMovement, UAVStatusLog, VideoTemplate,
+)
+
+
+class InventoryFixtureMixin:
+    def setUp(self):
+        maker = Manufacturer.objects.create(name="Вирій")
+        power = PowerTemplate.objects.create(
+            name="6S2P", connector='xt60', configuration='6s2p', capacity=8000,
+        )
+        self.drone_type = FPVDroneType.objects.create(
+            model=DroneModel.objects.create(name="Вирій", manufacturer=maker),
+            prop_size='10', power_template=power,
+        )
+        self.ct = ContentType.objects.get_for_model(FPVDroneType)
+        # Migrations seed the default locations ("Позиція" among them)
+        self.base, _ = Location.objects.get_or_create(name="База")
+        self.field, _ = Location.objects.get_or_create(name="Позиція")
+
+    def make_uavs(self, n, **kwargs):
+        kwargs.setdefault('current_location', self.base)
+        with tracked() as pks:
+            for _ in range(n):
+                uav = UAVInstance.objects.create(
+                    content_type=self.ct, object_id=self.drone_type.pk, **kwargs,
+                )
+                pks.add(uav.pk)
+        return list(UAVInstance.objects.filter(pk__in=pks))
+
+
+class InventoryCounterTests(InventoryFixtureMixin, TestCase):
+    def counts(self):
+        return {
+            (c.current_location_id, c.status): c.count
+            for c in InventoryCounter.objects.all()
+        }
+
+    def test_create_move_and_delete_keep_counters_in_step(self):
+        uavs = self.make_uavs(3)
+        self.assertEqual(self.counts(), {(self.base.pk, 'inspection'): 3})
+
+        with tracked([uavs[0].pk]):
+            UAVInstance.objects.filter(pk=uavs[0].pk).update(current_location=self.field)
+        with tracked([uavs[1].pk]):
+            UAVInstance.objects.filter(pk=uavs[1].pk).update(status='deleted')
+
+        self.assertEqual(self.counts(), {
+            (self.base.pk, 'inspection'): 1,
+            (self.field.pk, 'inspection'): 1,
+        })
+        self.assertEqual(find_drift(), {})
+
+    def test_rebuild_repairs_drift(self):
+        self.make_uavs(2)
+        InventoryCounter.objects.update(count=7)
+        self.assertEqual(len(find_drift()), 1)
+
+        self.assertEqual(rebuild_counters(), 1)
+        self.assertEqual(find_drift(), {})
+
+    def test_set_fpv_purpose_keeps_counters_and_labels_in_step(self):
+        strike, _ = DronePurpose.objects.get_or_create(name="Ударний")
+        self.drone_type.purpose = strike
+        self.drone_type.save()
+        self.assertIn("(#Ударний)", labels.all_labels()[(self.ct.pk, self.drone_type.pk)].export_label)
+        self.make_uavs(2, role=strike)
+
+        call_command('set_fpv_purpose', '--commit', stdout=StringIO())
+
+        fpv = DronePurpose.objects.get(name="FPV")
+        self.assertEqual(UAVInstance.objects.filter(role=fpv).count(), 2)
+        self.assertEqual(FPVDroneType.objects.get(pk=self.drone_type.pk).purpose, fpv)
+        self.assertIn("(#FPV)", labels.all_labels()[(self.ct.pk, self.drone_type.pk)].export_label)
+        self.assertEqual(set(InventoryCounter.objects.values_list('role_id', flat=True)), {fpv.pk})
+        self.assertEqual(find_drift(), {})
+
+
+class BadgeGroupPaginationTests(InventoryFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        User.objects.create_superuser(username='admin', password='password')
+        self.client.login(username='admin', password='password')
+        now = timezone.now()
+        # 25 batches on 25 different days, two drones each
+        for day in range(25):
+            uavs = self.make_uavs(2)
+            UAVInstance.objects.filter(pk__in=[u.pk for u in uavs]).update(
+                created_at=now - timedelta(days=day),
+            )
+
+    def test_keyset_pages_cover_all_groups_once(self):
+        url = reverse('equipment_accounting:equipment_list')
+        first = self.client.get(url, {'tab': 'drones'}).context['page_obj']
+        self.assertEqual(len(first), 20)
+        self.assertTrue(first.has_next())
+        self.assertFalse(first.has_previous())
+        self.assertTrue(all(len(g['uavs']) == 2 for g in first))
+
+        second = self.client.get(url, {'tab': 'drones', 'after': first.next_cursor}).context['page_obj']
+        self.assertEqual(len(second), 5)
+        self.assertFalse(second.has_next())
+        dates = [g['date'] for g in first] + [g['date'] for g in second]
+        self.assertEqual(dates, sorted(set(dates), reverse=True))
+
+        back = self.client.get(url, {'tab': 'drones', 'before': second.previous_cursor}).context['page_obj']
+        self.assertEqual([g['date'] for g in back], [g['date'] for g in first])
+
+    def test_empty_page_after_a_cursor_links_back(self):
+        url = reverse('equipment_accounting:equipment_list')
+        first = self.client.get(url, {'tab': 'drones'}).context['page_obj']
+        # The groups of the second page are given away meanwhile
+        old = UAVInstance.objects.filter(created_at__lt=timezone.now() - timedelta(days=19, hours=12))
+        with tracked(old.values_list('pk', flat=True)):
+            old.update(status='deleted')
+
+        empty = self.client.get(url, {'tab': 'drones', 'after': first.next_cursor}).context['page_obj']
+        self.assertEqual(len(empty), 0)
+        self.assertTrue(empty.has_previous())
+        self.assertFalse(empty.has_next())
+        back = self.client.get(url, {'tab': 'drones', 'before': empty.previous_cursor}).context['page_obj']
+        self.assertEqual([g['date'] for g in back], [g['date'] for g in first][:-1])
+
+
+class DroneTypeLabelRegistryTests(InventoryFixtureMixin, TestCase):
+    def test_labels_follow_type_and_frequency_changes(self):
+        self.assertEqual(labels.full_label(self.ct.pk, self.drone_type.pk), '[Радіо] Вирій (10")')
+
+        self.drone_type.control_frequencies.add(Frequency.objects.create(value=900, unit='mhz'))
+        self.assertEqual(labels.list_label(self.ct.pk, self.drone_type.pk), 'Вирій (10")(900MHz)')
+
+        self.drone_type.model.name = 'Шрайк'
+        self.drone_type.model.save()
+        self.assertEqual(labels.list_label(self.ct.pk, self.drone_type.pk), 'Шрайк (10")(900MHz)')
+
+        pk = self.drone_type.pk
+        self.drone_type.delete()
+        self.assertIsNone(labels.get_label(self.ct.pk, pk))
+
+    def test_lookup_is_served_from_process_cache(self):
+        labels.all_labels()
+        with self.assertNumQueries(0):
+            labels.full_label(self.ct.pk, self.drone_type.pk)
+
+
+class KitStatusTests(InventoryFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        User.objects.create_superuser(username='admin', password='password')
+        self.client.login(username='admin', password='password')
+        self.uav = self.make_uavs(1)[0]
+        self.battery = Component.objects.create(kind='battery', power_template=self.drone_type.power_template)
+
+    def test_attach_and_detach_update_kit_status(self):
+        self.client.post(reverse('equipment_accounting:uav_attach_component', args=[self.uav.pk, self.battery.pk]))
+        self.uav.refresh_from_db()
+        self.assertEqual(self.uav.kit_status, UAVInstance.KIT_FULL)
+
+        self.client.post(reverse('equipment_accounting:uav_detach_component', args=[self.uav.pk, self.battery.pk]))
+        self.uav.refresh_from_db()
+        self.assertEqual(self.uav.kit_status, UAVInstance.KIT_NONE)
+
+    def test_verify_command_repairs_drift(self):
+        Component.objects.filter(pk=self.battery.pk).update(assigned_to_uav=self.uav)
+        out = StringIO()
+        call_command('verify_kit_status', '--check', stdout=out)
+        self.uav.refresh_from_db()
+        self.assertEqual(self.uav.kit_status, UAVInstance.KIT_NONE)
+
+        call_command('verify_kit_status', stdout=out)
+        self.uav.refresh_from_db()
+        self.assertEqual(self.uav.kit_status, UAVInstance.KIT_FULL)
+
+
+class TypeAttributeSyncTests(InventoryFixtureMixin, TestCase):
+    def test_type_changes_are_copied_onto_drones(self):
+        uav = self.make_uavs(1)[0]
+        self.assertEqual(uav.type_category, 'fpv')
+        self.assertFalse(uav.type_has_thermal)
+        self.assertEqual(uav.type_power_template_id, self.drone_type.power_template_id)
+
+        deleted = self.make_uavs(1)[0]
+        with tracked([deleted.pk]):
+            UAVInstance.objects.filter(pk=deleted.pk).update(status='deleted')
+        self.drone_type.has_thermal = True
+        self.drone_type.save()
+        uav.refresh_from_db()
+        self.assertTrue(uav.type_has_thermal)
+        self.assertTrue(UAVInstance.objects.all_with_deleted().get(pk=deleted.pk).type_has_thermal)
+
+
+class SearchIndexTests(InventoryFixtureMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Test databases created without migrations lack the FTS5 table
+        if not search.fts_available():
+            migration = import_module('equipment_accounting.migrations.0048_uav_search_index')
+            with connection.schema_editor() as editor:
+                migration.create_search_table(apps, editor)
+            search._state['available'] = None
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        if not search.fts_available():
+            self.skipTest("FTS5 search table is not available")
+
+    def matches(self, q):
+        return set(search.filter_queryset(UAVInstance.objects.all(), q).values_list('pk', flat=True))
+
+    def test_requests_fall_back_until_the_index_is_built(self):
+        uav = self.make_uavs(1)[0]
+        with tracked([uav.pk]):
+            UAVInstance.objects.filter(pk=uav.pk).update(notes="запасний комплект")
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.matches("запасний"), {uav.pk})
+        self.assertFalse(search.built())
+        self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith(('INSERT', 'DELETE', 'UPDATE'))])
+
+        call_command('rebuild_search_index', '--if-missing', stdout=StringIO())
+        self.assertTrue(search.built())
+        self.assertEqual(self.matches("запас"), {uav.pk})
+
+    def test_index_follows_writes_and_renames(self):
+        search.reindex_all()
+        first, second = self.make_uavs(2)
+        with tracked([first.pk]):
+            UAVInstance.objects.filter(pk=first.pk).update(notes="запасний комплект")
+
+        self.assertEqual(self.matches("запас"), {first.pk})
+        self.assertEqual(self.matches("вир ба"), {first.pk, second.pk})
+
+        self.base.name = "Склад"
+        self.base.save()
+        self.assertEqual(self.matches("склад"), {first.pk, second.pk})
+
+        with tracked([second.pk]):
+            UAVInstance.objects.filter(pk=second.pk).update(status='deleted')
+        self.assertEqual([pk for pk, _ in search.suggest("склад")], [first.pk])
+
+
+@override_settings(EXPORT_JOBS_ASYNC=False)
+class ExportTests(InventoryFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        cache_settings = override_settings(EXPORT_CACHE_DIR=cache_dir.name)
+        cache_settings.enable()
+        self.addCleanup(cache_settings.disable)
+        User.objects.create_superuser(username='master', password='pw')
+        self.client.login(username='master', password='pw')
+        self.make_uavs(2, role=DronePurpose.objects.create(name="Ударний"), status='ready')
+        self.make_uavs(1, status='repair')
+
+    def download(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_csv_and_xlsx_share_rows(self):
+        url = reverse('equipment_accounting:uav_export_excel')
+        body = self.download(self.client.get(url, {'format': 'csv'}, follow=True)).decode('utf-8-sig')
+        lines = body.splitlines()
+        self.assertEqual(lines[0], "Назва,В наявності,шт,Для мессенджера,Нові,В ремонті,В ремонті у виробника,Підсумок")
+        self.assertIn("День,1,,День,,,,0", lines)
+        self.assertIn(',2,шт,', lines[2])
+
+        from openpyxl import load_workbook
+        wb = load_workbook(BytesIO(self.download(self.client.get(url, follow=True))))
+        ws = wb.active
+        self.assertEqual(ws['A2'].value, "День")
+        self.assertEqual(ws['B3'].value, 2)
+        self.assertEqual(ws['H3'].value, "=B3+E3-F3")
+
+    @override_settings(EXPORT_JOBS_ASYNC=True)
+    def test_jobs_are_queued_reused_and_invalidated(self):
+        url = reverse('equipment_accounting:drone_stats')
+        response = self.client.get(url, {'export': 'xlsx'})
+        job = ExportJob.objects.get()
+        self.assertRedirects(response, reverse('equipment_accounting:export_job_detail', args=[job.pk]))
+
+        call_command('run_export_jobs', '--once', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.STATUS_DONE)
+
+        # Same request again is served from the finished artifact
+        response = self.client.get(url, {'export': 'xlsx'})
+        self.assertRedirects(response, reverse('equipment_accounting:export_job_download', args=[job.pk]),
+                             fetch_redirect_response=False)
+        self.assertEqual(ExportJob.objects.count(), 1)
+
+        # Any inventory change makes a new job
+        self.make_uavs(1)
+        self.client.get(url, {'export': 'xlsx'})
+        self.assertEqual(ExportJob.objects.filter(status=ExportJob.STATUS_PENDING).count(), 1)
+
+        # The stale artifact is evicted once the cache is over its limit
+        with override_settings(EXPORT_CACHE_MAX_FILES=1):
+            call_command('run_export_jobs', '--once', stdout=StringIO())
+        self.assertEqual(list(ExportJob.objects.values_list('status', flat=True)), [ExportJob.STATUS_DONE])
+        self.assertFalse(ExportJob.objects.filter(pk=job.pk).exists())
+
+    def test_only_jobs_without_a_heartbeat_are_requeued(self):
+        now = timezone.now()
+        alive, dead = (
+            ExportJob.objects.create(kind='uav', fmt='csv', key=key, status=ExportJob.STATUS_RUNNING,
+                                     worker='other-host:1', heartbeat_at=beat)
+            for key, beat in (('a', now), ('b', now - timedelta(seconds=export_jobs.STALE_AFTER + 1)))
+        )
+
+        self.assertEqual(export_jobs.requeue_stale(), 1)
+        self.assertEqual(ExportJob.objects.get(pk=alive.pk).status, ExportJob.STATUS_RUNNING)
+        self.assertEqual(ExportJob.objects.get(pk=dead.pk).status, ExportJob.STATUS_PENDING)
+        self.assertTrue(export_jobs.claim(dead))
+        self.assertEqual(ExportJob.objects.get(pk=dead.pk).worker, export_jobs.worker_id())
+
+
+class ViewQueryBudgetTests(QueryBudgetMixin, InventoryFixtureMixin, TestCase):
+    """Query ceilings for the hot equipment views.
+
+    Budgets are fixed numbers for a fixture with several drones per group, so
+    a per-row query (N+1) anywhere in a view pushes it over its ceiling.
+    """
+
+    BUDGETS = [
+        ('equipment_list', {'tab': 'drones'}, 14),
+        ('equipment_list', {'tab': 'drones', 'mode': 'qty'}, 14),
+        ('equipment_list', {'tab': 'drones', 'q': 'запас'}, 15),
+        ('equipment_list', {'tab': 'locations'}, 7),
+        ('equipment_list', {'tab': 'components'}, 12),
+        ('equipment_list', {'tab': 'types'}, 11),
+        ('equipment_list', {'tab': 'templates'}, 10),
+        ('drone_stats', {}, 9),
+        ('drone_location_stats', {}, 9),
+        ('component_stats', {}, 9),
+        ('uav_movements', {}, 12),
+        ('uav_status_log', {}, 10),
+    ]
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_superuser(username='master', password='pw')
+        self.client.login(username='master', password='pw')
+        striker = DronePurpose.objects.create(name="Ударний")
+        position = Position.objects.create(name="Висота 1")
+        VideoTemplate.objects.create(name="10км", drone_model=self.drone_type.model, max_distance=10)
+        uavs = (
+            self.make_uavs(4, role=striker, status='ready', notes="запасний")
+            + self.make_uavs(3, current_location=self.field, position=position, status='given')
+            + self.make_uavs(3, status='repair')
+        )
+        for uav in uavs:
+            Component.objects.create(kind='battery', power_template=self.drone_type.power_template,
+                                     assigned_to_uav=uav)
+            UAVMovement.objects.create(uav=uav, from_location=self.base, to_location=self.field, moved_by=user)
+            UAVStatusLog.objects.create(uav=uav, changed_by=user, from_status='inspection',
+                                        to_status=uav.status, drone_type_label='[Радіо] Вирій')
+
+    def test_hot_views_stay_within_query_budget(self):
+        for name, params, budget in self.BUDGETS:
+            with self.subTest(view=name, **params):
+                url = reverse(f'equipment_accounting:{name}')
+                self.client.get(url, params)  # warm per-process caches
+                labels._expire_local()
+                reference._expire_local()
+                self.assertViewQueryBudget(url, budget, params)
+
+    def test_drone_stats_query_count_does_not_grow_with_roles(self):
+        url = reverse('equipment_accounting:drone_stats')
+        self.client.get(url)
+        before = self.assertViewQueryBudget(url, 9).query_count
+        for name in ("Носій", "Мінувальник", "Перехоплювач"):
+            self.make_uavs(2, role=DronePurpose.objects.create(name=name), status='ready')
+        self.client.get(url)
+        response = self.assertViewQueryBudget(url, before)
+        self.assertEqual(len(response.context['sections']), 5)
+
+
+class UserCacheTests(TestCase):
+    def request_for(self, user):
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(pk=user.pk)
+        return request
+
+    def test_groups_and_permissions_are_cached_until_membership_changes(self):
+        cache.clear()
+        masters = Group.objects.create(name="Майстри")
+        masters.permissions.add(Permission.objects.get(codename='change_droneorder'))
+        user = User.objects.create_user(username='pilot', password='pw')
+        user.groups.add(masters)
+
+        self.assertEqual(user_cache.for_request(self.request_for(user))['groups'], {"Майстри"})
+        request = self.request_for(user)
+        with self.assertNumQueries(0):
+            user_cache.for_request(request)
+            self.assertTrue(request.user.has_perm('pilots.change_droneorder'))
+
+        user.groups.remove(masters)
+        request = self.request_for(user)
+        self.assertEqual(user_cache.for_request(request)['groups'], set())
+        self.assertFalse(request.user.has_perm('pilots.change_droneorder'))
+
+    def test_invalidation_from_another_process_is_seen_after_the_check_interval(self):
+        cache.clear()
+        user = User.objects.create_user(username='courier', password='pw')
+        self.assertFalse(user_cache.for_request(self.request_for(user))['perms'])
+
+        # Another worker grants a permission: no signal fires in this process,
+        # only the shared version moves
+        User.user_permissions.through.objects.create(
+            user=user, permission=Permission.objects.get(codename='change_droneorder'))
+        CacheVersion.bump(user_cache.USERS_VERSION_KEY)
+        self.assertFalse(user_cache.for_request(self.request_for(user))['perms'])
+
+        user_cache._versions.clear()  # CHECK_INTERVAL has passed
+        request = self.request_for(user)
+        self.assertEqual(user_cache.for_request(request)['perms'], {'pilots.change_droneorder'})
+        self.assertTrue(request.user.has_perm('pilots.change_droneorder'))
+
+    def test_permission_snapshot_flags(self):
+        cache.clear()
+        user = User.objects.create_user(username='keeper', password='pw')
+        user.user_permissions.add(*Permission.objects.filter(
+            codename__in=['view_uavinstance', 'view_location', 'add_component']))
+        request = self.request_for(user)
+        user_cache.for_request(request)
+
+        with self.assertNumQueries(0):
+            snapshot = permissions.for_request(request)
+            self.assertIs(permissions.for_request(request), snapshot)
+        self.assertTrue(snapshot.is_master)
+        self.assertFalse(snapshot.can_add_uav)
+        self.assertTrue(snapshot.can_tab_locations)
+        self.assertTrue(snapshot.can_tab_components)
+        self.assertFalse(snapshot.can_tab_types)
+        self.assertEqual(snapshot.as_context()['can_edit_location'], False)
+
+        superuser = User.objects.create_superuser(username='chief', password='pw')
+        self.assertTrue(permissions.for_request(self.request_for(superuser)).can_delete_position)
+
+    def test_active_orders_count_is_shared_and_cached(self):
+        cache.clear()
+        self.assertEqual(user_cache.active_orders_count(), 0)
+        with self.assertNumQueries(0):
+            user_cache.active_orders_count()
+
+
+@override_settings(PERF_PROFILING=True)
+class PerfProfilerTests(InventoryFixtureMixin, TestCase):
+    def test_profile_is_logged_and_sent_to_superusers(self):
+        User.objects.create_superuser(username='master', password='pw')
+        self.client.login(username='master', password='pw')
+        self.make_uavs(2)
+
+        with self.assertLogs('perf', level='INFO') as logs:
+            response = self.client.get(reverse('equipment_accounting:equipment_list'), {'tab': 'drones'})
+
+        self.assertRegex(response['X-Perf-Profile'], r'queries=\d+; sql=[\d.]+ms; templates=[\d.]+ms')
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['view'], 'equipment_accounting:equipment_list')
+        self.assertGreater(entry['queries'], 0)
+        self.assertGreater(entry['template_ms'], 0)
+
+
+@override_settings(SQLITE_LOCK_RETRIES=8, SQLITE_LOCK_RETRY_DELAY=0.02)
+class SqliteBackendTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = f'{tmp.name}/db.sqlite3'
+        self.db = sqlite_backend.DatabaseWrapper({**connection.settings_dict, 'NAME': self.path}, 'locks')
+        connections['locks'] = self.db
+        self.addCleanup(connections.__delitem__, 'locks')
+        self.addCleanup(self.db.close)
+        with self.db.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (n integer)')
+
+    def hold_write_lock(self, seconds):
+        holder = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        holder.execute('BEGIN IMMEDIATE')
+        release = threading.Timer(seconds, lambda: (holder.commit(), holder.close()))
+        release.start()
+        self.addCleanup(release.join)
+
+    def test_pragmas_are_applied(self):
+        with self.db.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_locked_writes_are_retried(self):
+        pragmas = {**settings.SQLITE_PRAGMAS, 'busy_timeout': 0}
+        with self.settings(SQLITE_PRAGMAS=pragmas):
+            self.db.close()
+            before = sqlite_backend.lock_stats()
+            self.hold_write_lock(0.2)
+            with self.assertLogs('perf.sqlite', level='WARNING'):
+                with self.db.cursor() as cursor:
+                    cursor.execute('INSERT INTO t VALUES (1)')
+                self.hold_write_lock(0.2)
+                with transaction.atomic(using='locks'), self.db.cursor() as cursor:
+                    cursor.execute('INSERT INTO t VALUES (2)')
+
+        after = sqlite_backend.lock_stats()
+        self.assertGreater(after['retries'], before['retries'])
+        self.assertEqual(after['failures'], before['failures'])
+        with self.db.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM t')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_begin_is_not_logged_as_a_query(self):
+        with CaptureQueriesContext(self.db) as ctx:
+            with transaction.atomic(using='locks'), self.db.cursor() as cursor:
+                cursor.execute('INSERT INTO t VALUES (1)')
+        self.assertEqual([query['sql'] for query in ctx.captured_queries], ['INSERT INTO t VALUES (1)', 'COMMIT'])
+
+
+class ReplicaTests(InventoryFixtureMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_dict = {**connection.settings_dict, 'NAME': f'{tmp.name}/replica.sqlite3',
+                         'PRAGMAS': {'query_only': 1}}
+        settings.DATABASES[replica.ALIAS] = settings_dict
+        self.addCleanup(settings.DATABASES.pop, replica.ALIAS)
+        connections[replica.ALIAS] = sqlite_backend.DatabaseWrapper(settings_dict, replica.ALIAS)
+        self.addCleanup(connections.__delitem__, replica.ALIAS)
+        self.addCleanup(connections[replica.ALIAS].close)
+
+    def refresh(self):
+        connections[replica.ALIAS].close()
+        call_command('refresh_replica', stdout=StringIO())
+
+    def test_reads_use_the_copy_and_writes_the_main_database(self):
+        self.refresh()
+        copied = Location.objects.count()
+        Location.objects.create(name="Склад")
+
+        with replica.reading() as moment:
+            self.assertIsNotNone(moment)
+            self.assertEqual(Location.objects.count(), copied)
+            with replica.primary():
+                self.assertEqual(Location.objects.count(), copied + 1)
+            Location.objects.create(name="Ангар")
+        self.assertEqual(Location.objects.count(), copied + 2)
+
+    def test_stale_copy_is_ignored(self):
+        self.refresh()
+        copied = Location.objects.count()
+        Location.objects.create(name="Склад")
+        old = timezone.now().timestamp() - settings.REPLICA_MAX_AGE - 60
+        os.utime(settings.DATABASES[replica.ALIAS]['NAME'], (old, old))
+
+        with replica.reading() as moment:
+            self.assertIsNone(moment)
+            self.assertEqual(Location.objects.count(), copied + 1)
+
+    def test_report_notes_the_snapshot_time(self):
+        User.objects.create_superuser(username='master', password='pw')
+        self.client.login(username='master', password='pw')
+        self.refresh()
+
+        response = self.client.get(reverse('equipment_accounting:component_stats'))
+        self.assertContains(response, "Звіт з копії бази станом на")
+        response = self.client.get(reverse('equipment_accounting:equipment_list'))
+        self.assertNotContains(response, "Звіт з копії бази")
+
+    def test_reporting_view_does_not_fill_process_caches_from_the_copy(self):
+        User.objects.create_superuser(username='master', password='pw')
+        self.client.login(username='master', password='pw')
+        self.refresh()
+        Location.objects.create(name="Склад")
+        reference._expire_local()
+        labels._expire_local()
+
+        response = self.client.get(reverse('equipment_accounting:drone_location_stats'))
+        self.assertContains(response, "Звіт з копії бази станом на")
+        response = self.client.get(reverse('equipment_accounting:equipment_list'), {'tab': 'locations'})
+        self.assertContains(response, "Склад")
+        self.assertIn("Склад", [loc.name for loc in reference.objects(Location)])
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_seed_and_run_report(self):
+        call_command('seed_benchmark_data', uavs=60, types=4, locations=3, positions=2, components=30,
+                     movements=40, status_logs=40, days=5, force=True, stdout=StringIO())
+        self.assertEqual(UAVInstance.objects.all_with_deleted().count(), 60)
+        self.assertFalse(find_drift())
+        statuses = sorted(UAVInstance.objects.all_with_deleted().values_list('pk', 'status'))
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as fh:
+            call_command('run_benchmarks', repeat=1, warmup=0, bulk_size=5, force=True,
+                         output=fh.name, stdout=StringIO(), stderr=StringIO())
+            report = json.load(fh)
+
+        self.assertEqual(report['meta']['dataset']['uavs'], 60)
+        self.assertIn('list.drones', report['results'])
+        self.assertIn('export.uav.xlsx', report['results'])
+        self.assertGreater(report['results']['list.drones']['queries'], 0)
+        self.assertIn('bulk.delete', report['results'])
+        # Bulk actions are rolled back
+        self.assertEqual(sorted(UAVInstance.objects.all_with_deleted().values_list('pk', 'status')), statuses)
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_have_no_unreviewed_scans(self):
+        out = StringIO()
+        call_command('analyze_queries', '--strict', stdout=out)
+        self.assertIn(f"Перевірено запитів: {len(query_plans.CATALOGUE)}, з проблемами: 0.", out.getvalue())
+
+    def test_full_scan_and_temp_btree_are_flagged(self):
+        plan = query_plans.explain(UAVInstance.objects.all_with_deleted().filter(notes='x').order_by('updated_at'))
+        self.assertEqual([kind for kind, _ in query_plans.problems(plan)], ['scan', 'temp_btree'])
+
+
+class BulkActionTests(InventoryFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        User.objects.create_superuser(username='master', password='pw')
+        self.client.login(username='master', password='pw')
+
+    def post_bulk(self, uavs, action, **data):
+        url = reverse('equipment_accounting:uav_bulk_action')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(url, {'selected': [u.pk for u in uavs], 'bulk_action': action, **data})
+        return len(ctx.captured_queries)
+
+    def test_given_and_repair_use_constant_queries(self):
+        for action, data in (('given', {'to_location_id': self.field.pk}), ('repair', {'to_location_id': self.base.pk})):
+            with self.subTest(action=action):
+                self.post_bulk(self.make_uavs(1, status='ready'), action, **data)  # creates counter rows
+                small = self.post_bulk(self.make_uavs(2, status='ready'), action, **data)
+                large = self.post_bulk(self.make_uavs(12, status='ready'), action, **data)
+                self.assertEqual(small, large)
+
+        given = UAVInstance.objects.filter(status='transit')
+        self.assertEqual(given.count(), 15)
+        self.assertFalse(given.exclude(pending_to_location=self.field).exists())
+        self.assertEqual(UAVMovement.objects.filter(reason='given', pre_transit_status='given').count(), 15)
+        self.assertEqual(UAVStatusLog.objects.filter(from_status='ready', to_status='repair').count(), 15)
+        self.assertEqual(UAVMovement.objects.filter(reason='repair', to_location=self.base).count(), 15)
+        self.assertFalse(find_drift())
+
+    def test_deleted_drones_leave_the_default_manager(self):
+        uavs = self.make_uavs(3, status='ready')
+        self.post_bulk(uavs[:2], 'delete')
+
+        self.assertEqual(list(UAVInstance.objects.values_list('pk', flat=True)), [uavs[2].pk])
+        self.assertEqual(self.base.current_uavs.count(), 1)
+        self.assertEqual(UAVInstance.objects.all_with_deleted().filter(status='deleted').count(), 2)
+        self.assertFalse(find_drift())
+
+    def test_confirm_arrival_is_batched(self):
+        url = reverse('equipment_accounting:uav_quantity_action')
+        data = {'content_type_id': self.ct.pk, 'object_id': self.drone_type.pk,
+                'from_status': 'transit', 'action': 'confirm_arrival'}
+        counts = []
+        for n in (1, 2, 12):
+            uavs = self.make_uavs(n, status='ready')
+            self.post_bulk(uavs, 'given', to_location_id=self.field.pk)
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(url, data)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[1], counts[2])
+
+        self.assertEqual(UAVInstance.objects.filter(status='given', current_location=self.field,
+                                                    pending_to_location=None).count(), 15)
+        self.assertFalse(UAVMovement.objects.filter(confirmed_at__isnull=True).exists())
+        self.assertEqual(UAVStatusLog.objects.filter(from_status='transit', to_status='given').count(), 15)
+        self.assertFalse(find_drift())
+
+    def test_create_receives_drones_in_bulk(self):
+        workshop, _ = Location.objects.get_or_create(name="Майстерня")
+        url = reverse('equipment_accounting:uav_create')
+        counts = []
+        for quantity in (1, 2, 30):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(url, {
+                    'drone_type': f'{self.ct.pk}-{self.drone_type.pk}', 'quantity': quantity,
+                    'status': 'inspection', 'from_location': self.base.pk, 'with_battery': 'on',
+                })
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[1], counts[2])
+
+        uavs = UAVInstance.objects.filter(current_location=workshop, status='inspection')
+        self.assertEqual(uavs.count(), 33)
+        self.assertEqual(uavs.filter(kit_status=UAVInstance.KIT_FULL).count(), 33)
+        self.assertEqual(Component.objects.filter(assigned_to_uav__in=uavs, kind='battery').count(), 33)
+        self.assertEqual(UAVMovement.objects.filter(reason='created', from_location=self.base,
+                                                    to_location=workshop).count(), 33)
+        self.assertFalse(find_drift())
+
+
+class ReferenceCacheTests(InventoryFixtureMixin, TestCase):
+    def test_rows_come_from_memory_until_a_save_invalidates_them(self):
+        reference._expire_local()
+        names = list(Location.objects.values_list('name', flat=True))
+        self.assertEqual([loc.name for loc in reference.objects(Location)], names)
+        with self.assertNumQueries(0):
+            locations = reference.objects(Location)
+            self.assertEqual(reference.first(Location, name="База").pk, self.base.pk)
+            self.assertEqual(str(reference.get(FPVDroneType, self.drone_type.pk)), str(self.drone_type))
+        # Callers get copies — annotating one does not touch the snapshot
+        locations[0].total = 5
+        self.assertFalse(hasattr(reference.objects(Location)[0], 'total'))
+
+        self.base.name = "Склад"
+        self.base.save()
+        self.assertEqual([loc.name for loc in reference.objects(Location)], sorted({*names, "Склад"} - {"База"}))
+        self.field.delete()
+        self.assertIsNone(reference.get(Location, self.field.pk))
+
+
+class InventorySnapshotTests(InventoryFixtureMixin, TestCase):
+    def totals(self, day):
+        return {
+            (row.current_location_id, row.status): row.count
+            for row in InventorySnapshot.objects.filter(date=day)
+        }
+
+    def test_backfill_replays_history_and_matches_todays_snapshot(self):
+        now = timezone.now()
+        today = timezone.localdate()
+        uavs = self.make_uavs(3, status='ready')
+        UAVInstance.objects.filter(pk__in=[u.pk for u in uavs]).update(created_at=now - timedelta(days=3))
+        # Two days ago one went to repair, yesterday it was moved to the field
+        UAVInstance.objects.filter(pk=uavs[0].pk).update(status='repair', current_location=self.field)
+        rebuild_counters()
+        log = UAVStatusLog.objects.create(uav=uavs[0], from_status='ready', to_status='repair')
+        UAVStatusLog.objects.filter(pk=log.pk).update(created_at=now - timedelta(days=2))
+        UAVMovement.objects.create(
+            uav=uavs[0], from_location=self.base, to_location=self.field,
+            confirmed_at=now - timedelta(days=1),
+        )
+
+        snapshots.backfill(4)
+        snapshots.take_snapshot()
+        self.assertEqual(self.totals(today - timedelta(days=4)), {})
+        self.assertEqual(self.totals(today - timedelta(days=3)), {(self.base.pk, 'ready'): 3})
+        self.assertEqual(self.totals(today - timedelta(days=2)), {(self.base.pk, 'ready'): 2, (self.base.pk, 'repair'): 1})
+        self.assertEqual(self.totals(today - timedelta(days=1)), {(self.base.pk, 'ready'): 2, (self.field.pk, 'repair'): 1})
+        self.assertEqual(self.totals(today), self.totals(today - timedelta(days=1)))
+
+    def test_trends_endpoint_returns_series_per_dimension(self):
+        User.objects.create_superuser(username='master', password='pw')
+        self.client.login(username='master', password='pw')
+        self.make_uavs(2, status='ready')
+        self.make_uavs(1, status='repair', current_location=self.field)
+        snapshots.take_snapshot(timezone.localdate() - timedelta(days=1))
+        snapshots.take_snapshot()
+
+        url = reverse('equipment_accounting:inventory_trends_data')
+        data = self.client.get(url, {'by': 'location', 'days': 30}).json()
+        self.assertEqual(len(data['dates']), 2)
+        self.assertEqual(data['totals'], [3, 3])
+        self.assertEqual({s['label']: s['values'] for s in data['series']}, {'База': [2, 2], 'Позиція': [1, 1]})
+
+        data = self.client.get(url, {'by': 'type', 'status': 'ready'}).json()
+        self.assertEqual([s['key'] for s in data['series']], [f'{self.ct.pk}-{self.drone_type.pk}'])
+        self.assertEqual(data['totals'], [2, 2])
+        self.assertEqual(self.client.get(reverse('equipment_accounting:inventory_trends')).status_code, 200)
+
+
+class StatusLogTests(InventoryFixtureMixin, TestCase):
+    def test_log_is_filtered_by_type_key_and_paginated_in_sql(self):
+        user = User.objects.create_superuser(username='master', password='pw')
+        self.client.login(username='master', password='pw')
+        other = FPVDroneType.objects.create(
+            model=self.drone_type.model, prop_size='7', power_template=self.drone_type.power_template,
+        )
+        mine = self.make_uavs(3, status='ready')
+        theirs = self.make_uavs(2, status='ready')
+        UAVInstance.objects.filter(pk__in=[u.pk for u in theirs]).update(object_id=other.pk)
+        self.client.post(reverse('equipment_accounting:uav_bulk_action'),
+                         {'selected': [u.pk for u in mine + theirs], 'bulk_action': 'repair'})
+        UAVStatusLog.objects.create(uav=mine[0], changed_by=user, from_status='repair', to_status='ready')
+
+        key = f'{self.ct.pk}-{self.drone_type.pk}'
+        self.assertEqual(UAVStatusLog.objects.filter(drone_type_key=key).count(), 4)
+
+        url = reverse('equipment_accounting:uav_status_log')
+        response = self.client.get(url, {'drone_type': key})
+        self.assertEqual(response.context['total_uavs'], 4)
+        self.assertEqual(response.context['total_rows'], 2)
+        self.assertEqual(sum(row['count'] for row in response.context['page_obj']), 4)
+        self.assertIn((key, labels.full_label(self.ct.pk, self.drone_type.pk)), response.context['type_choices'])
+
+        response = self.client.get(url, {'drone_type': '7"'})
+        self.assertEqual(response.context['total_uavs'], 2)
+
+
+class HistoryArchiveTests(InventoryFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        archive_dir = override_settings(HISTORY_ARCHIVE_DIR=tmp.name)
+        archive_dir.enable()
+        self.addCleanup(archive_dir.disable)
+        self.user = User.objects.create_superuser(username='master', password='pw')
+        self.client.login(username='master', password='pw')
+
+    def history(self, uav, days_ago, **movement):
+        moment = timezone.now() - timedelta(days=days_ago)
+        move = UAVMovement.objects.create(uav=uav, from_location=self.base, to_location=self.field,
+                                          moved_by=self.user, **movement)
+        log = UAVStatusLog.objects.create(uav=uav, changed_by=self.user, from_status='ready', to_status='given')
+        UAVMovement.objects.filter(pk=move.pk).update(created_at=moment)
+        UAVStatusLog.objects.filter(pk=log.pk).update(created_at=moment)
+
+    def test_old_history_moves_to_archive_and_pages_still_show_it(self):
+        uavs = self.make_uavs(3, status='given', current_location=self.field)
+        transit = self.make_uavs(1, status='transit')[0]
+        for uav in uavs:
+            self.history(uav, 40, reason='given')
+        self.history(uavs[0], 2, reason='given')
+        self.history(transit, 40, pre_transit_status='ready')
+
+        call_command('archive_history', days=30, stdout=StringIO())
+
+        # The pending movement of a drone in transit stays live
+        self.assertEqual(UAVMovement.objects.count(), 2)
+        self.assertEqual(UAVStatusLog.objects.count(), 1)
+        old_day = timezone.localdate() - timedelta(days=40)
+        self.assertEqual(history_archive.archived_until(UAVStatusLog), old_day)
+        archived = ArchivedMovementDay.objects.get(day=old_day)
+        self.assertEqual((archived.reason, archived.count), ('given', 3))
+        self.assertEqual(sorted(r['uav_id'] for r in history_archive.rows(UAVMovement, [old_day])),
+                         sorted(u.pk for u in uavs))
+
+        url = reverse('equipment_accounting:uav_movements')
+        groups = self.client.get(url).context['page_obj'].object_list
+        # The archived day also lists the movement kept live
+        self.assertEqual([(g['date'], g['count']) for g in groups],
+                         [(timezone.localdate() - timedelta(days=2), 1), (old_day, 4)])
+        old_batch, kept_batch = sorted(groups[1]['batches'], key=lambda b: not b['archived'])
+        self.assertTrue(old_batch['archived'])
+        self.assertEqual(len(old_batch['uav_objs']), 3)
+        self.assertFalse(kept_batch['archived'])
+        self.assertEqual(kept_batch['uav_objs'], [transit])
+        self.assertEqual(kept_batch['movement_ids'],
+                         list(UAVMovement.objects.filter(uav=transit).values_list('pk', flat=True)))
+        recent = self.client.get(url, {'date_from': (old_day + timedelta(days=1)).isoformat()})
+        self.assertEqual(len(recent.context['page_obj'].object_list), 1)
+
+        response = self.client.get(reverse('equipment_accounting:uav_status_log'), {'to_status': 'given'})
+        self.assertEqual(response.context['total_uavs'], 5)
+        self.assertEqual(sum(row['count'] for row in response.context['page_obj']), 5)
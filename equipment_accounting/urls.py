@@ -8,12 +8,18 @@ urlpatterns = [
     path('stats/', views.component_stats, name='component_stats'),
     path('stats/drones/', views.drone_location_stats, name='drone_location_stats'),
     path('stats/breakdown/', views.drone_stats, name='drone_stats'),
+    path('stats/trends/', views.inventory_trends, name='inventory_trends'),
+    path('stats/trends/data/', views.inventory_trends_data, name='inventory_trends_data'),
     path('stats/movements/', views.uav_movements, name='uav_movements'),
     path('stats/movements/delete/', views.movement_batch_delete, name='movement_batch_delete'),
     path('stats/status-log/', views.uav_status_log, name='uav_status_log'),
 
-    # UAV export
+    # UAV search / export
+    path('uav/search/suggest/', views.uav_search_suggest, name='uav_search_suggest'),
     path('uav/export/excel/', views.uav_export_excel, name='uav_export_excel'),
+    path('export/<int:pk>/', views.export_job_detail, name='export_job_detail'),
+    path('export/<int:pk>/status/', views.export_job_status, name='export_job_status'),
+    path('export/<int:pk>/download/', views.export_job_download, name='export_job_download'),
 
     # UAV bulk actions
     path('uav/bulk/', views.uav_bulk_action, name='uav_bulk_action'),
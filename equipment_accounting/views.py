@@ -1,18 +1,28 @@
-import io
-from datetime import date
+import re
+from datetime import date, datetime, time, timedelta
 from functools import wraps
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied
 from django.db.models.deletion import ProtectedError
 from django.core.paginator import Paginator
-from django.db.models import Count, Exists, Max, OuterRef, Prefetch, Q
-from django.http import HttpResponse, JsonResponse
+from django.db.models import Count, Max, Prefetch, Q, Sum
+from django.db.models.functions import TruncDate
+from django.http import FileResponse, Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils import timezone
 
+from app_drones import replica
+
+from . import (
+    arrivals, export_jobs, exports, history_archive, intake, inventory, labels, permissions,
+    reference, search, snapshots,
+)
+from .pagination import decode_cursor, paginate_keyset
 from .forms import _get_available_uavs_for_kind
 from .forms import (
     UAVInstanceForm, ComponentForm, PowerTemplateForm, VideoTemplateForm,
@@ -24,28 +34,30 @@ from .models import (
     FPVDroneType, OpticalDroneType,
     OtherComponentType, Location, UAVMovement,
     Manufacturer, DroneModel, UAVPhoto, DronePurpose, Position,
-    UAVStatusLog,
+    UAVStatusLog, InventoryCounter, InventorySnapshotTotal, ExportJob,
+    ArchivedMovementDay, ArchivedStatusDay,
 )
 
 def _list_url(tab="drones"):
     return reverse("equipment_accounting:equipment_list") + f"?tab={tab}"
 
 
-def _log_status_changes(uav_old_statuses, new_status, user, type_label_map=None):
+def _log_status_changes(rows, new_status, user):
     """Bulk-create UAVStatusLog entries.
 
-    uav_old_statuses: iterable of (uav_pk, old_status, drone_type_label) OR UAVInstance objects
-    If a dict {pk: old_status} is passed, type_label_map {pk: label} is also needed.
+    rows: iterable of (uav_pk, old_status, content_type_id, object_id);
+    unchanged statuses are skipped.
     """
     logs = []
-    for uav_pk, old_status, type_label in uav_old_statuses:
+    for uav_pk, old_status, ct_id, obj_id in rows:
         if old_status != new_status:
             logs.append(UAVStatusLog(
                 uav_id=uav_pk,
                 changed_by=user,
                 from_status=old_status,
                 to_status=new_status,
-                drone_type_label=type_label or '',
+                drone_type_label=labels.full_label(ct_id, obj_id),
+                drone_type_key=UAVStatusLog.type_key(ct_id, obj_id),
             ))
     if logs:
         UAVStatusLog.objects.bulk_create(logs)
@@ -53,47 +65,7 @@ def _log_status_changes(uav_old_statuses, new_status, user, type_label_map=None)
 
 def _uav_type_label(uav):
     """Return full type label with category prefix, frequencies, day/night."""
-    try:
-        fpv_ct_id = ContentType.objects.get_for_model(FPVDroneType).pk
-        is_opt = uav.content_type_id != fpv_ct_id
-        if is_opt:
-            dt = OpticalDroneType.objects.select_related('model', 'video_template').get(pk=uav.object_id)
-            return '[Оптика] ' + _make_list_type_label(dt, True)
-        else:
-            dt = FPVDroneType.objects.select_related('model', 'video_frequency').prefetch_related('control_frequencies').get(pk=uav.object_id)
-            return '[Радіо] ' + _make_list_type_label(dt, False)
-    except Exception:
-        return ''
-
-
-def _type_labels_for_qs(qs):
-    """Return {uav_pk: full drone_type_label} with one query per unique drone type."""
-    rows = list(qs.values_list('pk', 'content_type_id', 'object_id'))
-    fpv_ct_id = ContentType.objects.get_for_model(FPVDroneType).pk
-    ct_groups = {}
-    for pk, ct_id, obj_id in rows:
-        ct_groups.setdefault((ct_id, obj_id), []).append(pk)
-    fpv_obj_ids = [obj_id for (ct_id, obj_id) in ct_groups if ct_id == fpv_ct_id]
-    opt_obj_ids = [obj_id for (ct_id, obj_id) in ct_groups if ct_id != fpv_ct_id]
-    fpv_map = {dt.pk: dt for dt in FPVDroneType.objects
-               .filter(pk__in=fpv_obj_ids)
-               .select_related('model', 'video_frequency')
-               .prefetch_related('control_frequencies')}
-    opt_map = {dt.pk: dt for dt in OpticalDroneType.objects
-               .filter(pk__in=opt_obj_ids)
-               .select_related('model', 'video_template')}
-    labels = {}
-    for (ct_id, obj_id), pks in ct_groups.items():
-        is_opt = ct_id != fpv_ct_id
-        dt = (opt_map if is_opt else fpv_map).get(obj_id)
-        if dt:
-            prefix = '[Оптика] ' if is_opt else '[Радіо] '
-            lbl = prefix + _make_list_type_label(dt, is_opt)
-        else:
-            lbl = ''
-        for pk in pks:
-            labels[pk] = lbl
-    return labels
+    return labels.full_label(uav.content_type_id, uav.object_id)
 
 
 # UAV permission codenames
@@ -143,10 +115,7 @@ def master_required(view_func):
     @wraps(view_func)
     @login_required
     def _wrapped(request, *args, **kwargs):
-        if (request.user.has_perm('equipment_accounting.view_uavinstance')
-                or request.user.has_perm(PERM_ADD_UAV)
-                or request.user.has_perm(PERM_CHANGE_UAV)
-                or request.user.has_perm(PERM_DELETE_UAV)):
+        if permissions.for_request(request).is_master:
             return view_func(request, *args, **kwargs)
         raise PermissionDenied
     return _wrapped
@@ -158,7 +127,7 @@ def uav_perm_required(perm):
         @wraps(view_func)
         @login_required
         def _wrapped(request, *args, **kwargs):
-            if request.user.has_perm(perm):
+            if permissions.for_request(request).has(perm):
                 return view_func(request, *args, **kwargs)
             raise PermissionDenied
         return _wrapped
@@ -184,43 +153,47 @@ def equipment_list(request):
     date_to = request.GET.get("date_to", "")
     search_q = request.GET.get("q", "")
 
-    # Compute ContentTypes once — reused by filters, group building, and type choices
+    # Compute ContentTypes once — reused by filters and group building
     _fpv_ct = ContentType.objects.get_for_model(FPVDroneType)
     _opt_ct = ContentType.objects.get_for_model(OpticalDroneType)
-    _fpv_ct_id = _fpv_ct.id
     _opt_ct_id = _opt_ct.id
 
     # Always needed: locations for the filter bar on every tab
-    _locations = list(Location.objects.annotate(uav_count=Count('current_uavs')))
+    _locations = reference.objects(Location)
     _loc_dict = {loc.pk: loc for loc in _locations}
     position_location_ids = [loc.pk for loc in _locations if loc.name == 'Позиція']
 
     # Tab-specific defaults (overridden below per active tab)
-    badge_groups, qty_groups, page_obj = [], [], None
+    qty_groups, page_obj = [], None
     total_uavs, total_drones = 0, 0
     status_counts, type_choices = {}, []
     drone_roles, _positions, _pos_dict = [], [], {}
 
     if tab == 'drones':
-        # Annotate with EXISTS subqueries for kit status — replaces prefetch_related on main queryset
-        uavs = UAVInstance.objects.annotate(
-            _has_battery=Exists(Component.objects.filter(assigned_to_uav=OuterRef('pk'), kind='battery')),
-            _has_spool=Exists(Component.objects.filter(assigned_to_uav=OuterRef('pk'), kind='spool')),
-        ).exclude(status='deleted')
+        uavs = UAVInstance.objects.all()
+        # Same filters over the inventory counters — usable for quantity mode
+        # as long as no filter needs per-drone columns (date, search, kit).
+        counters = InventoryCounter.objects.all()
+        counters_usable = not (date_from or date_to or search_q or kit_filter)
 
         if location_filter:
-            uavs = uavs.filter(
+            _loc_q = (
                 Q(current_location_id=location_filter) |
                 Q(status='transit', pending_to_location_id=location_filter)
             )
+            uavs = uavs.filter(_loc_q)
+            counters = counters.filter(_loc_q)
 
         if status_filter:
             uavs = uavs.filter(status=status_filter)
+            counters = counters.filter(status=status_filter)
 
         if category_filter == "fpv":
             uavs = uavs.filter(content_type=_fpv_ct)
+            counters = counters.filter(content_type=_fpv_ct)
         elif category_filter == "optical":
             uavs = uavs.filter(content_type=_opt_ct)
+            counters = counters.filter(content_type=_opt_ct)
 
         if type_filter:
             _type_q = Q()
@@ -232,6 +205,7 @@ def equipment_list(request):
                     pass
             if _type_q:
                 uavs = uavs.filter(_type_q)
+                counters = counters.filter(_type_q)
 
         if date_from:
             try:
@@ -246,131 +220,81 @@ def equipment_list(request):
                 pass
 
         if search_q:
-            fpv_ids = FPVDroneType.objects.filter(
-                Q(model__name__icontains=search_q) | Q(model__manufacturer__name__icontains=search_q)
-            ).values_list('pk', flat=True)
-            opt_ids = OpticalDroneType.objects.filter(
-                Q(model__name__icontains=search_q) | Q(model__manufacturer__name__icontains=search_q)
-            ).values_list('pk', flat=True)
-            uavs = uavs.filter(
-                Q(notes__icontains=search_q) |
-                Q(content_type=_fpv_ct, object_id__in=fpv_ids) |
-                Q(content_type=_opt_ct, object_id__in=opt_ids)
-            )
+            # FTS5 prefix match over notes/type/manufacturer/location/position
+            uavs = search.filter_queryset(uavs, search_q)
 
-        # Kit filter at DB level via EXISTS annotations
-        if kit_filter == UAVInstance.KIT_NONE:
-            uavs = uavs.filter(_has_battery=False, _has_spool=False)
-        elif kit_filter == UAVInstance.KIT_FULL:
-            uavs = uavs.filter(
-                Q(content_type=_opt_ct, _has_battery=True, _has_spool=True) |
-                Q(_has_battery=True) & ~Q(content_type=_opt_ct)
-            )
-        elif kit_filter == UAVInstance.KIT_PARTIAL:
-            uavs = uavs.exclude(
-                Q(_has_battery=False, _has_spool=False) |
-                Q(content_type=_opt_ct, _has_battery=True, _has_spool=True) |
-                Q(_has_battery=True) & ~Q(content_type=_opt_ct)
-            )
+        # Kit filter — plain indexed lookup on the denormalized column
+        if kit_filter in UAVInstance.KIT_LABELS:
+            uavs = uavs.filter(kit_status=kit_filter)
 
         # Role filter
         if role_filter.isdigit():
             uavs = uavs.filter(role_id=int(role_filter))
+            counters = counters.filter(role_id=int(role_filter))
 
         # Mode filter (день/ніч based on has_thermal)
         if mode_filter in ("day", "night"):
             is_thermal = (mode_filter == "night")
-            _thermal_fpv = list(FPVDroneType.objects.filter(has_thermal=is_thermal).values_list('pk', flat=True))
-            _thermal_opt = list(OpticalDroneType.objects.filter(has_thermal=is_thermal).values_list('pk', flat=True))
-            uavs = uavs.filter(
-                Q(content_type=_fpv_ct, object_id__in=_thermal_fpv) |
-                Q(content_type=_opt_ct, object_id__in=_thermal_opt)
-            )
-
-        # Pre-fetch all drone types into dicts — avoids N+1 GenericFK access
-        _fpv_types = {dt.pk: dt for dt in FPVDroneType.objects.select_related(
-            "model", "video_frequency",
-        ).prefetch_related("control_frequencies").only(
-            "id", "prop_size", "has_thermal",
-            "video_frequency_id", "video_frequency__value", "video_frequency__unit",
-            "model__name",
-        )}
-        _opt_types = {dt.pk: dt for dt in OpticalDroneType.objects.select_related(
-            "model", "video_template",
-        ).only(
-            "id", "prop_size", "has_thermal",
-            "video_template_id", "video_template__max_distance",
-            "model__name",
-        )}
-
-        def _kit_from_ann(uav):
-            """Compute kit status from EXISTS annotations — no extra DB queries."""
-            if not uav._has_battery and not uav._has_spool:
-                return UAVInstance.KIT_NONE
-            if uav.content_type_id == _opt_ct_id:
-                if uav._has_battery and uav._has_spool:
-                    return UAVInstance.KIT_FULL
-                return UAVInstance.KIT_PARTIAL
-            return UAVInstance.KIT_FULL if uav._has_battery else UAVInstance.KIT_PARTIAL
-
-        # Light query: only fields needed for group-building (no heavy select_related, no component rows)
-        uavs_light = uavs.select_related("role").only(
-            'id', 'content_type_id', 'object_id', 'status', 'role_id', 'created_at'
-        ).order_by('-created_at')
-
-        # Build badge groups, tracking UAV PKs per group (no full UAV objects yet)
-        _badge_seen = {}
-        _group_uav_ids = {}
+            uavs = uavs.filter(type_has_thermal=is_thermal)
+            # Counters carry no type columns — match their (type) keys from the registry
+            _mode_q = Q(pk__in=[])
+            for (_ct_id, _obj_id), _tl in labels.all_labels().items():
+                if _tl.has_thermal == is_thermal:
+                    _mode_q |= Q(content_type_id=_ct_id, object_id=_obj_id)
+            counters = counters.filter(_mode_q)
+
+        # Type labels / day-night flags come from the label registry (no queries)
+        _type_labels = labels.all_labels()
+
+        # Badge groups = (type, batch date, kit) — grouped in SQL, keyset-paginated
+        # over the group key so only the current page's groups are ever built.
         _status_display = dict(UAVInstance.STATUS_CHOICES)
+        _group_statuses = ('ready', 'inspection', 'repair', 'deferred', 'transit', 'given')
+        uavs_grouped = uavs.annotate(_batch_date=TruncDate('created_at'))
+        group_rows = uavs_grouped.values('content_type_id', 'object_id', '_batch_date', 'kit_status').annotate(
+            total=Count('pk'),
+            **{f'cnt_{s}': Count('pk', filter=Q(status=s)) for s in _group_statuses},
+        )
+        _group_keys = (('_batch_date', True), ('content_type_id', False), ('object_id', False), ('kit_status', False))
+        _cursor_types = (date.fromisoformat, int, int, str)
+        page_obj = paginate_keyset(
+            group_rows, _group_keys,
+            after=decode_cursor(request.GET.get('after'), _cursor_types),
+            before=decode_cursor(request.GET.get('before'), _cursor_types),
+        )
 
-        for _uav in uavs_light:
-            _kit = _kit_from_ann(_uav)
-            _key = (_uav.content_type_id, _uav.object_id, _uav.created_at.date(), _kit)
-            if _key not in _badge_seen:
-                _is_opt = _uav.content_type_id == _opt_ct_id
-                _dt = (_opt_types if _is_opt else _fpv_types).get(_uav.object_id)
-                _is_th = _dt.has_thermal if _dt else False
-                if not _is_opt:
-                    _purpose = 'ніч' if _is_th else 'день'
-                    _purpose_label = 'Ніч' if _is_th else 'День'
-                else:
-                    _purpose = 'ударні'
-                    _purpose_label = 'Ударні'
-                _g = {
-                    '_key': _key,
-                    'type_label': _make_list_type_label(_dt, _is_opt),
-                    'category': 'Оптика' if _is_opt else 'Радіо',
-                    'mode_label': 'Ніч' if _is_th else 'День',
-                    'purpose': _purpose,
-                    'purpose_label': _purpose_label,
-                    'role_name': _uav.role.name if _uav.role_id else '—',
-                    'date': _uav.created_at.date(),
-                    'type_key': f"{_uav.content_type_id}-{_uav.object_id}",
-                    'date_str': _uav.created_at.date().isoformat(),
-                    'kit_status': _kit,
-                    'kit_label': UAVInstance.KIT_LABELS[_kit],
-                    'total': 0,
-                    'status_counts': {},
-                    'uavs': [],
-                }
-                _badge_seen[_key] = _g
-                badge_groups.append(_g)
-                _group_uav_ids[_key] = []
-            _bg = _badge_seen[_key]
-            _bg['total'] += 1
-            _bg['status_counts'][_uav.status] = _bg['status_counts'].get(_uav.status, 0) + 1
-            _group_uav_ids[_key].append(_uav.pk)
-
-        for _g in badge_groups:
-            _g['status_items'] = [
-                (s, _status_display.get(s, s), c)
-                for s, c in _g['status_counts'].items()
-            ]
-            _g['cnt_ready']      = _g['status_counts'].get('ready', 0)
-            _g['cnt_inspection'] = _g['status_counts'].get('inspection', 0)
-            _g['cnt_repair']     = _g['status_counts'].get('repair', 0)
-            _g['cnt_deferred']   = _g['status_counts'].get('deferred', 0)
-            _g['cnt_transit']    = _g['status_counts'].get('transit', 0)
+        current_groups = []
+        _groups_by_key = {}
+        for _row in page_obj:
+            _ct_id, _obj_id = _row['content_type_id'], _row['object_id']
+            _day, _kit = _row['_batch_date'], _row['kit_status']
+            _is_opt = _ct_id == _opt_ct_id
+            _tl = _type_labels.get((_ct_id, _obj_id))
+            _is_th = _tl.has_thermal if _tl else False
+            _g = {
+                'type_label': _tl.list_label if _tl else '—',
+                'category': 'Оптика' if _is_opt else 'Радіо',
+                'mode_label': 'Ніч' if _is_th else 'День',
+                'purpose': 'ударні' if _is_opt else ('ніч' if _is_th else 'день'),
+                'purpose_label': 'Ударні' if _is_opt else ('Ніч' if _is_th else 'День'),
+                'role_name': '—',
+                'date': _day,
+                'type_key': f"{_ct_id}-{_obj_id}",
+                'date_str': _day.isoformat(),
+                'kit_status': _kit,
+                'kit_label': UAVInstance.KIT_LABELS[_kit],
+                'total': _row['total'],
+                'status_items': [
+                    (s, _status_display.get(s, s), _row[f'cnt_{s}'])
+                    for s in _group_statuses if _row[f'cnt_{s}']
+                ],
+                'uavs': [],
+            }
+            for s in _group_statuses:
+                _g[f'cnt_{s}'] = _row[f'cnt_{s}']
+            current_groups.append(_g)
+            _groups_by_key[(_ct_id, _obj_id, _day, _kit)] = _g
+        page_obj.object_list = current_groups
 
         # Quantity-mode groups — grouped by type + location
         _STATUS_ORDER_QTY = ['ready', 'inspection', 'repair', 'deferred', 'given', 'transit']
@@ -384,12 +308,12 @@ def equipment_list(request):
             'given':      [('ready', 'Готовий'), ('inspection', 'Перевірка')],
         }
 
-        qty_raw = (
-            uavs
-            .values('content_type_id', 'object_id', 'current_location_id', 'position_id',
-                    'pending_to_location_id', 'status')
-            .annotate(cnt=Count('pk'))
-        )
+        _qty_fields = ('content_type_id', 'object_id', 'current_location_id', 'position_id',
+                       'pending_to_location_id', 'status')
+        if counters_usable:
+            qty_raw = counters.values(*_qty_fields).annotate(cnt=Sum('count'))
+        else:
+            qty_raw = uavs.values(*_qty_fields).annotate(cnt=Count('pk'))
         _qty_map = {}
         for _row in qty_raw:
             _qkey = (_row['content_type_id'], _row['object_id'],
@@ -406,7 +330,7 @@ def equipment_list(request):
         for (_qct, _qobj, _qloc_id, _qpos_id, _qpend_id), _scounts in sorted(
             _qty_map.items(),
             key=lambda x: (
-                _make_qty_label(x[0][0], x[0][1], _fpv_ct_id, _fpv_types, _opt_types),
+                labels.list_label(x[0][0], x[0][1]),
                 _loc_dict[x[0][2]].name if x[0][2] and x[0][2] in _loc_dict else '',
             )
         ):
@@ -433,57 +357,54 @@ def equipment_list(request):
                     'is_position_loc': _qloc_id in _pos_loc_ids,
                     'pending_to_location_name': _loc_label(_qpend_id) if _qpend_id else '',
                     'pending_to_is_position': bool(_qpend_id and _qpend_id in _pos_loc_ids),
-                    'type_label': _make_qty_label(_qct, _qobj, _fpv_ct_id, _fpv_types, _opt_types),
+                    'type_label': labels.list_label(_qct, _qobj),
                     'status_rows': _srows,
                     'total': sum(_scounts.values()),
                 })
 
-        # Paginate at GROUP level — each page shows up to 20 drone-type groups
-        total_uavs = sum(_g['total'] for _g in badge_groups)
-        paginator = Paginator(badge_groups, 20)
-        page_number = request.GET.get("page")
-        page_obj = paginator.get_page(page_number)
-        current_groups = list(page_obj)
+        # Total comes from the counters when no per-drone filter is active
+        if counters_usable:
+            total_uavs = counters.aggregate(n=Sum('count'))['n'] or 0
+        else:
+            total_uavs = uavs.count()
 
         # Load full UAV details only for the current page's groups
-        current_uav_ids = [pk for _g in current_groups for pk in _group_uav_ids.get(_g['_key'], [])]
-        if current_uav_ids:
-            uavs_detail = {
-                uav.pk: uav
-                for uav in UAVInstance.objects.filter(pk__in=current_uav_ids)
-                    .select_related("content_type", "current_location", "position", "role", "pending_to_location")
-                    .prefetch_related(Prefetch("components", queryset=Component.objects.only("kind", "assigned_to_uav_id")))
-            }
-            for _g in current_groups:
-                _g['uavs'] = [uavs_detail[pk] for pk in _group_uav_ids.get(_g['_key'], []) if pk in uavs_detail]
-
-        # Build drone type choices — reuse already-fetched type dicts (no extra queries).
+        if _groups_by_key:
+            _member_q = Q()
+            for (_ct_id, _obj_id, _day, _kit) in _groups_by_key:
+                _member_q |= Q(content_type_id=_ct_id, object_id=_obj_id, _batch_date=_day, kit_status=_kit)
+            for uav in (uavs_grouped.filter(_member_q)
+                        .select_related("content_type", "current_location", "position", "role", "pending_to_location")
+                        .annotate(component_count=Count('components'))
+                        .order_by('-created_at')):
+                _g = _groups_by_key[(uav.content_type_id, uav.object_id, uav._batch_date, uav.kit_status)]
+                if not _g['uavs'] and uav.role_id:
+                    _g['role_name'] = uav.role.name
+                _g['uavs'].append(uav)
+
+        # Build drone type choices from the label registry (no extra queries).
         # Deduplicate by label: if two types produce the same display label, keep only the first.
         _tc_seen = set()
-        for _dt in sorted(_fpv_types.values(), key=lambda d: _make_list_type_label(d, False)):
-            _lbl = '[Радіо] ' + _make_list_type_label(_dt, False)
-            if _lbl not in _tc_seen:
-                _tc_seen.add(_lbl)
-                type_choices.append((f"{_fpv_ct_id}-{_dt.pk}", _lbl))
-        for _dt in sorted(_opt_types.values(), key=lambda d: _make_list_type_label(d, True)):
-            _lbl = '[Оптика] ' + _make_list_type_label(_dt, True)
-            if _lbl not in _tc_seen:
-                _tc_seen.add(_lbl)
-                type_choices.append((f"{_opt_ct_id}-{_dt.pk}", _lbl))
+        for (_ct_id, _obj_id), _tl in sorted(_type_labels.items(), key=lambda kv: (kv[1].full_label, kv[0])):
+            if _tl.full_label not in _tc_seen:
+                _tc_seen.add(_tl.full_label)
+                type_choices.append((f"{_ct_id}-{_obj_id}", _tl.full_label))
         type_choices.sort(key=lambda x: x[1])
 
-        # Summary counts — single aggregated query, total derived from it (no COUNT(*) needed)
-        all_uavs = UAVInstance.objects.exclude(status='deleted')
-        _status_agg = {row['status']: row['cnt'] for row in all_uavs.values('status').annotate(cnt=Count('pk'))}
+        # Summary counts — read from the inventory counters, total derived from them
+        _status_agg = {
+            row['status']: row['cnt']
+            for row in InventoryCounter.objects.values('status').annotate(cnt=Sum('count'))
+        }
         total_drones = sum(_status_agg.values())
         status_counts = {
             code: {"label": label, "count": _status_agg.get(code, 0)}
             for code, label in UAVInstance.STATUS_CHOICES if code != 'deleted'
         }
 
-        drone_roles = DronePurpose.objects.all()
+        drone_roles = reference.objects(DronePurpose)
 
-        _positions = list(Position.objects.annotate(uav_count=Count('uavs')))
+        _positions = reference.objects(Position)
         _pos_dict = {pos.pk: pos for pos in _positions}
         for _g in qty_groups:
             if _g['is_position_loc'] and _g['position_id']:
@@ -494,7 +415,21 @@ def equipment_list(request):
                 _g['pending_to_location_name'] = f'Позиція "{_pos.name}"' if _pos else _g['pending_to_location_name']
 
     elif tab == 'locations':
-        _positions = list(Position.objects.annotate(uav_count=Count('uavs')))
+        # Active drones per location / position, from the inventory counters
+        _loc_counts, _pos_counts = {}, {}
+        for _loc_id, _pos_id, _n in (
+            InventoryCounter.objects
+            .values_list('current_location_id', 'position_id')
+            .annotate(n=Sum('count'))
+            .order_by()
+        ):
+            _loc_counts[_loc_id] = _loc_counts.get(_loc_id, 0) + _n
+            _pos_counts[_pos_id] = _pos_counts.get(_pos_id, 0) + _n
+        for loc in _locations:
+            loc.uav_count = _loc_counts.get(loc.pk, 0)
+        _positions = reference.objects(Position)
+        for pos in _positions:
+            pos.uav_count = _pos_counts.get(pos.pk, 0)
         _pos_dict = {pos.pk: pos for pos in _positions}
 
     # Components with filters
@@ -508,6 +443,9 @@ def equipment_list(request):
     if tab == 'components':
         components_qs = Component.objects.select_related(
             "power_template", "video_template", "other_type", "assigned_to_uav"
+        ).prefetch_related(
+            # str(assigned_to_uav) shows its drone type and model
+            "assigned_to_uav__uav_type__model"
         ).exclude(status='given').order_by("-created_at")
         if comp_status_filter:
             components_qs = components_qs.filter(status=comp_status_filter)
@@ -563,15 +501,15 @@ def equipment_list(request):
     power_templates = []
     video_templates = []
     if tab in ('templates', 'components'):
-        power_templates = PowerTemplate.objects.filter(is_deleted=False)
-        video_templates = VideoTemplate.objects.filter(is_deleted=False).select_related("drone_model")
+        power_templates = [t for t in reference.objects(PowerTemplate) if not t.is_deleted]
+        video_templates = [t for t in reference.objects(VideoTemplate) if not t.is_deleted]
 
     # ── Reference lookups — only when needed ─────────────────────────────────────
     manufacturers = []
     drone_models = []
     if tab in ('types', 'templates'):
-        manufacturers = Manufacturer.objects.all()
-        drone_models = DroneModel.objects.select_related("manufacturer").all()
+        manufacturers = reference.objects(Manufacturer)
+        drone_models = reference.objects(DroneModel)
 
     ctx = {
         "tab": tab,
@@ -611,86 +549,46 @@ def equipment_list(request):
         "total_uavs": total_uavs,
         "position_location_ids": position_location_ids,
         "qty_groups": qty_groups,
-        "can_add_uav":    request.user.has_perm(PERM_ADD_UAV),
-        "can_edit_uav":   request.user.has_perm(PERM_CHANGE_UAV),
-        "can_delete_uav": request.user.has_perm(PERM_DELETE_UAV),
         "positions": _positions,
-        "can_add_component":    request.user.has_perm('equipment_accounting.add_component'),
-        "can_edit_component":   request.user.has_perm('equipment_accounting.change_component'),
-        "can_delete_component": request.user.has_perm('equipment_accounting.delete_component'),
-        "can_add_manufacturer":    request.user.has_perm(PERM_ADD_MANUFACTURER),
-        "can_edit_manufacturer":   request.user.has_perm(PERM_CHANGE_MANUFACTURER),
-        "can_delete_manufacturer": request.user.has_perm(PERM_DELETE_MANUFACTURER),
-        "can_add_dronemodel":    request.user.has_perm(PERM_ADD_DRONEMODEL),
-        "can_edit_dronemodel":   request.user.has_perm(PERM_CHANGE_DRONEMODEL),
-        "can_delete_dronemodel": request.user.has_perm(PERM_DELETE_DRONEMODEL),
-        "can_add_fpvtype":    request.user.has_perm(PERM_ADD_FPVTYPE),
-        "can_edit_fpvtype":   request.user.has_perm(PERM_CHANGE_FPVTYPE),
-        "can_delete_fpvtype": request.user.has_perm(PERM_DELETE_FPVTYPE),
-        "can_add_opticaltype":    request.user.has_perm(PERM_ADD_OPTICALTYPE),
-        "can_edit_opticaltype":   request.user.has_perm(PERM_CHANGE_OPTICALTYPE),
-        "can_delete_opticaltype": request.user.has_perm(PERM_DELETE_OPTICALTYPE),
-        "can_add_powertemplate":    request.user.has_perm(PERM_ADD_POWERTEMPLATE),
-        "can_edit_powertemplate":   request.user.has_perm(PERM_CHANGE_POWERTEMPLATE),
-        "can_delete_powertemplate": request.user.has_perm(PERM_DELETE_POWERTEMPLATE),
-        "can_see_powertemplate": any(
-            request.user.has_perm(p) for p in [
-                'equipment_accounting.view_powertemplate', 'equipment_accounting.add_powertemplate',
-                'equipment_accounting.change_powertemplate', 'equipment_accounting.delete_powertemplate',
-            ]
-        ),
-        "can_add_videotemplate":    request.user.has_perm(PERM_ADD_VIDEOTEMPLATE),
-        "can_edit_videotemplate":   request.user.has_perm(PERM_CHANGE_VIDEOTEMPLATE),
-        "can_delete_videotemplate": request.user.has_perm(PERM_DELETE_VIDEOTEMPLATE),
-        "can_see_videotemplate": any(
-            request.user.has_perm(p) for p in [
-                'equipment_accounting.view_videotemplate', 'equipment_accounting.add_videotemplate',
-                'equipment_accounting.change_videotemplate', 'equipment_accounting.delete_videotemplate',
-            ]
-        ),
-        "can_tab_components": any(
-            request.user.has_perm(p) for p in [
-                'equipment_accounting.add_component',
-                'equipment_accounting.change_component',
-                'equipment_accounting.delete_component',
-            ]
-        ),
-        "can_tab_types": any(
-            request.user.has_perm(p) for p in [
-                'equipment_accounting.view_manufacturer',  'equipment_accounting.add_manufacturer',    'equipment_accounting.change_manufacturer',    'equipment_accounting.delete_manufacturer',
-                'equipment_accounting.view_dronemodel',   'equipment_accounting.add_dronemodel',       'equipment_accounting.change_dronemodel',      'equipment_accounting.delete_dronemodel',
-                'equipment_accounting.view_fpvdronetype', 'equipment_accounting.add_fpvdronetype',     'equipment_accounting.change_fpvdronetype',    'equipment_accounting.delete_fpvdronetype',
-                'equipment_accounting.view_opticaldronetype', 'equipment_accounting.add_opticaldronetype', 'equipment_accounting.change_opticaldronetype', 'equipment_accounting.delete_opticaldronetype',
-            ]
-        ),
-        "can_tab_templates": any(
-            request.user.has_perm(p) for p in [
-                'equipment_accounting.view_powertemplate', 'equipment_accounting.add_powertemplate',  'equipment_accounting.change_powertemplate',  'equipment_accounting.delete_powertemplate',
-                'equipment_accounting.view_videotemplate', 'equipment_accounting.add_videotemplate',  'equipment_accounting.change_videotemplate',  'equipment_accounting.delete_videotemplate',
-            ]
-        ),
-        "can_add_location":    request.user.has_perm(PERM_ADD_LOCATION),
-        "can_edit_location":   request.user.has_perm(PERM_CHANGE_LOCATION),
-        "can_delete_location": request.user.has_perm(PERM_DELETE_LOCATION),
-        "can_add_position":    request.user.has_perm(PERM_ADD_POSITION),
-        "can_edit_position":   request.user.has_perm(PERM_CHANGE_POSITION),
-        "can_delete_position": request.user.has_perm(PERM_DELETE_POSITION),
-        "can_tab_locations": any(
-            request.user.has_perm(p) for p in [
-                'equipment_accounting.view_location',  'equipment_accounting.add_location',
-                'equipment_accounting.change_location', 'equipment_accounting.delete_location',
-                'equipment_accounting.view_position',  'equipment_accounting.add_position',
-                'equipment_accounting.change_position', 'equipment_accounting.delete_position',
-            ]
-        ),
+        **permissions.for_request(request).as_context(),
     }
 
     return render(request, "equipment_accounting/equipment_list.html", ctx)
 
 
+@master_required
+def uav_search_suggest(request):
+    """Typeahead for the equipment list search: ranked JSON matches."""
+    q = request.GET.get('q', '').strip()
+    hits = search.suggest(q) if len(q) >= 2 else []
+    by_pk = {
+        u.pk: u for u in UAVInstance.objects
+        .filter(pk__in=[pk for pk, _ in hits])
+        .select_related('current_location', 'position')
+    }
+    results = []
+    for pk, _rank in hits:
+        uav = by_pk.get(pk)
+        if uav is None:
+            continue
+        detail = ' · '.join(filter(None, [
+            uav.current_location.name if uav.current_location else '',
+            uav.position.name if uav.position else '',
+            uav.notes,
+        ]))
+        results.append({
+            'id': uav.pk,
+            'label': f"#{uav.pk} {labels.list_label(uav.content_type_id, uav.object_id)}",
+            'detail': detail,
+            'url': reverse('equipment_accounting:uav_detail', args=[uav.pk]),
+        })
+    return JsonResponse({'results': results})
+
+
 # ── Component Statistics ─────────────────────────────────────────────
 
 @master_required
+@replica.reporting
 def component_stats(request):
     battery_stats = PowerTemplate.objects.filter(is_deleted=False).annotate(
         total=Count('battery_components',
@@ -760,30 +658,38 @@ def component_stats(request):
 # ── Drone location statistics ─────────────────────────────────────────
 
 @master_required
+@replica.reporting
 def drone_location_stats(request):
     """Show drone counts grouped by current location and status."""
-    locations = Location.objects.annotate(
-        total=Count('current_uavs', filter=~Q(current_uavs__status='deleted')),
-        cnt_ready=Count('current_uavs', filter=Q(current_uavs__status='ready')),
-        cnt_inspection=Count('current_uavs', filter=Q(current_uavs__status='inspection')),
-        cnt_repair=Count('current_uavs', filter=Q(current_uavs__status='repair')),
-        cnt_deferred=Count('current_uavs', filter=Q(current_uavs__status='deferred')),
-        cnt_given=Count('current_uavs', filter=Q(current_uavs__status='given')),
-    ).order_by('name')
-
-    total_all = UAVInstance.objects.exclude(status='deleted').count()
-    transit_total = UAVInstance.objects.filter(status='transit').count()
+    # One pass over the inventory counters: (location, status) → count
+    _loc_status = {}
+    total_all = transit_total = 0
+    for row in InventoryCounter.objects.values('current_location_id', 'status').annotate(n=Sum('count')):
+        _loc_status.setdefault(row['current_location_id'], {})[row['status']] = row['n']
+        total_all += row['n']
+        if row['status'] == 'transit':
+            transit_total += row['n']
+
+    locations = reference.objects(Location)
+    for loc in locations:
+        by_status = _loc_status.get(loc.pk, {})
+        loc.total = sum(by_status.values())
+        loc.cnt_ready = by_status.get('ready', 0)
+        loc.cnt_inspection = by_status.get('inspection', 0)
+        loc.cnt_repair = by_status.get('repair', 0)
+        loc.cnt_deferred = by_status.get('deferred', 0)
+        loc.cnt_given = by_status.get('given', 0)
 
     # Per-position-name breakdown for position-type locations
     # (includes both confirmed drones and transit drones en route)
     _pos_sub = {}  # loc_id -> {position_name -> count}
 
     for item in (
-        UAVInstance.objects
-        .exclude(status__in=['deleted', 'transit'])
+        InventoryCounter.objects
+        .exclude(status='transit')
         .filter(current_location__name='Позиція')
         .values('current_location_id', 'position__name')
-        .annotate(n=Count('pk'))
+        .annotate(n=Sum('count'))
     ):
         lid = item['current_location_id']
         pname = item['position__name'] or ''
@@ -791,12 +697,12 @@ def drone_location_stats(request):
         _pos_sub[lid][pname] = _pos_sub[lid].get(pname, 0) + item['n']
 
     for item in (
-        UAVInstance.objects
+        InventoryCounter.objects
         .filter(status='transit',
                 pending_to_location__isnull=False,
                 pending_to_location__name='Позиція')
         .values('pending_to_location_id', 'position__name')
-        .annotate(n=Count('pk'))
+        .annotate(n=Sum('count'))
     ):
         lid = item['pending_to_location_id']
         pname = item['position__name'] or ''
@@ -827,41 +733,112 @@ def drone_location_stats(request):
     })
 
 
+_TREND_DAYS = [30, 90, 180, 365]
+
+
 @master_required
-def drone_stats(request):
-    """Detailed drone count breakdown by type, mode, and status — with filters and Excel export."""
+def inventory_trends(request):
+    """Chart of the daily inventory snapshots; data comes from inventory_trends_data."""
+    return render(request, 'equipment_accounting/inventory_trends.html', {
+        'dimensions': InventorySnapshotTotal.DIMENSION_CHOICES,
+        'day_choices': _TREND_DAYS,
+        'status_choices': [c for c in UAVInstance.STATUS_CHOICES if c[0] != 'deleted'],
+        'locations': reference.objects(Location),
+        'roles': reference.objects(DronePurpose),
+        'type_choices': sorted(
+            ((f"{ct_id}-{obj_id}", lbl.full_label) for (ct_id, obj_id), lbl in labels.all_labels().items()),
+            key=lambda choice: choice[1],
+        ),
+    })
+
+
+@master_required
+def inventory_trends_data(request):
+    """JSON series of the daily inventory snapshots, split by one dimension."""
+    by = request.GET.get('by', 'status')
+    if by not in snapshots.DIMENSION_FIELDS:
+        by = 'status'
+    try:
+        days = min(max(int(request.GET.get('days', 90)), 1), 3650)
+    except ValueError:
+        days = 90
+
+    filters = {}
+    if request.GET.get('status'):
+        filters['status'] = request.GET['status']
+    if request.GET.get('location', '').isdigit():
+        filters['current_location_id'] = int(request.GET['location'])
+    if request.GET.get('role', '').isdigit():
+        filters['role_id'] = int(request.GET['role'])
+    if re.fullmatch(r'\d+-\d+', request.GET.get('type', '')):
+        ct_id, obj_id = request.GET['type'].split('-')
+        filters['content_type_id'], filters['object_id'] = int(ct_id), int(obj_id)
+
+    dates, values = snapshots.series(by, days, filters)
+
+    if by == 'status':
+        names = dict(UAVInstance.STATUS_CHOICES)
+    elif by == 'type':
+        names = {
+            f"{ct_id}-{obj_id}": lbl.full_label
+            for (ct_id, obj_id), lbl in labels.all_labels().items()
+        }
+    else:
+        model = Location if by == 'location' else DronePurpose
+        names = {
+            str(pk): name
+            for pk, name in model.objects.filter(pk__in=[k for k in values if k]).values_list('pk', 'name')
+        }
+    series = sorted(
+        (
+            {'key': key, 'label': names.get(key) or '—', 'values': counts}
+            for key, counts in values.items()
+        ),
+        key=lambda item: -max(item['values']),
+    )
+    return JsonResponse({
+        'by': by,
+        'dates': [day.isoformat() for day in dates],
+        'totals': [sum(day_counts) for day_counts in zip(*values.values())] if values else [0] * len(dates),
+        'series': series,
+    })
+
+
+_DRONE_STATS_STATUSES = [
+    ('ready',      'Готовий'),
+    ('inspection', 'Перевірка'),
+    ('repair',     'Ремонт'),
+    ('deferred',   'Відкладено'),
+    ('transit',    'В дорозі'),
+    ('given',      'Віддано'),
+]
+
+
+def _drone_stats_data(params):
+    """Parse drone_stats filters from ``params`` and build the table sections.
+
+    Shared by the page and its background export job.
+    """
     _fpv_ct = ContentType.objects.get_for_model(FPVDroneType)
     _opt_ct = ContentType.objects.get_for_model(OpticalDroneType)
 
-    ALL_STATUSES = [
-        ('ready',      'Готовий'),
-        ('inspection', 'Перевірка'),
-        ('repair',     'Ремонт'),
-        ('deferred',   'Відкладено'),
-        ('transit',    'В дорозі'),
-        ('given',      'Віддано'),
-    ]
+    ALL_STATUSES = _DRONE_STATS_STATUSES
     ALL_STATUS_KEYS = [s for s, _ in ALL_STATUSES]
 
-    fpv_types_map = {dt.pk: dt for dt in FPVDroneType.objects.select_related(
-        'model', 'video_frequency',
-    ).prefetch_related('control_frequencies')}
-    opt_types_map = {dt.pk: dt for dt in OpticalDroneType.objects.select_related(
-        'model', 'video_template',
-    )}
-    all_locations = list(Location.objects.all().order_by('name'))
-    all_roles     = list(DronePurpose.objects.all().order_by('name'))
+    type_labels   = labels.all_labels()
+    all_locations = reference.objects(Location)
+    all_roles     = reference.objects(DronePurpose)
 
     # ── Parse filters ────────────────────────────────────────────────
     # _f sentinel: if present the form was submitted; otherwise use defaults
-    is_filtered = '_f' in request.GET
+    is_filtered = '_f' in params
 
     if is_filtered:
-        sel_loc_ids   = {int(x) for x in request.GET.getlist('loc')  if x.isdigit()}
-        sel_stat_keys = [s for s in request.GET.getlist('stat') if s in ALL_STATUS_KEYS]
-        sel_modes     = set(request.GET.getlist('mode'))   # 'day', 'night'
-        sel_cats      = set(request.GET.getlist('cat'))    # 'fpv', 'optical'
-        sel_role_ids  = {int(x) for x in request.GET.getlist('role') if x.isdigit()}
+        sel_loc_ids   = {int(x) for x in params.getlist('loc')  if x.isdigit()}
+        sel_stat_keys = [s for s in params.getlist('stat') if s in ALL_STATUS_KEYS]
+        sel_modes     = set(params.getlist('mode'))   # 'day', 'night'
+        sel_cats      = set(params.getlist('cat'))    # 'fpv', 'optical'
+        sel_role_ids  = {int(x) for x in params.getlist('role') if x.isdigit()}
     else:
         sel_loc_ids   = {loc.pk for loc in all_locations}
         sel_stat_keys = list(ALL_STATUS_KEYS)
@@ -883,26 +860,36 @@ def drone_stats(request):
 
     # ── Helpers ──────────────────────────────────────────────────────
     def _tlabel(ct_id, obj_id):
-        if ct_id == _fpv_ct.id:
-            dt = fpv_types_map.get(obj_id)
-            return _make_list_type_label(dt, False) if dt else f'FPV #{obj_id}'
-        dt = opt_types_map.get(obj_id)
-        return _make_list_type_label(dt, True) if dt else f'Opt #{obj_id}'
-
-    def _build(type_q):
-        raw = (
-            UAVInstance.objects
-            .filter(type_q & loc_q)
-            .exclude(status='deleted')
-            .values('content_type_id', 'object_id', 'status')
-            .annotate(cnt=Count('pk'))
-        )
+        tl = type_labels.get((ct_id, obj_id))
+        if tl:
+            return tl.list_label
+        return f'FPV #{obj_id}' if ct_id == _fpv_ct.id else f'Opt #{obj_id}'
+
+    # One pass over the counters: (type, role, status) → count under the location
+    # filter; every section and the summary cards are partitions of these rows
+    counts_qs = InventoryCounter.objects.all()
+    if loc_q != Q():
+        counts_qs = counts_qs.filter(loc_q)
+    grouped = [
+        (row['content_type_id'], row['object_id'], row['role_id'], row['status'], row['cnt'])
+        for row in counts_qs
+        .values('content_type_id', 'object_id', 'role_id', 'status')
+        .annotate(cnt=Sum('count'))
+        .order_by()
+    ]
+    total_by_status = {s: 0 for s in ALL_STATUS_KEYS}
+    for _, _, _, status, cnt in grouped:
+        if status in total_by_status:
+            total_by_status[status] += cnt
+
+    def _build(matches):
         data = {}
-        for row in raw:
-            key = (row['content_type_id'], row['object_id'])
-            data.setdefault(key, {s: 0 for s in ALL_STATUS_KEYS})
-            if row['status'] in ALL_STATUS_KEYS:
-                data[key][row['status']] = row['cnt']
+        for ct_id, obj_id, role_id, status, cnt in grouped:
+            if not matches(ct_id, obj_id, role_id):
+                continue
+            counts = data.setdefault((ct_id, obj_id), {s: 0 for s in ALL_STATUS_KEYS})
+            if status in counts:
+                counts[status] += cnt
 
         rows = []
         for key in sorted(data, key=lambda k: _tlabel(*k)):
@@ -919,27 +906,27 @@ def drone_stats(request):
         return rows, totals, grand
 
     # ── Build sections ───────────────────────────────────────────────
-    fpv_day_ids   = [pk for pk, dt in fpv_types_map.items() if not dt.has_thermal]
-    fpv_night_ids = [pk for pk, dt in fpv_types_map.items() if dt.has_thermal]
-    opt_ids       = list(opt_types_map.keys())
+    fpv_day_ids   = {obj_id for (ct_id, obj_id), tl in type_labels.items() if ct_id == _fpv_ct.id and not tl.has_thermal}
+    fpv_night_ids = {obj_id for (ct_id, obj_id), tl in type_labels.items() if ct_id == _fpv_ct.id and tl.has_thermal}
+    opt_ids       = {obj_id for (ct_id, obj_id) in type_labels if ct_id == _opt_ct.id}
 
     ROLE_COLORS = ['sky', 'violet', 'rose', 'amber', 'emerald', 'indigo']
     sections = []
 
     if 'day' in sel_modes and 'fpv' in sel_cats:
-        rows, tots, grand = _build(Q(content_type=_fpv_ct, object_id__in=fpv_day_ids))
+        rows, tots, grand = _build(lambda ct_id, obj_id, _: ct_id == _fpv_ct.id and obj_id in fpv_day_ids)
         if rows:
             sections.append({'name': 'День',   'subtitle': 'FPV · без термальної камери',
                              'color': 'day',    'rows': rows, 'totals': tots, 'grand': grand})
 
     if 'night' in sel_modes and 'fpv' in sel_cats:
-        rows, tots, grand = _build(Q(content_type=_fpv_ct, object_id__in=fpv_night_ids))
+        rows, tots, grand = _build(lambda ct_id, obj_id, _: ct_id == _fpv_ct.id and obj_id in fpv_night_ids)
         if rows:
             sections.append({'name': 'Ніч',    'subtitle': 'FPV · термальна камера',
                              'color': 'night',  'rows': rows, 'totals': tots, 'grand': grand})
 
     if 'optical' in sel_cats:
-        rows, tots, grand = _build(Q(content_type=_opt_ct, object_id__in=opt_ids))
+        rows, tots, grand = _build(lambda ct_id, obj_id, _: ct_id == _opt_ct.id and obj_id in opt_ids)
         if rows:
             sections.append({'name': 'Оптика', 'subtitle': 'Оптичні БПЛА',
                              'color': 'optical', 'rows': rows, 'totals': tots, 'grand': grand})
@@ -947,123 +934,126 @@ def drone_stats(request):
     for i, role in enumerate(all_roles):
         if role.pk not in sel_role_ids:
             continue
-        rows, tots, grand = _build(Q(role=role))
+        rows, tots, grand = _build(lambda ct_id, obj_id, role_id, role_pk=role.pk: role_id == role_pk)
         if rows:
             sections.append({'name': role.name, 'subtitle': f'Роль: {role.name}',
                              'color': ROLE_COLORS[i % len(ROLE_COLORS)],
                              'rows': rows, 'totals': tots, 'grand': grand})
 
+    return {
+        'statuses':      statuses,
+        'sections':      sections,
+        'total_by_status': total_by_status,
+        'is_filtered':   is_filtered,
+        'all_locations': all_locations,
+        'all_roles':     all_roles,
+        'sel_loc_ids':   sel_loc_ids,
+        'sel_stat_keys': sel_stat_keys,
+        'sel_modes':     sel_modes,
+        'sel_cats':      sel_cats,
+        'sel_role_ids':  sel_role_ids,
+    }
+
+
+def _drone_stats_export_job(params):
+    data = _drone_stats_data(params)
+    columns, rows, styles = _drone_stats_export(data['statuses'], data['sections'])
+    return 'drone_stats', 'Деталізація БПЛА', columns, rows, styles
+
+
+@master_required
+@replica.reporting
+def drone_stats(request):
+    """Detailed drone count breakdown by type, mode, and status — with filters and Excel export."""
+    if request.GET.get('export') in exports.FORMATS:
+        return _start_export(request, 'drone_stats', request.GET['export'])
+
+    data = _drone_stats_data(request.GET)
+    ALL_STATUSES = _DRONE_STATS_STATUSES
+    sel_loc_ids, sel_stat_keys = data['sel_loc_ids'], data['sel_stat_keys']
+    sel_modes, sel_cats, sel_role_ids = data['sel_modes'], data['sel_cats'], data['sel_role_ids']
+
     # ── Summary cards ────────────────────────────────────────────────
-    summary_qs = UAVInstance.objects.exclude(status='deleted')
-    if loc_q != Q():
-        summary_qs = summary_qs.filter(loc_q)
-    total_by_status = {s: 0 for s in ALL_STATUS_KEYS}
-    for row in summary_qs.values('status').annotate(cnt=Count('pk')):
-        if row['status'] in ALL_STATUS_KEYS:
-            total_by_status[row['status']] = row['cnt']
+    total_by_status = data['total_by_status']
     total_all     = sum(total_by_status.values())
     summary_cards = [(s, lbl, total_by_status[s]) for s, lbl in ALL_STATUSES]
 
-    # ── Excel export ─────────────────────────────────────────────────
-    if request.GET.get('export') == 'xlsx':
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, PatternFill, Alignment
-        from openpyxl.utils import get_column_letter
-
-        STAT_COLORS = {
-            'ready': '15803D', 'inspection': '1D4ED8', 'repair': 'B45309',
-            'deferred': '94A3B8', 'transit': '0F766E', 'given': '475569',
-        }
-        SEC_STYLES = {
-            'День':   ('FEF3C7', '92400E'), 'Ніч':    ('E0E7FF', '3730A3'),
-            'Оптика': ('F3E8FF', '6B21A8'),
-        }
-        DEF_STYLE = ('F1F5F9', '1E293B')
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Деталізація БПЛА'
-
-        headers = ['Тип БПЛА'] + [lbl for _, lbl in statuses] + ['Всього']
-        hdr_fill = PatternFill(fill_type='solid', fgColor='D6DCE4')
-        hdr_font = Font(bold=True, size=10, name='Calibri')
-        for ci, h in enumerate(headers, 1):
-            c = ws.cell(row=1, column=ci, value=h)
-            c.font = hdr_font; c.fill = hdr_fill
-            c.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        ws.row_dimensions[1].height = 26
-
-        rn = 2
-        for sec in sections:
-            bg, fg = SEC_STYLES.get(sec['name'], DEF_STYLE)
-            sec_fill = PatternFill(fill_type='solid', fgColor=bg)
-            sec_font = Font(bold=True, size=10, name='Calibri', color=fg)
-            # section header row
-            for ci in range(1, len(headers) + 1):
-                c = ws.cell(row=rn, column=ci,
-                            value=sec['name'] if ci == 1 else None)
-                c.font = sec_font; c.fill = sec_fill
-            rn += 1
-            # data rows
-            for dr in sec['rows']:
-                ws.cell(row=rn, column=1, value=dr['name']).font = Font(size=10, name='Calibri')
-                for ci, (sk, _, cnt) in enumerate(dr['status_counts'], 2):
-                    c = ws.cell(row=rn, column=ci, value=cnt or None)
-                    c.alignment = Alignment(horizontal='center')
-                    if cnt and sk in STAT_COLORS:
-                        c.font = Font(size=10, name='Calibri', color=STAT_COLORS[sk], bold=True)
-                tot_c = ws.cell(row=rn, column=len(headers), value=dr['total'])
-                tot_c.font = Font(bold=True, size=10, name='Calibri')
-                tot_c.alignment = Alignment(horizontal='center')
-                rn += 1
-            # totals row
-            tot_font = Font(bold=True, size=10, name='Calibri')
-            ws.cell(row=rn, column=1, value='Всього').font = tot_font
-            for ci, (_, _, cnt) in enumerate(sec['totals'], 2):
-                c = ws.cell(row=rn, column=ci, value=cnt or None)
-                c.font = tot_font; c.alignment = Alignment(horizontal='center')
-            gc = ws.cell(row=rn, column=len(headers), value=sec['grand'])
-            gc.font = tot_font; gc.alignment = Alignment(horizontal='center')
-            rn += 2  # blank row between sections
-
-        ws.column_dimensions[get_column_letter(1)].width = 38
-        for ci in range(2, len(headers) + 1):
-            ws.column_dimensions[get_column_letter(ci)].width = 13
-
-        resp = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        resp['Content-Disposition'] = 'attachment; filename="drone_stats.xlsx"'
-        wb.save(resp)
-        return resp
-
     # ── Render page ──────────────────────────────────────────────────
     filter_state = {
-        'locations': [(loc, loc.pk in sel_loc_ids) for loc in all_locations],
+        'locations': [(loc, loc.pk in sel_loc_ids) for loc in data['all_locations']],
         'statuses':  [(s, lbl, s in sel_stat_keys) for s, lbl in ALL_STATUSES],
         'modes':     [('day', 'День', 'day' in sel_modes),
                       ('night', 'Ніч', 'night' in sel_modes)],
         'cats':      [('fpv', 'Радіо (FPV)', 'fpv' in sel_cats),
                       ('optical', 'Оптика', 'optical' in sel_cats)],
-        'roles':     [(role, role.pk in sel_role_ids) for role in all_roles],
+        'roles':     [(role, role.pk in sel_role_ids) for role in data['all_roles']],
     }
 
-    # Build export URL (same params + export=xlsx)
+    # Build export URLs (same params + export=xlsx / csv)
     get_copy = request.GET.copy()
     get_copy['export'] = 'xlsx'
     export_url = '?' + get_copy.urlencode()
+    get_copy['export'] = 'csv'
+    csv_export_url = '?' + get_copy.urlencode()
 
     return render(request, 'equipment_accounting/drone_stats.html', {
-        'sections':      sections,
+        'sections':      data['sections'],
         'summary_cards': summary_cards,
         'total_all':     total_all,
         'filter_state':  filter_state,
-        'is_filtered':   is_filtered,
+        'is_filtered':   data['is_filtered'],
         'export_url':    export_url,
+        'csv_export_url': csv_export_url,
     })
 
 
 # ── Excel export ─────────────────────────────────────────────────────
 
+_STATS_STAT_COLORS = {
+    'ready': '15803D', 'inspection': '1D4ED8', 'repair': 'B45309',
+    'deferred': '94A3B8', 'transit': '0F766E', 'given': '475569',
+}
+_STATS_SECTION_STYLE = {
+    'День':   ('FEF3C7', '92400E'), 'Ніч':    ('E0E7FF', '3730A3'),
+    'Оптика': ('F3E8FF', '6B21A8'),
+}
+_STATS_DEFAULT_SECTION_STYLE = ('F1F5F9', '1E293B')
+
+
+def _drone_stats_export(statuses, sections):
+    """Columns, row generator and styles for the drone_stats export."""
+    columns = ([exports.Column('Тип БПЛА', 38)]
+               + [exports.Column(lbl, 13) for _, lbl in statuses]
+               + [exports.Column('Всього', 13)])
+    styles = {
+        'count': {'align': 'center'},
+        'bold':  {'bold': True},
+        'total': {'bold': True, 'align': 'center'},
+    }
+    for sk, color in _STATS_STAT_COLORS.items():
+        styles[f'stat:{sk}'] = {'bold': True, 'align': 'center', 'color': color}
+    for sec in sections:
+        bg, fg = _STATS_SECTION_STYLE.get(sec['name'], _STATS_DEFAULT_SECTION_STYLE)
+        styles[f"sec:{sec['name']}"] = {'bold': True, 'fill': bg, 'color': fg}
+
+    def rows():
+        C = exports.Cell
+        for sec in sections:
+            sec_style = f"sec:{sec['name']}"
+            yield [C(sec['name'], sec_style)] + [C(None, sec_style)] * (len(columns) - 1)
+            for dr in sec['rows']:
+                yield ([dr['name']]
+                       + [C(cnt or None, f'stat:{sk}' if cnt and sk in _STATS_STAT_COLORS else 'count')
+                          for sk, _, cnt in dr['status_counts']]
+                       + [C(dr['total'], 'total')])
+            yield ([C('Всього', 'bold')]
+                   + [C(cnt or None, 'total') for _, _, cnt in sec['totals']]
+                   + [C(sec['grand'], 'total')])
+            yield None  # blank row between sections
+
+    return columns, rows(), styles
+
+
 EXPORT_COLS = [
     ('name',       'Назва'),
     ('count',      'В наявності'),
@@ -1075,6 +1065,12 @@ EXPORT_COLS = [
     ('total',      'Підсумок'),
 ]
 
+_EXPORT_COL_WIDTHS = {
+    'name': 52, 'count': 13, 'unit': 6,
+    'messenger': 58, 'new': 10, 'repair': 13,
+    'mfr_repair': 24, 'total': 13,
+}
+
 _SECTION_PRIORITY = {
     'День': 0, 'Ніч': 1, 'Оптика': 2,
     'Носій': 3, 'Мінувальник': 4, 'Перехоплювач': 5, 'Бомбардувальник': 6,
@@ -1088,57 +1084,43 @@ _SECTION_STYLE = {
 _DEFAULT_SECTION_STYLE = {'bg': 'F2F2F2', 'fg': '333333'}
 
 
-@master_required
-def uav_export_excel(request):
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
-    from openpyxl.utils import get_column_letter
-
-    selected_cols = [c for c, _ in EXPORT_COLS if request.GET.get(f'col_{c}', '1') == '1']
+def _uav_export_sections():
+    """Group non-given inventory by export section and drone type.
 
+    Returns (section_order, sections) built from one aggregated query over
+    the inventory counters.
+    """
     fpv_ct = ContentType.objects.get_for_model(FPVDroneType)
     opt_ct = ContentType.objects.get_for_model(OpticalDroneType)
 
-    active_qs = UAVInstance.objects.exclude(status__in=['deleted', 'given']).select_related(
-        'content_type', 'role'
+    # Aggregated (type, role, status) counts straight from the inventory counters
+    active_rows = (
+        InventoryCounter.objects
+        .exclude(status='given')
+        .values('content_type_id', 'object_id', 'role__name', 'status')
+        .annotate(cnt=Sum('count'))
     )
 
-    fpv_pks = set(active_qs.filter(content_type=fpv_ct).values_list('object_id', flat=True))
-    opt_pks = set(active_qs.filter(content_type=opt_ct).values_list('object_id', flat=True))
-
-    fpv_type_map = (
-        {dt.pk: dt for dt in FPVDroneType.objects.filter(pk__in=fpv_pks)
-         .select_related('model', 'purpose', 'video_frequency')
-         .prefetch_related('control_frequencies')} if fpv_pks else {}
-    )
-    opt_type_map = (
-        {dt.pk: dt for dt in OpticalDroneType.objects.filter(pk__in=opt_pks)
-         .select_related('model', 'purpose', 'video_template')
-         .prefetch_related('control_frequencies')} if opt_pks else {}
-    )
+    type_labels = labels.all_labels()
 
     sections = {}
     section_order = []
 
-    for uav in active_qs:
-        role_name = uav.role.name if uav.role_id else '—'
+    for row in active_rows:
+        role_name = row['role__name'] or '—'
 
-        if uav.content_type_id == fpv_ct.pk:
-            dt = fpv_type_map.get(uav.object_id)
-            if not dt:
-                continue
-            section_key = ('Ніч' if dt.has_thermal else 'День') if role_name == 'Ударний' else role_name
-            type_label = _fmt_drone_type_name(dt, 'Радіо')
-            type_key = ('fpv', dt.pk)
-        elif uav.content_type_id == opt_ct.pk:
-            dt = opt_type_map.get(uav.object_id)
-            if not dt:
-                continue
+        tl = type_labels.get((row['content_type_id'], row['object_id']))
+        if not tl:
+            continue
+        if row['content_type_id'] == fpv_ct.pk:
+            section_key = ('Ніч' if tl.has_thermal else 'День') if role_name == 'Ударний' else role_name
+            type_key = ('fpv', row['object_id'])
+        elif row['content_type_id'] == opt_ct.pk:
             section_key = 'Оптика'
-            type_label = _fmt_drone_type_name(dt, 'Оптика')
-            type_key = ('opt', dt.pk)
+            type_key = ('opt', row['object_id'])
         else:
             continue
+        type_label = tl.export_label
 
         if section_key not in sections:
             sections[section_key] = {'types': {}, 'type_order': []}
@@ -1152,163 +1134,143 @@ def uav_export_excel(request):
             sections[section_key]['type_order'].append(type_key)
 
         t = sections[section_key]['types'][type_key]
-        if uav.status in t:
-            t[uav.status] += 1
+        if row['status'] in t:
+            t[row['status']] += row['cnt']
 
     section_order.sort(key=lambda sk: (_SECTION_PRIORITY.get(sk, 99), sk))
+    for section in sections.values():
+        section['type_order'].sort(key=lambda tk: section['types'][tk]['label'])
+    return section_order, sections
 
-    # Build workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = 'БПЛА'
+
+def _uav_export(selected_cols):
+    """Columns, row generator and styles for the equipment list export."""
+    from openpyxl.utils import get_column_letter
+
+    section_order, sections = _uav_export_sections()
 
     col_label_map = dict(EXPORT_COLS)
-    col_map = {c: i + 1 for i, c in enumerate(selected_cols)}
-
-    # Header row
-    hdr_font = Font(bold=True, size=10, name='Calibri')
-    hdr_fill = PatternFill(fill_type='solid', fgColor='D6DCE4')
-    for col_key, col_idx in col_map.items():
-        cell = ws.cell(row=1, column=col_idx, value=col_label_map[col_key])
-        cell.font = hdr_font
-        cell.fill = hdr_fill
-        cell.alignment = Alignment(wrap_text=True, vertical='center')
-    ws.row_dimensions[1].height = 28
-
-    row_num = 2
+    columns = [exports.Column(col_label_map[c], _EXPORT_COL_WIDTHS.get(c, 15)) for c in selected_cols]
+    col_letter = {c: get_column_letter(i + 1) for i, c in enumerate(selected_cols)}
+
+    styles = {}
     for section_key in section_order:
-        section = sections[section_key]
         style = _SECTION_STYLE.get(section_key, _DEFAULT_SECTION_STYLE)
-        sec_fill = PatternFill(fill_type='solid', fgColor=style['bg'])
-        sec_font = Font(bold=True, size=10, name='Calibri', color=style['fg'])
-
-        # Section header row
-        for col_key, col_idx in col_map.items():
-            val = None
-            if col_key == 'name':      val = section_key
-            elif col_key == 'count':   val = 1
-            elif col_key == 'messenger': val = section_key
-            elif col_key == 'total':   val = 0
-            cell = ws.cell(row=row_num, column=col_idx, value=val)
-            cell.font = sec_font
-            cell.fill = sec_fill
-        row_num += 1
-
-        # Drone type rows
-        for type_key in section['type_order']:
-            t = section['types'][type_key]
-            count = t['ready'] + t['deferred']
-            for col_key, col_idx in col_map.items():
-                val = None
-                if col_key == 'name':        val = t['label']
-                elif col_key == 'count':     val = count
-                elif col_key == 'unit':      val = 'шт'
-                elif col_key == 'messenger': val = f"{t['label']} {count} шт" if count > 0 else None
-                elif col_key == 'new':       val = t['inspection'] or None
-                elif col_key == 'repair':    val = t['repair'] or None
-                elif col_key == 'mfr_repair': val = None
-                elif col_key == 'total':
-                    c_count = col_map.get('count')
-                    c_new = col_map.get('new')
-                    c_repair = col_map.get('repair')
-                    if c_count and c_new and c_repair:
-                        val = f"={get_column_letter(c_count)}{row_num}+{get_column_letter(c_new)}{row_num}-{get_column_letter(c_repair)}{row_num}"
-                    else:
-                        val = count
-                ws.cell(row=row_num, column=col_idx, value=val)
-            row_num += 1
-
-    # Column widths
-    col_widths = {
-        'name': 52, 'count': 13, 'unit': 6,
-        'messenger': 58, 'new': 10, 'repair': 13,
-        'mfr_repair': 24, 'total': 13,
-    }
-    for col_key, col_idx in col_map.items():
-        ws.column_dimensions[get_column_letter(col_idx)].width = col_widths.get(col_key, 15)
-
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-    response = HttpResponse(
-        output.read(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
-    response['Content-Disposition'] = 'attachment; filename="drones.xlsx"'
-    return response
+        styles[f'sec:{section_key}'] = {'bold': True, 'fill': style['bg'], 'color': style['fg']}
+
+    def section_value(col_key, section_key):
+        if col_key in ('name', 'messenger'):
+            return section_key
+        return {'count': 1, 'total': 0}.get(col_key)
+
+    def type_value(col_key, t):
+        count = t['ready'] + t['deferred']
+        if col_key == 'name':
+            return t['label']
+        if col_key == 'count':
+            return count
+        if col_key == 'unit':
+            return 'шт'
+        if col_key == 'messenger':
+            return f"{t['label']} {count} шт" if count > 0 else None
+        if col_key == 'new':
+            return t['inspection'] or None
+        if col_key == 'repair':
+            return t['repair'] or None
+        if col_key == 'total':
+            if {'count', 'new', 'repair'} <= col_letter.keys():
+                return exports.Formula(
+                    f"={col_letter['count']}{{row}}+{col_letter['new']}{{row}}-{col_letter['repair']}{{row}}",
+                    count + t['inspection'] - t['repair'],
+                )
+            return count
+        return None
 
+    def rows():
+        for section_key in section_order:
+            section = sections[section_key]
+            sec_style = f'sec:{section_key}'
+            yield [exports.Cell(section_value(c, section_key), sec_style) for c in selected_cols]
+            for type_key in section['type_order']:
+                t = section['types'][type_key]
+                yield [type_value(c, t) for c in selected_cols]
 
-# ── UAV movement history ──────────────────────────────────────────────
+    return columns, rows(), styles
 
-def _fmt_freq(f):
-    """Format a Frequency object as e.g. '900MHz' or '5.8GHz'."""
-    v = f.value
-    val_str = str(int(v)) if v == int(v) else str(v)
-    return f"{val_str}{f.get_unit_display()}"
 
+def _uav_export_job(params):
+    selected_cols = [c for c, _ in EXPORT_COLS if params.get(f'col_{c}', '1') == '1']
+    columns, rows, styles = _uav_export(selected_cols)
+    return 'drones', 'БПЛА', columns, rows, styles
 
-def _fmt_drone_type_name(dt, category):
-    """Format drone type label.
 
-    FPV  → 'ModelName (prop\') (freq1 freq2) (#purpose)'
-    Optic → 'ModelName (prop\') distancekm [ніч]'
-    """
-    prop_str = f" ({dt.prop_size}')" if dt.prop_size else ''
-    if category == 'Оптика':
-        name = dt.model.name + prop_str
-        if getattr(dt, 'video_template_id', None):
-            name += f" {dt.video_template.max_distance}км"
-        if dt.has_thermal:
-            name += " ніч"
-        return name
-
-    # FPV / radio drone
-    name = dt.model.name + prop_str
-    ctrl_parts = [_fmt_freq(f) for f in sorted(dt.control_frequencies.all(), key=lambda f: f.value * 1000 if f.unit == 'ghz' else f.value)]
-    video_part = _fmt_freq(dt.video_frequency) if getattr(dt, 'video_frequency_id', None) else ''
-    if ctrl_parts or video_part:
-        freqs_str = '-'.join(ctrl_parts)
-        if video_part:
-            freqs_str += (', ' if freqs_str else '') + video_part
-        name += f"({freqs_str})"
-    if dt.purpose_id:
-        name += f" (#{dt.purpose.name})"
-    return name
-
-
-def _make_list_type_label(dt, is_opt):
-    """Compact label for the equipment list table / badge grid.
-
-    FPV   → 'ModelName (10") (900gh 5.8gh)'
-    Optic → 'ModelName (10") 5км'
-    """
-    if not dt:
-        return '—'
-    name = dt.model.name
-    if dt.prop_size:
-        name += f' ({dt.prop_size}")'
-    if is_opt:
-        if getattr(dt, 'video_template_id', None):
-            name += f' {dt.video_template.max_distance}км'
-    else:
-        ctrl_parts = [_fmt_freq(f) for f in sorted(dt.control_frequencies.all(), key=lambda f: f.value * 1000 if f.unit == 'ghz' else f.value)]
-        video_part = _fmt_freq(dt.video_frequency) if getattr(dt, 'video_frequency_id', None) else ''
-        if ctrl_parts or video_part:
-            freqs_str = '-'.join(ctrl_parts)
-            if video_part:
-                freqs_str += (', ' if freqs_str else '') + video_part
-            name += f'({freqs_str})'
-    return name
+# kind → builder(params) used by export_jobs.run_job
+EXPORT_BUILDERS = {
+    'uav': _uav_export_job,
+    'drone_stats': _drone_stats_export_job,
+}
 
 
-def _make_qty_label(ct_id, obj_id, fpv_ct_id, fpv_map, opt_map):
-    """Return display label for a (ct_id, obj_id) drone type in qty_groups."""
-    is_opt = ct_id != fpv_ct_id
-    dt = (opt_map if is_opt else fpv_map).get(obj_id)
-    return _make_list_type_label(dt, is_opt)
+def _start_export(request, kind, fmt):
+    """Enqueue (or reuse) an export job and send the user to its file or status page."""
+    # Job bookkeeping and the data stamp must come from the main database
+    with replica.primary():
+        job = export_jobs.enqueue(kind, fmt, request.GET, request.user)
+        if not settings.EXPORT_JOBS_ASYNC and export_jobs.claim(job):
+            job = export_jobs.run_job(job)
+    if job.status == ExportJob.STATUS_DONE:
+        return redirect('equipment_accounting:export_job_download', pk=job.pk)
+    return redirect('equipment_accounting:export_job_detail', pk=job.pk)
 
 
-def _build_role_groups(uav_objs, fpv_ct, opt_ct, fpv_types, opt_types):
+@master_required
+def uav_export_excel(request):
+    return _start_export(request, 'uav', exports.get_format(request))
+
+
+def _export_job_payload(job):
+    payload = {'id': job.pk, 'status': job.status, 'status_display': job.get_status_display()}
+    if job.status == ExportJob.STATUS_DONE:
+        payload['download_url'] = reverse('equipment_accounting:export_job_download', args=[job.pk])
+    elif job.status == ExportJob.STATUS_FAILED:
+        payload['error'] = job.error
+    return payload
+
+
+@master_required
+def export_job_detail(request, pk):
+    """Waiting page: polls the job status and starts the download when ready."""
+    job = get_object_or_404(ExportJob, pk=pk)
+    return render(request, 'equipment_accounting/export_job.html', {
+        'job': job,
+        'status_url': reverse('equipment_accounting:export_job_status', args=[job.pk]),
+        'payload': _export_job_payload(job),
+    })
+
+
+@master_required
+def export_job_status(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk)
+    return JsonResponse(_export_job_payload(job))
+
+
+@master_required
+def export_job_download(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk, status=ExportJob.STATUS_DONE)
+    try:
+        fh = open(export_jobs.artifact_path(job), 'rb')
+    except FileNotFoundError:
+        raise Http404("Файл експорту вже видалено — сформуйте його ще раз.")
+    export_jobs.touch(job)
+    return FileResponse(
+        fh, as_attachment=True, filename=job.download_name,
+        content_type=exports.CONTENT_TYPES.get(job.fmt),
+    )
+
+
+# ── UAV movement history ──────────────────────────────────────────────
+
+def _build_role_groups(uav_objs, fpv_ct, opt_ct):
     """Return hierarchical role_groups list.
 
     FPV drones are grouped by role (Ударні → День/Ніч sub-groups, others by
@@ -1319,35 +1281,35 @@ def _build_role_groups(uav_objs, fpv_ct, opt_ct, fpv_types, opt_types):
     fpv_rk_data = {}
     opt_type_order = []
     opt_type_data = {}
+    type_labels = labels.all_labels()
 
     for uav in uav_objs:
+        tl = type_labels.get((uav.content_type_id, uav.object_id))
         if uav.content_type_id == fpv_ct.pk:
-            dt = fpv_types.get(uav.object_id)
             role_name = uav.role.name if uav.role_id else '—'
-            if role_name == 'Ударний' and dt is not None:
-                sub_label = 'Ніч' if dt.has_thermal else 'День'
+            if role_name == 'Ударний' and tl is not None:
+                sub_label = 'Ніч' if tl.has_thermal else 'День'
             else:
                 sub_label = None
             rk = (role_name, sub_label)
             if rk not in fpv_rk_data:
                 fpv_rk_data[rk] = {}
                 fpv_rk_order.append(rk)
-            type_key = dt.pk if dt else None
+            type_key = uav.object_id if tl else None
             if type_key not in fpv_rk_data[rk]:
                 fpv_rk_data[rk][type_key] = {
                     'category': 'Радіо',
-                    'type_label': _fmt_drone_type_name(dt, 'Радіо') if dt else '—',
+                    'type_label': tl.export_label if tl else '—',
                     'count': 0,
                 }
             fpv_rk_data[rk][type_key]['count'] += 1
 
         elif uav.content_type_id == opt_ct.pk:
-            dt = opt_types.get(uav.object_id)
-            type_key = dt.pk if dt else None
+            type_key = uav.object_id if tl else None
             if type_key not in opt_type_data:
                 opt_type_data[type_key] = {
                     'category': 'Оптика',
-                    'type_label': _fmt_drone_type_name(dt, 'Оптика') if dt else '—',
+                    'type_label': tl.export_label if tl else '—',
                     'count': 0,
                 }
                 opt_type_order.append(type_key)
@@ -1371,106 +1333,160 @@ def _build_role_groups(uav_objs, fpv_ct, opt_ct, fpv_types, opt_types):
     return role_groups
 
 
+def _parse_day(value):
+    """Date from a YYYY-MM-DD filter value, or None if empty or invalid."""
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
 @master_required
+@replica.reporting
 def uav_movements(request):
     """Show UAV movements grouped by calendar date; each date is expandable."""
+    from django.contrib.auth import get_user_model
     reason_filter = request.GET.get('reason', '')
     _loc_raw = request.GET.get('location', '')
     location_filter = int(_loc_raw) if _loc_raw.isdigit() else None
     date_from = request.GET.get('date_from', '')
     date_to = request.GET.get('date_to', '')
 
-    base_qs = UAVMovement.objects.select_related(
-        'uav', 'uav__content_type', 'uav__role',
-        'from_location', 'to_location',
-        'moved_by', 'moved_by__profile',
-    )
+    filters = Q()
     if reason_filter:
-        base_qs = base_qs.filter(reason=reason_filter)
+        filters &= Q(reason=reason_filter)
     if location_filter:
-        base_qs = base_qs.filter(
-            Q(from_location_id=location_filter) | Q(to_location_id=location_filter)
+        filters &= Q(from_location_id=location_filter) | Q(to_location_id=location_filter)
+    day_from = _parse_day(date_from)
+    day_to = _parse_day(date_to)
+
+    base_qs = UAVMovement.objects.filter(filters)
+    if day_from:
+        base_qs = base_qs.filter(created_at__date__gte=day_from)
+    if day_to:
+        base_qs = base_qs.filter(created_at__date__lte=day_to)
+
+    # Days before the archive horizon come from the per-day totals
+    archived_until = history_archive.archived_until(UAVMovement)
+    archive_qs = None
+    if archived_until and not (day_from and day_from > archived_until):
+        archive_qs = ArchivedMovementDay.objects.filter(filters)
+        if day_from:
+            archive_qs = archive_qs.filter(day__gte=day_from)
+        if day_to:
+            archive_qs = archive_qs.filter(day__lte=day_to)
+    base_qs = base_qs.annotate(day=TruncDate('created_at'))
+
+    # Outer group: by calendar date, paginated in SQL over distinct dates.
+    days_qs = base_qs.values('day').annotate(count=Count('pk')).order_by('-day')
+    kept_days = set()
+    if archive_qs is not None:
+        live_since = history_archive.live_since(UAVMovement)
+        archive_days = archive_qs.values('day').annotate(count=Sum('count')).order_by('-day')
+        # Movements still in transit stay live on archived days
+        kept = list(days_qs.filter(created_at__lt=live_since))
+        if kept:
+            kept_days = {row['day'] for row in kept}
+            archive_days = history_archive.merge_days(archive_days, kept)
+        days_qs = history_archive.Chain(days_qs.filter(created_at__gte=live_since), archive_days)
+    paginator = Paginator(days_qs, 30)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    date_groups = [{'date': row['day'], 'count': row['count'], 'batches': []} for row in page_obj.object_list]
+    page_obj.object_list = date_groups
+
+    if date_groups:
+        days = [dg['date'] for dg in date_groups]
+        live_days = [d for d in days if not archived_until or d > archived_until or d in kept_days]
+        old_days = [d for d in days if archived_until and d <= archived_until]
+        batch_fields = (
+            'day', 'reason', 'from_location_id', 'to_location_id', 'moved_by_id',
+            'from_location__name', 'to_location__name',
         )
-    if date_from:
-        try:
-            base_qs = base_qs.filter(created_at__date__gte=date.fromisoformat(date_from))
-        except ValueError:
-            pass
-    if date_to:
-        try:
-            base_qs = base_qs.filter(created_at__date__lte=date.fromisoformat(date_to))
-        except ValueError:
-            pass
-
-    # Outer group: by calendar date.  Inner group: by (reason, from, to, user).
-    reason_labels = dict(UAVMovement.REASON_CHOICES)
-    date_seen = {}   # date → date_group
-    date_order = []  # ordered list of date keys
-
-    for m in base_qs.order_by('-created_at'):
-        d = m.created_at.date()
-        if d not in date_seen:
-            dg = {'date': m.created_at, 'count': 0, '_bseen': {}, '_border': []}
-            date_seen[d] = dg
-            date_order.append(d)
-        dg = date_seen[d]
-        dg['count'] += 1
-
-        bk = (m.reason, m.from_location_id, m.to_location_id, m.moved_by_id)
-        if bk not in dg['_bseen']:
-            dg['_bseen'][bk] = {
-                'reason': m.reason,
-                'reason_label': reason_labels.get(m.reason, m.reason),
-                'from_location_name': m.from_location.name if m.from_location else None,
-                'to_location_name': m.to_location.name,
-                'user_name': (m.moved_by.profile.display_name if hasattr(m.moved_by, 'profile') else m.moved_by.username) if m.moved_by else '—',
+        batch_rows = []
+        movements = []
+        if live_days:
+            # Bound created_at by the page's dates first so the index can be used
+            tz = timezone.get_current_timezone()
+            page_qs = base_qs.filter(
+                created_at__gte=timezone.make_aware(datetime.combine(min(live_days), time.min), tz),
+                created_at__lt=timezone.make_aware(datetime.combine(max(live_days) + timedelta(days=1), time.min), tz),
+                day__in=live_days,
+            )
+            batch_rows += [
+                dict(row, archived=False) for row in
+                page_qs.values(*batch_fields)
+                .annotate(count=Count('pk'), last=Max('created_at'))
+                .order_by('-day', '-last')
+            ]
+            # Movement and UAV rows only for the visible dates
+            movements += [
+                (m.day, m.reason, m.from_location_id, m.to_location_id, m.moved_by_id, False, m.pk, m.uav)
+                for m in page_qs.select_related('uav', 'uav__role').only(
+                    'pk', 'created_at', 'reason', 'from_location_id', 'to_location_id', 'moved_by_id',
+                    'uav__content_type_id', 'uav__object_id', 'uav__role__name',
+                ).order_by('-created_at')
+            ]
+        if old_days:
+            batch_rows += [
+                dict(row, archived=True) for row in
+                archive_qs.filter(day__in=old_days).values(*batch_fields)
+                .annotate(count=Sum('count'), last=Max('last'))
+                .order_by('-day', '-last')
+            ]
+            archived = [
+                row for row in history_archive.rows(UAVMovement, old_days)
+                if (not reason_filter or row['reason'] == reason_filter)
+                and (not location_filter or location_filter in (row['from_location_id'], row['to_location_id']))
+            ]
+            uavs = UAVInstance.objects.all_with_deleted().select_related('role').only(
+                'pk', 'content_type_id', 'object_id', 'role__name',
+            ).in_bulk({row['uav_id'] for row in archived})
+            movements += [
+                (timezone.localdate(row['created_at']), row['reason'], row['from_location_id'],
+                 row['to_location_id'], row['moved_by_id'], True, None, uavs[row['uav_id']])
+                for row in archived if row['uav_id'] in uavs
+            ]
+
+        # Inner group: by (reason, from, to, user), newest batch first
+        reason_labels = dict(UAVMovement.REASON_CHOICES)
+        by_day = {dg['date']: dg for dg in date_groups}
+        batches = {}
+        users = get_user_model().objects.filter(
+            pk__in={row['moved_by_id'] for row in batch_rows if row['moved_by_id']},
+        ).select_related('profile')
+        user_names = {
+            u.pk: u.profile.display_name if hasattr(u, 'profile') else u.username
+            for u in users
+        }
+        for row in batch_rows:
+            batch = {
+                'reason': row['reason'],
+                'reason_label': reason_labels.get(row['reason'], row['reason']),
+                'from_location_name': row['from_location__name'],
+                'to_location_name': row['to_location__name'],
+                'user_name': user_names.get(row['moved_by_id'], '—'),
+                'count': row['count'],
+                'archived': row['archived'],
                 'uav_objs': [],
                 'movement_ids': [],
             }
-            dg['_border'].append(bk)
-        dg['_bseen'][bk]['uav_objs'].append(m.uav)
-        dg['_bseen'][bk]['movement_ids'].append(m.pk)
-
-    date_groups = []
-    for d in date_order:
-        dg = date_seen[d]
-        bseen = dg.pop('_bseen')
-        border = dg.pop('_border')
-        dg['batches'] = [bseen[k] for k in border]
-        date_groups.append(dg)
-
-    # Paginate by date
-    paginator = Paginator(date_groups, 30)
-    page_obj = paginator.get_page(request.GET.get('page'))
-
-    # Batch-fetch drone types for all UAVs on the current page
-    fpv_ct = ContentType.objects.get_for_model(FPVDroneType)
-    opt_ct = ContentType.objects.get_for_model(OpticalDroneType)
-    fpv_pks, opt_pks = set(), set()
-    for dg in page_obj.object_list:
-        for batch in dg['batches']:
-            for uav in batch['uav_objs']:
-                if uav.content_type_id == fpv_ct.pk:
-                    fpv_pks.add(uav.object_id)
-                elif uav.content_type_id == opt_ct.pk:
-                    opt_pks.add(uav.object_id)
-
-    fpv_types = (
-        {dt.pk: dt for dt in FPVDroneType.objects.filter(pk__in=fpv_pks)
-         .select_related('model', 'power_template', 'purpose', 'video_frequency')
-         .prefetch_related('control_frequencies')} if fpv_pks else {}
-    )
-    opt_types = (
-        {dt.pk: dt for dt in OpticalDroneType.objects.filter(pk__in=opt_pks)
-         .select_related('model', 'power_template', 'purpose', 'video_template')
-         .prefetch_related('control_frequencies')} if opt_pks else {}
-    )
+            key = (row['day'], row['reason'], row['from_location_id'], row['to_location_id'], row['moved_by_id'],
+                   row['archived'])
+            batches[key] = batch
+            by_day[row['day']]['batches'].append(batch)
+
+        for *key, movement_id, uav in movements:
+            batch = batches.get(tuple(key))
+            if batch is None:
+                continue
+            batch['uav_objs'].append(uav)
+            if movement_id:
+                batch['movement_ids'].append(movement_id)
 
-    for dg in page_obj.object_list:
-        for batch in dg['batches']:
-            batch['role_groups'] = _build_role_groups(
-                batch['uav_objs'], fpv_ct, opt_ct, fpv_types, opt_types
-            )
+        fpv_ct = ContentType.objects.get_for_model(FPVDroneType)
+        opt_ct = ContentType.objects.get_for_model(OpticalDroneType)
+        for batch in batches.values():
+            batch['role_groups'] = _build_role_groups(batch['uav_objs'], fpv_ct, opt_ct)
 
     return render(request, 'equipment_accounting/uav_movements.html', {
         'page_obj': page_obj,
@@ -1479,7 +1495,7 @@ def uav_movements(request):
         'date_from': date_from,
         'date_to': date_to,
         'reason_choices': UAVMovement.REASON_CHOICES,
-        'locations': Location.objects.all(),
+        'locations': reference.objects(Location),
     })
 
 
@@ -1487,13 +1503,12 @@ def uav_movements(request):
 
 def _component_matches_uav_template(component, uav):
     """Return True if the component is compatible with the UAV's drone type."""
-    drone_type = uav.uav_type
     if component.kind == 'battery':
-        return component.power_template_id == drone_type.power_template_id
+        return component.power_template_id == uav.type_power_template_id
     if component.kind == 'spool':
-        return (uav.content_type.model == 'opticaldronetype'
-                and component.video_template.drone_model_id == drone_type.video_template.drone_model_id
-                and component.video_template.is_analog == drone_type.video_template.is_analog)
+        return (uav.type_category == 'optical'
+                and component.video_template.drone_model_id == uav.type_video_model_id
+                and component.video_template.is_analog == uav.type_is_analog)
     return True  # other — no template restriction
 
 
@@ -1540,6 +1555,11 @@ def uav_detail(request, pk):
         'from_location', 'to_location', 'moved_by', 'moved_by__profile'
     ).order_by('-created_at')
 
+    # Movements of days before the archive horizon are on the movements page only
+    movements_archived_until = history_archive.archived_until(UAVMovement)
+    if movements_archived_until and timezone.localdate(uav.created_at) > movements_archived_until:
+        movements_archived_until = None
+
     kit_status = uav.get_kit_status()
     photos = uav.photos.all()
     pending_movement = None
@@ -1551,10 +1571,11 @@ def uav_detail(request, pk):
         'free_components': free_components,
         'kit_status': kit_status,
         'movements': movements,
+        'movements_archived_until': movements_archived_until,
         'pending_movement': pending_movement,
-        'locations': Location.objects.all(),
+        'locations': reference.objects(Location),
         'photos': photos,
-        'can_edit_uav': request.user.has_perm(PERM_CHANGE_UAV),
+        'can_edit_uav': permissions.for_request(request).can_edit_uav,
     })
 
 
@@ -1570,9 +1591,9 @@ def movement_batch_delete(request):
 
 
 @master_required
+@replica.reporting
 def uav_status_log(request):
     """Status change history grouped by (date, type, transition, user)."""
-    from django.db.models.functions import TruncDate
     from django.contrib.auth import get_user_model
 
     from_status_f = request.GET.get('from_status', '')
@@ -1582,54 +1603,85 @@ def uav_status_log(request):
     date_to_f     = request.GET.get('date_to', '')
     type_f        = request.GET.get('drone_type', '')
 
-    qs = UAVStatusLog.objects.all()
-
+    filters = Q()
     if from_status_f:
-        qs = qs.filter(from_status=from_status_f)
+        filters &= Q(from_status=from_status_f)
     if to_status_f:
-        qs = qs.filter(to_status=to_status_f)
+        filters &= Q(to_status=to_status_f)
     if user_f.isdigit():
-        qs = qs.filter(changed_by_id=int(user_f))
+        filters &= Q(changed_by_id=int(user_f))
+    type_labels = labels.all_labels()
     if type_f:
-        qs = qs.filter(drone_type_label__icontains=type_f)
-    if date_from_f:
-        try:
-            qs = qs.filter(created_at__date__gte=date.fromisoformat(date_from_f))
-        except ValueError:
-            pass
-    if date_to_f:
-        try:
-            qs = qs.filter(created_at__date__lte=date.fromisoformat(date_to_f))
-        except ValueError:
-            pass
-
-    # Aggregate: one row per (day, drone type, from→to, user)
-    rows = list(
-        qs.values(
-            'drone_type_label', 'from_status', 'to_status',
-            'changed_by_id',
-            'changed_by__username',
-            'changed_by__first_name',
-            'changed_by__last_name',
-        )
+        if re.fullmatch(r'\d+-\d+', type_f):
+            filters &= Q(drone_type_key=type_f)
+        else:
+            # Free text (old links) — resolve against the label registry first
+            needle = type_f.lower()
+            filters &= Q(drone_type_key__in=[
+                UAVStatusLog.type_key(ct_id, obj_id)
+                for (ct_id, obj_id), tl in type_labels.items() if needle in tl.full_label.lower()
+            ])
+    day_from = _parse_day(date_from_f)
+    day_to = _parse_day(date_to_f)
+
+    qs = UAVStatusLog.objects.filter(filters)
+    if day_from:
+        qs = qs.filter(created_at__date__gte=day_from)
+    if day_to:
+        qs = qs.filter(created_at__date__lte=day_to)
+
+    # Days before the archive horizon come from the per-day totals
+    archived_until = history_archive.archived_until(UAVStatusLog)
+    archive_qs = None
+    if archived_until and not (day_from and day_from > archived_until):
+        archive_qs = ArchivedStatusDay.objects.filter(filters)
+        if day_from:
+            archive_qs = archive_qs.filter(day__gte=day_from)
+        if day_to:
+            archive_qs = archive_qs.filter(day__lte=day_to)
+
+    # Aggregate: one row per (day, drone type, from→to, user), paginated in SQL
+    group_fields = (
+        'drone_type_label', 'from_status', 'to_status',
+        'changed_by_id',
+        'changed_by__username',
+        'changed_by__first_name',
+        'changed_by__last_name',
+    )
+    rows = (
+        qs.values(*group_fields)
         .annotate(count=Count('pk'), day=TruncDate('created_at'), latest=Max('created_at'))
         .order_by('-latest')
     )
+    total_uavs = qs.count()
+    if archive_qs is not None:
+        rows = history_archive.Chain(
+            rows,
+            archive_qs.values(*group_fields, 'day')
+            .annotate(count=Sum('count'), latest=Max('latest'))
+            .order_by('-latest'),
+        )
+        total_uavs += archive_qs.aggregate(n=Sum('count'))['n'] or 0
+    paginator = Paginator(rows, 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
 
     STATUS_LABELS = dict(UAVInstance.STATUS_CHOICES)
-    for row in rows:
+    for row in page_obj.object_list:
         row['from_status_display'] = STATUS_LABELS.get(row['from_status'], row['from_status']) if row['from_status'] else ''
         row['to_status_display']   = STATUS_LABELS.get(row['to_status'], row['to_status'])
         parts = [row['changed_by__first_name'], row['changed_by__last_name']]
         row['user_display'] = ' '.join(p for p in parts if p) or row['changed_by__username'] or '—'
 
-    total_uavs = sum(r['count'] for r in rows)
-
-    paginator = Paginator(rows, 50)
-    page_obj = paginator.get_page(request.GET.get('page'))
+    type_choices = sorted(
+        ((UAVStatusLog.type_key(ct_id, obj_id), tl.full_label) for (ct_id, obj_id), tl in type_labels.items()),
+        key=lambda choice: choice[1],
+    )
 
     User = get_user_model()
-    users_with_changes = User.objects.filter(uav_status_changes__isnull=False).distinct()
+    users_with_changes = User.objects.filter(
+        Q(pk__in=UAVStatusLog.objects.values('changed_by_id'))
+        | Q(pk__in=ArchivedStatusDay.objects.values('changed_by_id'))
+    )
 
     return render(request, 'equipment_accounting/uav_status_log.html', {
         'page_obj': page_obj,
@@ -1641,7 +1693,8 @@ def uav_status_log(request):
         'type_f': type_f,
         'status_choices': UAVInstance.STATUS_CHOICES,
         'users_with_changes': users_with_changes,
-        'total_rows': len(rows),
+        'type_choices': type_choices,
+        'total_rows': paginator.count,
         'total_uavs': total_uavs,
     })
 
@@ -1699,24 +1752,25 @@ def uav_move(request, pk):
         return redirect(reverse('equipment_accounting:uav_detail', args=[pk]))
 
     notes = request.POST.get('notes', '').strip()
-    UAVMovement.objects.create(
-        uav=uav,
-        from_location=uav.current_location,
-        to_location=to_location,
-        moved_by=request.user,
-        reason='transferred',
-        notes=notes,
-        pre_transit_status=uav.status,
-    )
-    old_status = uav.status
-    uav.status = 'transit'
-    uav.pending_to_location = to_location
-    uav.save(update_fields=['status', 'pending_to_location', 'updated_at'])
-    UAVStatusLog.objects.create(
-        uav=uav, changed_by=request.user,
-        from_status=old_status, to_status='transit',
-        drone_type_label=_uav_type_label(uav),
-    )
+    with inventory.tracked([uav.pk]):
+        UAVMovement.objects.create(
+            uav=uav,
+            from_location=uav.current_location,
+            to_location=to_location,
+            moved_by=request.user,
+            reason='transferred',
+            notes=notes,
+            pre_transit_status=uav.status,
+        )
+        old_status = uav.status
+        uav.status = 'transit'
+        uav.pending_to_location = to_location
+        uav.save(update_fields=['status', 'pending_to_location', 'updated_at'])
+        UAVStatusLog.objects.create(
+            uav=uav, changed_by=request.user,
+            from_status=old_status, to_status='transit',
+            drone_type_label=_uav_type_label(uav),
+        )
 
     messages.success(request, f'БПЛА відправлено до "{to_location.name}". Очікується підтвердження прибуття.')
     return redirect(reverse('equipment_accounting:uav_detail', args=[pk]))
@@ -1725,7 +1779,6 @@ def uav_move(request, pk):
 @uav_perm_required(PERM_CHANGE_UAV)
 def uav_confirm_arrival(request, movement_pk):
     """Confirm arrival: update current_location and restore pre-transit status."""
-    from django.utils import timezone as tz
     movement = get_object_or_404(UAVMovement, pk=movement_pk)
     uav = movement.uav
     if request.method != 'POST':
@@ -1735,20 +1788,7 @@ def uav_confirm_arrival(request, movement_pk):
         messages.warning(request, 'Прибуття вже підтверджено.')
         return redirect(reverse('equipment_accounting:uav_detail', args=[uav.pk]))
 
-    movement.confirmed_at = tz.now()
-    movement.confirmed_by = request.user
-    movement.save(update_fields=['confirmed_at', 'confirmed_by'])
-
-    uav.current_location = movement.to_location
-    uav.pending_to_location = None
-    new_status = movement.pre_transit_status or 'inspection'
-    uav.status = new_status
-    uav.save(update_fields=['current_location', 'pending_to_location', 'status', 'updated_at'])
-    UAVStatusLog.objects.create(
-        uav=uav, changed_by=request.user,
-        from_status='transit', to_status=new_status,
-        drone_type_label=_uav_type_label(uav),
-    )
+    arrivals.confirm_movements([movement.pk], request.user)
 
     messages.success(request, f'Прибуття БПЛА до "{movement.to_location.name}" підтверджено.')
     return redirect(reverse('equipment_accounting:uav_detail', args=[uav.pk]))
@@ -1772,6 +1812,7 @@ def uav_attach_component(request, uav_pk, component_pk):
         component.assigned_to_uav = uav
         component.status = 'in_use'
         component.save(update_fields=['assigned_to_uav', 'status', 'updated_at'])
+        UAVInstance.refresh_kit_status([uav.pk])
         messages.success(request, 'Комплектуючу закріплено.')
     return redirect('equipment_accounting:uav_detail', pk=uav_pk)
 
@@ -1788,6 +1829,7 @@ def uav_detach_component(request, uav_pk, component_pk):
         component.assigned_to_uav = None
         component.status = 'disassembled'
         component.save(update_fields=['assigned_to_uav', 'status', 'updated_at'])
+        UAVInstance.refresh_kit_status([uav.pk])
         messages.success(request, 'Комплектуючу відкріплено.')
     return redirect('equipment_accounting:uav_detail', pk=uav_pk)
 
@@ -1800,107 +1842,48 @@ def uav_toggle_given(request, pk):
     if request.method != "POST":
         return redirect(_list_url("drones"))
     uav = get_object_or_404(UAVInstance, pk=pk)
-    workshop = Location.objects.filter(name='Майстерня').first()
+    workshop = reference.first(Location, name='Майстерня')
     next_url = request.POST.get('next') or _list_url("drones")
 
-    if uav.status == 'given':
-        # Return via transit to workshop
-        prev_location = uav.current_location
-        UAVMovement.objects.create(
-            uav=uav,
-            from_location=prev_location,
-            to_location=workshop,
-            moved_by=request.user,
-            reason='returned',
-            pre_transit_status='inspection',
-        )
-        uav.status = 'transit'
-        uav.pending_to_location = workshop
-        uav.position = None
-        uav.save(update_fields=['status', 'pending_to_location', 'position', 'updated_at'])
-        UAVStatusLog.objects.create(
-            uav=uav, changed_by=request.user,
-            from_status='given', to_status='transit',
-            drone_type_label=_uav_type_label(uav),
-        )
-    elif uav.status == 'ready':
-        to_location_id = request.POST.get('to_location_id')
-        to_location = Location.objects.filter(pk=to_location_id).first() if to_location_id else None
-        position = None
-        if to_location and to_location.name == 'Позиція':
-            position_id = request.POST.get('position_id')
-            position_name_new = request.POST.get('position_name_new', '').strip()
-            if position_id:
-                position = Position.objects.filter(pk=position_id).first()
-            elif position_name_new:
-                position, _ = Position.objects.get_or_create(name=position_name_new)
-        prev_location = uav.current_location
-        new_status = 'transit' if to_location else 'given'
-        if to_location:
-            # Send via transit; status becomes 'given' after arrival confirmation
+    with inventory.tracked([uav.pk]):
+        if uav.status == 'given':
+            # Return via transit to workshop
+            prev_location = uav.current_location
             UAVMovement.objects.create(
                 uav=uav,
                 from_location=prev_location,
-                to_location=to_location,
+                to_location=workshop,
                 moved_by=request.user,
-                reason='given',
-                pre_transit_status='given',
+                reason='returned',
+                pre_transit_status='inspection',
             )
             uav.status = 'transit'
-            uav.pending_to_location = to_location
-            _fields = ['status', 'pending_to_location', 'updated_at']
-            if position is not None:
-                uav.position = position
-                _fields.append('position')
-            uav.save(update_fields=_fields)
-        else:
-            uav.status = 'given'
-            uav.save(update_fields=['status', 'updated_at'])
-        UAVStatusLog.objects.create(
-            uav=uav, changed_by=request.user,
-            from_status='ready', to_status=new_status,
-            drone_type_label=_uav_type_label(uav),
-        )
-    else:
-        messages.error(request, 'Віддати можна лише готовий дрон.')
-    return redirect(next_url)
-
-
-def _do_bulk_action(ids, action, to_location_id, position_id, position_name_new, request):
-    """Apply bulk action to a list of UAVInstance PKs."""
-    qs = UAVInstance.objects.filter(pk__in=ids)
-    count = qs.count()
-
-    to_location = Location.objects.filter(pk=to_location_id).first() if to_location_id else None
-    position = None
-    if to_location and to_location.name == 'Позиція':
-        if position_id:
-            position = Position.objects.filter(pk=position_id).first()
-        elif position_name_new:
-            position, _ = Position.objects.get_or_create(name=position_name_new.strip())
-
-    if action == "delete":
-        if not request.user.has_perm(PERM_DELETE_UAV):
-            raise PermissionDenied
-        old_rows = list(qs.values_list('pk', 'status'))
-        type_labels = _type_labels_for_qs(qs)
-        qs.update(status='deleted')
-        _log_status_changes(
-            [(pk, st, type_labels.get(pk, '')) for pk, st in old_rows],
-            'deleted', request.user,
-        )
-        messages.success(request, f"Видалено {count} БПЛА.")
-    elif action == "given":
-        eligible = qs.filter(status='ready')
-        given_count = eligible.count()
-        skipped = count - given_count
-        new_status = 'transit' if to_location else 'given'
-        for uav in eligible.select_related('current_location'):
-            prev = uav.current_location
+            uav.pending_to_location = workshop
+            uav.position = None
+            uav.save(update_fields=['status', 'pending_to_location', 'position', 'updated_at'])
+            UAVStatusLog.objects.create(
+                uav=uav, changed_by=request.user,
+                from_status='given', to_status='transit',
+                drone_type_label=_uav_type_label(uav),
+            )
+        elif uav.status == 'ready':
+            to_location_id = request.POST.get('to_location_id')
+            to_location = Location.objects.filter(pk=to_location_id).first() if to_location_id else None
+            position = None
+            if to_location and to_location.name == 'Позиція':
+                position_id = request.POST.get('position_id')
+                position_name_new = request.POST.get('position_name_new', '').strip()
+                if position_id:
+                    position = Position.objects.filter(pk=position_id).first()
+                elif position_name_new:
+                    position, _ = Position.objects.get_or_create(name=position_name_new)
+            prev_location = uav.current_location
+            new_status = 'transit' if to_location else 'given'
             if to_location:
+                # Send via transit; status becomes 'given' after arrival confirmation
                 UAVMovement.objects.create(
                     uav=uav,
-                    from_location=prev,
+                    from_location=prev_location,
                     to_location=to_location,
                     moved_by=request.user,
                     reason='given',
@@ -1921,37 +1904,88 @@ def _do_bulk_action(ids, action, to_location_id, position_id, position_name_new,
                 from_status='ready', to_status=new_status,
                 drone_type_label=_uav_type_label(uav),
             )
-        msg = f"Віддано {given_count} БПЛА разом з комплектуючими."
-        if skipped:
-            msg += f" Пропущено {skipped} (не готові)."
-        messages.success(request, msg)
-    elif action == 'repair':
-        old_rows = list(qs.values_list('pk', 'status'))
-        type_labels = _type_labels_for_qs(qs)
-        prev_locations = {uav.pk: uav.current_location for uav in qs.select_related('current_location')}
-        qs.update(status='repair')
-        _log_status_changes([(pk, st, type_labels.get(pk, '')) for pk, st in old_rows], 'repair', request.user)
-        if to_location:
-            for uav in qs:
-                uav.current_location = to_location
-                uav.save(update_fields=['current_location', 'updated_at'])
-                UAVMovement.objects.create(
-                    uav=uav,
-                    from_location=prev_locations.get(uav.pk),
-                    to_location=to_location,
-                    moved_by=request.user,
-                    reason='repair',
+        else:
+            messages.error(request, 'Віддати можна лише готовий дрон.')
+    return redirect(next_url)
+
+
+def _do_bulk_action(ids, action, to_location_id, position_id, position_name_new, request):
+    """Apply bulk action to a list of UAVInstance PKs."""
+    qs = UAVInstance.objects.filter(pk__in=ids)
+    count = qs.count()
+
+    to_location = Location.objects.filter(pk=to_location_id).first() if to_location_id else None
+    position = None
+    if to_location and to_location.name == 'Позиція':
+        if position_id:
+            position = Position.objects.filter(pk=position_id).first()
+        elif position_name_new:
+            position, _ = Position.objects.get_or_create(name=position_name_new.strip())
+
+    with inventory.tracked(ids):
+        if action == "delete":
+            if not permissions.for_request(request).can_delete_uav:
+                raise PermissionDenied
+            old_rows = list(qs.values_list('pk', 'status', 'content_type_id', 'object_id'))
+            qs.update(status='deleted')
+            _log_status_changes(old_rows, 'deleted', request.user)
+            messages.success(request, f"Видалено {count} БПЛА.")
+        elif action == "given":
+            eligible = qs.filter(status='ready')
+            rows = list(eligible.values_list('pk', 'current_location_id', 'content_type_id', 'object_id'))
+            given_count = len(rows)
+            skipped = count - given_count
+            new_status = 'transit' if to_location else 'given'
+            if rows:
+                updates = {'status': new_status, 'updated_at': timezone.now()}
+                if to_location:
+                    # Send via transit; status becomes 'given' after arrival confirmation
+                    UAVMovement.objects.bulk_create([
+                        UAVMovement(
+                            uav_id=pk, from_location_id=loc_id, to_location=to_location,
+                            moved_by=request.user, reason='given', pre_transit_status='given',
+                        )
+                        for pk, loc_id, _, _ in rows
+                    ])
+                    updates['pending_to_location'] = to_location
+                    if position is not None:
+                        updates['position'] = position
+                eligible.update(**updates)
+                _log_status_changes(
+                    [(pk, 'ready', ct_id, obj_id) for pk, _, ct_id, obj_id in rows],
+                    new_status, request.user,
                 )
-        messages.success(request, f"Статус {count} БПЛА змінено на \"Ремонт\".")
-    elif action in dict(UAVInstance.STATUS_CHOICES):
-        old_rows = list(qs.values_list('pk', 'status'))
-        type_labels = _type_labels_for_qs(qs)
-        qs.update(status=action)
-        _log_status_changes([(pk, st, type_labels.get(pk, '')) for pk, st in old_rows], action, request.user)
-        label = dict(UAVInstance.STATUS_CHOICES)[action]
-        messages.success(request, f"Статус {count} БПЛА змінено на \"{label}\".")
-    else:
-        messages.error(request, "Невідома дія.")
+            msg = f"Віддано {given_count} БПЛА разом з комплектуючими."
+            if skipped:
+                msg += f" Пропущено {skipped} (не готові)."
+            messages.success(request, msg)
+        elif action == 'repair':
+            rows = list(qs.values_list('pk', 'status', 'current_location_id', 'content_type_id', 'object_id'))
+            updates = {'status': 'repair', 'updated_at': timezone.now()}
+            if to_location:
+                updates['current_location'] = to_location
+            qs.update(**updates)
+            _log_status_changes(
+                [(pk, st, ct_id, obj_id) for pk, st, _, ct_id, obj_id in rows],
+                'repair', request.user,
+            )
+            if to_location:
+                UAVMovement.objects.bulk_create([
+                    UAVMovement(
+                        uav_id=pk, from_location_id=loc_id, to_location=to_location,
+                        moved_by=request.user, reason='repair',
+                    )
+                    for pk, _, loc_id, _, _ in rows
+                ])
+            messages.success(request, f"Статус {count} БПЛА змінено на \"Ремонт\".")
+        elif action in dict(UAVInstance.STATUS_CHOICES):
+            old_rows = list(qs.values_list('pk', 'status', 'content_type_id', 'object_id'))
+            qs.update(status=action)
+            _log_status_changes(old_rows, action, request.user)
+            label = dict(UAVInstance.STATUS_CHOICES)[action]
+            messages.success(request, f"Статус {count} БПЛА змінено на \"{label}\".")
+        else:
+            messages.error(request, "Невідома дія.")
 
 
 @uav_perm_required(PERM_CHANGE_UAV)
@@ -1998,7 +2032,6 @@ def uav_quantity_action(request):
     qs = (
         UAVInstance.objects
         .filter(content_type_id=ct_id, object_id=obj_id, status=from_st)
-        .exclude(status='deleted')
         .order_by('pk')
         .values_list('pk', flat=True)
     )
@@ -2022,34 +2055,7 @@ def uav_quantity_action(request):
         return redirect(_list_url('drones') + '&view=quantity')
 
     if action == 'confirm_arrival':
-        from django.utils import timezone as tz
-        confirmed = 0
-        for uav_id in ids:
-            uav = UAVInstance.objects.filter(pk=uav_id, status='transit').first()
-            if not uav:
-                continue
-            movement = (
-                UAVMovement.objects
-                .filter(uav=uav, confirmed_at__isnull=True)
-                .order_by('-created_at')
-                .first()
-            )
-            if not movement:
-                continue
-            movement.confirmed_at = tz.now()
-            movement.confirmed_by = request.user
-            movement.save(update_fields=['confirmed_at', 'confirmed_by'])
-            uav.current_location = movement.to_location
-            uav.pending_to_location = None
-            new_st = movement.pre_transit_status or 'inspection'
-            uav.status = new_st
-            uav.save(update_fields=['current_location', 'pending_to_location', 'status', 'updated_at'])
-            UAVStatusLog.objects.create(
-                uav=uav, changed_by=request.user,
-                from_status='transit', to_status=new_st,
-                drone_type_label=_uav_type_label(uav),
-            )
-            confirmed += 1
+        confirmed = arrivals.confirm_arrivals(ids, request.user)
         messages.success(request, f'Прибуття {confirmed} БПЛА підтверджено.')
     else:
         _do_bulk_action(
@@ -2066,39 +2072,19 @@ def uav_quantity_action(request):
 
 # ── UAV CRUD ────────────────────────────────────────────────────────
 
-def _create_kit_components(uav, drone_type_obj, with_battery=True, with_spool=True):
-    """Create battery and/or spool components for a UAV based on its drone type."""
-    if with_battery:
-        Component.objects.create(
-            kind='battery',
-            power_template=drone_type_obj.power_template,
-            status='in_use',
-            assigned_to_uav=uav,
-        )
-    if with_spool and isinstance(drone_type_obj, OpticalDroneType):
-        Component.objects.create(
-            kind='spool',
-            video_template=drone_type_obj.video_template,
-            status='in_use',
-            assigned_to_uav=uav,
-        )
-
-
 def _build_drone_types_kit_data():
     """Return JSON-serialisable dict mapping 'ct_id-obj_id' to kit info."""
     import json
     data = {}
     fpv_ct = ContentType.objects.get_for_model(FPVDroneType)
-    for dt in FPVDroneType.objects.select_related('power_template', 'model', 'model__manufacturer'):
+    for dt in reference.objects(FPVDroneType):
         data[f"{fpv_ct.pk}-{dt.pk}"] = {
             "category": "fpv",
             "battery_name": str(dt.power_template),
             "spool_name": None,
         }
     opt_ct = ContentType.objects.get_for_model(OpticalDroneType)
-    for dt in OpticalDroneType.objects.select_related(
-        'power_template', 'video_template', 'model', 'model__manufacturer'
-    ):
+    for dt in reference.objects(OpticalDroneType):
         data[f"{opt_ct.pk}-{dt.pk}"] = {
             "category": "optical",
             "battery_name": str(dt.power_template),
@@ -2109,7 +2095,7 @@ def _build_drone_types_kit_data():
 
 @uav_perm_required(PERM_ADD_UAV)
 def uav_create(request):
-    workshop = Location.objects.filter(name='Майстерня').first()
+    workshop = reference.first(Location, name='Майстерня')
 
     if request.method == "POST":
         form = UAVInstanceForm(request.POST)
@@ -2122,32 +2108,16 @@ def uav_create(request):
             ct_id, obj_id = form.cleaned_data["drone_type"].split("-")
             ct = ContentType.objects.get(pk=int(ct_id))
             drone_type_obj = ct.get_object_for_this_type(pk=int(obj_id))
-            created = []
-            for _ in range(quantity):
-                uav = UAVInstance.objects.create(
-                    content_type_id=int(ct_id),
-                    object_id=int(obj_id),
-                    status="inspection",
-                    created_by=request.user,
-                    current_location=workshop,
-                    role=role,
-                )
-                if with_battery or with_spool:
-                    _create_kit_components(
-                        uav, drone_type_obj,
-                        with_battery=with_battery,
-                        with_spool=with_spool,
-                    )
-                # Record movement: from_location → workshop (skip if workshop not configured)
-                if workshop:
-                    UAVMovement.objects.create(
-                        uav=uav,
-                        from_location=from_location,
-                        to_location=workshop,
-                        moved_by=request.user,
-                        reason='created',
-                    )
-                created.append(uav)
+            # Record movement from_location → workshop (skipped if workshop not configured)
+            intake.receive_uavs(
+                drone_type_obj, quantity,
+                location=workshop,
+                from_location=from_location,
+                user=request.user,
+                role=role,
+                with_battery=with_battery,
+                with_spool=with_spool,
+            )
             msg = f"Додано {quantity} БПЛА." if quantity > 1 else "БПЛА додано."
             messages.success(request, msg)
             return redirect("equipment_accounting:equipment_list")
@@ -2158,7 +2128,7 @@ def uav_create(request):
         "form": form,
         "title": "Додати БПЛА",
         "drone_types_kit_json": _build_drone_types_kit_data(),
-        "locations": Location.objects.all(),
+        "locations": reference.objects(Location),
     })
 
 
@@ -2169,14 +2139,17 @@ def uav_edit(request, pk):
         old_status = uav.status
         form = UAVInstanceForm(request.POST, instance=uav)
         if form.is_valid():
-            form.save()
-            new_status = uav.status
-            if old_status != new_status:
-                UAVStatusLog.objects.create(
-                    uav=uav, changed_by=request.user,
-                    from_status=old_status, to_status=new_status,
-                    drone_type_label=_uav_type_label(uav),
-                )
+            with inventory.tracked([uav.pk]):
+                form.save()
+                # The drone type may have changed — FPV and optical kits differ
+                UAVInstance.refresh_kit_status([uav.pk])
+                new_status = uav.status
+                if old_status != new_status:
+                    UAVStatusLog.objects.create(
+                        uav=uav, changed_by=request.user,
+                        from_status=old_status, to_status=new_status,
+                        drone_type_label=_uav_type_label(uav),
+                    )
             messages.success(request, "БПЛА оновлено.")
             return redirect("equipment_accounting:equipment_list")
     else:
@@ -2192,18 +2165,20 @@ def uav_delete(request, pk):
     if request.method != "POST":
         return redirect("equipment_accounting:equipment_list")
     delete_components = request.POST.get('delete_components') == '1'
-    if delete_components:
-        uav.components.all().delete()
-    else:
-        uav.components.all().update(assigned_to_uav=None, status='disassembled')
-    old_status = uav.status
-    uav.status = 'deleted'
-    uav.save(update_fields=['status', 'updated_at'])
-    UAVStatusLog.objects.create(
-        uav=uav, changed_by=request.user,
-        from_status=old_status, to_status='deleted',
-        drone_type_label=_uav_type_label(uav),
-    )
+    with inventory.tracked([uav.pk]):
+        if delete_components:
+            uav.components.all().delete()
+        else:
+            uav.components.all().update(assigned_to_uav=None, status='disassembled')
+        old_status = uav.status
+        uav.status = 'deleted'
+        uav.kit_status = UAVInstance.KIT_NONE
+        uav.save(update_fields=['status', 'kit_status', 'updated_at'])
+        UAVStatusLog.objects.create(
+            uav=uav, changed_by=request.user,
+            from_status=old_status, to_status='deleted',
+            drone_type_label=_uav_type_label(uav),
+        )
     messages.success(request, "БПЛА видалено.")
     return redirect("equipment_accounting:equipment_list")
 
@@ -2437,17 +2412,20 @@ def component_bulk_action(request):
 
     qs = Component.objects.filter(pk__in=ids)
     count = qs.count()
+    affected_uav_ids = list(qs.filter(assigned_to_uav__isnull=False).values_list('assigned_to_uav_id', flat=True))
 
     if action == "damaged":
         qs.update(status="damaged", assigned_to_uav_id=None)
+        UAVInstance.refresh_kit_status(affected_uav_ids)
         messages.success(request, f"Позначено пошкодженими: {count}.")
     elif action == "restore":
         qs.update(status="in_use")
         messages.success(request, f"Відновлено: {count}.")
     elif action == "delete":
-        if not request.user.has_perm(PERM_DELETE_COMPONENT):
+        if not permissions.for_request(request).can_delete_component:
             raise PermissionDenied
         qs.delete()
+        UAVInstance.refresh_kit_status(affected_uav_ids)
         messages.success(request, f"Видалено {count} комплектуючих.")
     else:
         messages.warning(request, "Оберіть дію.")
@@ -2460,7 +2438,8 @@ def component_create(request):
     if request.method == "POST":
         form = ComponentForm(request.POST)
         if form.is_valid():
-            form.save()
+            component = form.save()
+            UAVInstance.refresh_kit_status([component.assigned_to_uav_id])
             messages.success(request, "Комплектуючу додано.")
             return redirect(_list_url("components"))
     else:
@@ -2475,9 +2454,11 @@ def component_create(request):
 def component_edit(request, pk):
     component = get_object_or_404(Component, pk=pk)
     if request.method == "POST":
+        old_uav_id = component.assigned_to_uav_id
         form = ComponentForm(request.POST, instance=component)
         if form.is_valid():
-            form.save()
+            component = form.save()
+            UAVInstance.refresh_kit_status([old_uav_id, component.assigned_to_uav_id])
             messages.success(request, "Комплектуючу оновлено.")
             return redirect(_list_url("components"))
     else:
@@ -2494,9 +2475,11 @@ def component_mark_damaged(request, pk):
     if request.method != "POST":
         return redirect(_list_url("components"))
     component = get_object_or_404(Component, pk=pk)
+    old_uav_id = component.assigned_to_uav_id
     component.status = "damaged"
     component.assigned_to_uav = None
     component.save(update_fields=["status", "assigned_to_uav", "updated_at"])
+    UAVInstance.refresh_kit_status([old_uav_id])
     messages.success(request, "Комплектуючу позначено як пошкоджену.")
     next_url = request.POST.get("next") or _list_url("components")
     return redirect(next_url)
@@ -2519,7 +2502,9 @@ def component_restore(request, pk):
 def component_delete(request, pk):
     component = get_object_or_404(Component, pk=pk)
     if request.method == "POST":
+        old_uav_id = component.assigned_to_uav_id
         component.delete()
+        UAVInstance.refresh_kit_status([old_uav_id])
         messages.success(request, "Комплектуючу видалено.")
         return redirect(_list_url("components"))
     return render(request, "equipment_accounting/equipment_confirm_delete.html", {
@@ -2565,7 +2550,7 @@ def location_edit(request, pk):
 def location_delete(request, pk):
     location = get_object_or_404(Location, pk=pk)
     # Prevent deleting locations that have UAVs assigned
-    uav_count = location.current_uavs.exclude(status='deleted').count()
+    uav_count = location.current_uavs.count()
     if request.method == "POST":
         if uav_count:
             messages.error(request, f"Неможливо видалити: {uav_count} БПЛА перебуває на цій локації.")
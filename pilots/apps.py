@@ -5,3 +5,6 @@ class PilotsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pilots'
     verbose_name = 'Пілоти'
+
+    def ready(self):
+        import pilots.signals  # noqa
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilots', '0004_droneorder_batch_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='droneorder',
+            index=models.Index(fields=['status'], name='droneorder_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='droneorder',
+            index=models.Index(fields=['pilot', '-created_at'], name='droneorder_pilot_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='strikereport',
+            index=models.Index(fields=['-reported_at'], name='strike_reported_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='strikereport',
+            index=models.Index(fields=['pilot', '-reported_at'], name='strike_pilot_reported_idx'),
+        ),
+    ]
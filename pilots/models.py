@@ -111,6 +111,10 @@ class StrikeReport(models.Model):
         verbose_name = "Звіт про удар"
         verbose_name_plural = "Звіти про удари"
         ordering = ['-reported_at']
+        indexes = [
+            models.Index(fields=['-reported_at'], name='strike_reported_idx'),
+            models.Index(fields=['pilot', '-reported_at'], name='strike_pilot_reported_idx'),
+        ]
 
     def __str__(self):
         return f"{self.crew} — {self.strike_date}"
@@ -167,6 +171,10 @@ class DroneOrder(models.Model):
         verbose_name = "Замовлення дрона"
         verbose_name_plural = "Замовлення дронів"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status'], name='droneorder_status_idx'),
+            models.Index(fields=['pilot', '-created_at'], name='droneorder_pilot_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.pilot} — {self.drone_type_name} x{self.quantity}"
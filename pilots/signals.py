@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app_drones import user_cache
+
+from .models import DroneOrder
+
+
+@receiver(post_save, sender=DroneOrder)
+@receiver(post_delete, sender=DroneOrder)
+def drop_active_orders_count(sender, **kwargs):
+    user_cache.invalidate_orders()
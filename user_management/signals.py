@@ -1,12 +1,16 @@
 import logging
 import re
 from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_save, pre_delete
 from django.dispatch import receiver
+from django.contrib.auth.models import Group
 from django.contrib.auth.signals import user_logged_in
 from allauth.account.signals import user_signed_up
 from allauth.socialaccount.signals import social_account_added
 from django.contrib.auth import get_user_model
+from app_drones import user_cache
 from app_drones.telegram_utils import send_telegram_message, send_admin_message
+from .models import Profile
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -118,3 +122,50 @@ def set_newly_social_connected_user_inactive(sender, request, sociallogin, **kwa
     # use this to set a flag or perform other actions if needed.
     pass
 
+
+# ── Cached per-user groups / permissions (app_drones.user_cache) ─────
+
+@receiver(post_save, sender=User)
+def drop_cached_user(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which is not cached
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    user_cache.invalidate_users([instance.pk])
+
+
+@receiver(post_save, sender=Profile)
+def drop_cached_profile_user(sender, instance, **kwargs):
+    user_cache.invalidate_users([instance.user_id])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def drop_cached_users_on_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # Group / permission side: pk_set holds user ids (None on clear)
+        user_cache.invalidate_users(pk_set or instance.user_set.values_list('pk', flat=True))
+    else:
+        user_cache.invalidate_users([instance.pk])
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def drop_cached_users_on_group_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # Permission side: pk_set holds group ids (None on clear)
+        groups = instance.group_set.all() if pk_set is None else pk_set
+    else:
+        groups = [instance.pk]
+    user_cache.invalidate_users(
+        User.objects.filter(groups__in=groups).values_list('pk', flat=True).distinct()
+    )
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def drop_cached_group_members(sender, instance, **kwargs):
+    # Renames change the members' group names; deletes drop the membership
+    user_cache.invalidate_users(instance.user_set.values_list('pk', flat=True))